@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from shared import models
+from shared import schemas
+from shared.cohort_rollup import cohort_totals, median_from_buckets, refresh_cohort_rollup, rollup_age_seconds
+from shared.common import schedule_message_to_service_bus
+from shared.database import SessionLocal
+from shared.logger import logger
+
+router = APIRouter()
+
+# The cohort endpoint refreshes the rollup itself when it is older than this, but only up
+# to COHORT_ROLLUP_INLINE_MAX_AGE_SECONDS: an older or missing rollup is left to
+# python -m worker.app.refresh_rollup, so a request never recomputes more than a short gap
+COHORT_ROLLUP_MAX_AGE_SECONDS = float(os.getenv("COHORT_ROLLUP_MAX_AGE_SECONDS", "60"))
+COHORT_ROLLUP_INLINE_MAX_AGE_SECONDS = float(os.getenv("COHORT_ROLLUP_INLINE_MAX_AGE_SECONDS", "3600"))
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def require_admin(admin_user_id: int, db: Session):
+    admin = db.query(models.User).filter_by(id=admin_user_id).first()
+    if not admin or (admin.user_type or "").upper() != "ADMIN":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+@router.get("/dead_letters", response_model=List[schemas.DeadLetterOut])
+def list_dead_letters(
+    admin_user_id: int,
+    action_type: str = None,
+    include_replayed: bool = False,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    require_admin(admin_user_id, db)
+    query = db.query(models.DeadLetter)
+    if action_type:
+        query = query.filter(models.DeadLetter.action_type == action_type)
+    if not include_replayed:
+        query = query.filter(models.DeadLetter.replayed_at.is_(None))
+    return query.order_by(models.DeadLetter.id.desc()).limit(min(limit, 500)).all()
+
+@router.post("/dead_letters/{dead_letter_id}/replay", response_model=schemas.DeadLetterOut)
+def replay_dead_letter(dead_letter_id: int, admin_user_id: int, db: Session = Depends(get_db)):
+    """
+    Re-sends a dead-lettered message with a fresh retry budget. It keeps its correlationId,
+    whose failed claim the worker takes over.
+    """
+    require_admin(admin_user_id, db)
+    dead_letter = db.query(models.DeadLetter).filter_by(id=dead_letter_id).first()
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    try:
+        message = json.loads(dead_letter.body)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Dead letter body is not a valid message")
+
+    message["attempt"] = 0
+    try:
+        # Unlike send_message_to_service_bus this raises, so a failed send is not marked replayed
+        schedule_message_to_service_bus(message, delay_seconds=0)
+    except Exception as e:
+        logger.error(f"Failed to replay dead letter {dead_letter_id}: {e}")
+        raise HTTPException(status_code=502, detail="Could not send the message to Service Bus")
+    dead_letter.replayed_at = time.time()
+    db.commit()
+    db.refresh(dead_letter)
+    logger.info(f"Replayed dead letter {dead_letter_id} ({dead_letter.action_type} {dead_letter.correlation_id})")
+    return dead_letter
+
+@router.get("/cohort", response_model=schemas.CohortStats)
+def cohort_stats(
+    admin_user_id: int,
+    jd: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Pass rate, score distribution, grade histogram and median time per stage across all
+    candidates, from the cohort_rollups table. jd matches candidates whose JD matches the
+    search terms (as in /api/search); dates are UTC creation days, both inclusive.
+    """
+    require_admin(admin_user_id, db)
+    if status is not None and status not in models.INTERVIEW_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown interview status {status}")
+
+    age = rollup_age_seconds(db)
+    if age is None:
+        raise HTTPException(status_code=503, detail="Cohort rollup not built yet, run python -m worker.app.refresh_rollup")
+    if COHORT_ROLLUP_MAX_AGE_SECONDS < age <= COHORT_ROLLUP_INLINE_MAX_AGE_SECONDS:
+        started = time.time()
+        if refresh_cohort_rollup(db):
+            db.commit()
+            logger.info(f"Cohort rollup refreshed in {time.time() - started:.2f}s")
+        age = rollup_age_seconds(db)
+
+    filters = []
+    if jd:
+        # Matched through the partial GIN index on JDs and hashed in the database
+        digests = (
+            db.query(func.md5(models.UserDocument.content))
+            .filter(
+                models.UserDocument.doc_type == "jd",
+                models.UserDocument.search_vector.op("@@")(func.websearch_to_tsquery("english", jd)),
+            )
+            .distinct()
+        )
+        filters.append(models.CohortRollup.jd_digest.in_(digests.scalar_subquery()))
+    if date_from:
+        filters.append(models.CohortRollup.day >= date_from)
+    if date_to:
+        filters.append(models.CohortRollup.day <= date_to)
+    if status:
+        filters.append(models.CohortRollup.status == status)
+    totals = cohort_totals(db, filters)
+
+    def count(metric: str) -> int:
+        return totals.get(metric, {}).get("", (0, 0.0))[0]
+
+    evaluated = count("evaluated")
+    passed = count("passed")
+    score_total = totals.get("evaluated", {}).get("", (0, 0.0))[1]
+    scores = totals.get("score", {})
+    grades = totals.get("grade", {})
+    return schemas.CohortStats(
+        interviews=count("interviews"),
+        evaluated=evaluated,
+        passed=passed,
+        pass_rate=round(passed / evaluated, 4) if evaluated else None,
+        mean_score=round(score_total / evaluated, 2) if evaluated else None,
+        score_distribution=[
+            schemas.CohortBucket(bucket=f"{tens * 10}-{tens * 10 + 10}", count=scores.get(str(tens), (0, 0.0))[0])
+            for tens in range(10)
+        ],
+        grade_histogram=[
+            schemas.CohortBucket(bucket=grade, count=grades[grade][0]) for grade in sorted(grades)
+        ],
+        median_seconds_per_stage={
+            stage: median_from_buckets({int(bucket): n for bucket, (n, _) in totals.get(f"{stage}_seconds", {}).items()})
+            for stage in ("answering", "evaluation")
+        },
+        rollup_age_seconds=round(age, 1) if age is not None else None,
+    )
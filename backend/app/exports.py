@@ -0,0 +1,102 @@
+"""
+Streaming encoders for bulk exports. Each takes the column names and an iterator of row
+batches (lists of tuples, as produced by Result.partitions()) and yields bytes as soon as a
+batch is encoded, so nothing but the current batch is ever held in memory.
+
+Parquet needs pyarrow, which is optional and imported only when a Parquet export is asked for.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_stream(columns: Sequence[str], batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_stream(columns: Sequence[str], batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Drain(io.RawIOBase):
+    """
+    Write-only file for ParquetWriter whose bytes are taken out after each row group.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_stream(fields: Sequence[Tuple[str, str]], batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """
+    One row group per batch. fields are (name, kind) pairs in row order, kind being one of
+    "int", "float", "str" or "timestamp".
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "timestamp": pa.timestamp("us", tz="UTC")}
+    schema = pa.schema([(name, types[kind]) for name, kind in fields])
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
@@ -3,15 +3,19 @@ from sqlalchemy.orm import Session
 
 from shared import models
 from shared import schemas
-from shared.database import SessionLocal
+from shared.database import SessionLocal, record_write
 from typing import List
 from shared.logger import logger
+from shared.context_version import bump_details_version, bump_interview_version
+from shared.interview_summary import refresh_interview_summary
+from . import response_cache
 import os
 from shared.common import (
     send_message_to_service_bus,
     FileProcessPayload,
     ServiceBusMessageModel,
-    QuestionProcessPayload
+    QuestionProcessPayload,
+    SpeculationPayload
 )
 from datetime import datetime
 import uuid
@@ -47,6 +51,7 @@ def create_interview(interview: schemas.InterviewCreate, db: Session = Depends(g
     db.add(db_interview)
     db.commit()
     db.refresh(db_interview)
+    record_write(user_id=interview.user_id, interview_id=db_interview.id)
     # Remove or fix the next logger line if payload is not defined
     # logger.info(f"Starting Interview for user {payload.user_id} interview {payload.interview_id}")
     return db_interview
@@ -154,16 +159,58 @@ async def upload_answer_type(
 
 
 
+# Partial recording of an answer still in progress, used to draft the next question early
+@router.post("/partial_answer/{user_id}/{interview_id}/{question_id}")
+async def upload_partial_answer(
+    user_id: int,
+    interview_id: int,
+    question_id: int,
+    file: UploadFile = File(...)
+):
+    upload_dir = f"{UPLOAD_DIR}/{user_id}/{interview_id}"
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = f"{upload_dir}/{question_id}_partial_audio.webm"
+    # Replace atomically; the worker may be reading the previous partial recording
+    tmp_path = f"{file_path}.{uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as buffer:
+        buffer.write(await file.read())
+    os.replace(tmp_path, file_path)
+
+    message = ServiceBusMessageModel(
+        correlationId=str(uuid4()),
+        # Own session so a draft in progress never delays the final answer's processing
+        session_id=f"{user_id}-{interview_id}-speculative",
+        action_type="speculate_question",
+        user_id=user_id,
+        timestamp=datetime.utcnow().isoformat(),
+        status="answer in progress",
+        payload=SpeculationPayload(interview_id=interview_id, question_id=question_id, audio_path=file_path)
+    )
+    send_message_to_service_bus(message.dict())
+    logger.info(f"Saved partial answer at {os.path.abspath(file_path)} and queued speculate_question")
+
+    return {"path": file_path}
+
+
 # /question API updates the status of question after user answers it.
 @router.patch("/question/{qa_id}", response_model=schemas.QuestionAnswerOut)
 def update_question_answer(qa_id: int, update: schemas.QuestionAnswerUpdate, db: Session = Depends(get_db)):
     qa = db.query(models.QuestionAnswer).filter_by(id=qa_id).first()
     if not qa:
         raise HTTPException(status_code=404, detail="QuestionAnswer not found")
-    for field, value in update.dict(exclude_unset=True).items():
+    changes = update.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(qa, field, value)
+    if "answer_text" in changes:
+        # The answer is part of the prompt context cached by the worker
+        bump_interview_version(db, qa.interview_id)
+    else:
+        bump_details_version(db, qa.interview_id)
+    refresh_interview_summary(db, qa.interview_id)
     db.commit()
     db.refresh(qa)
+    response_cache.invalidate(f"interview_details:{qa.interview_id}")
+    record_write(user_id=qa.user_id, interview_id=qa.interview_id)
     logger.info(f"Updated QuestionAnswer {qa_id} with {update.dict(exclude_unset=True)}")
 
     # Enqueue next_question message to service bus
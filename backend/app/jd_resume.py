@@ -1,7 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from shared.database import SessionLocal
+from shared.database import ReadSessionLocal, SessionLocal, record_write
 from shared import models
+from shared.matching import upsert_document_vector
+from shared.documents import get_document_stamp, get_document_text, set_document_text
+from shared.context_version import bump_user_interview_versions
+import json
 import os
 from fastapi.responses import FileResponse
 
@@ -11,6 +15,7 @@ from shared.common import (
     ServiceBusMessageModel
 )
 from shared.logger import logger
+from . import response_cache
 import uuid
 from datetime import datetime
 
@@ -25,6 +30,14 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db(request: Request):
+    # Read-only endpoints may be served by a replica; see shared.database.ReadSessionLocal
+    db = ReadSessionLocal(request.path_params)
+    try:
+        yield db
+    finally:
+        db.close()
+
 @router.post("/upload/{user_id}/{file_type}", summary="Upload JD or Resume")
 async def upload_file(user_id: int, file_type: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
     logger.info(f"Received upload request: user_id={user_id}, file_type={file_type}, filename={file.filename}")
@@ -48,6 +61,7 @@ async def upload_file(user_id: int, file_type: str, file: UploadFile = File(...)
     if user:
         setattr(user, f"{file_type}_path", file_path)
         db.commit()
+        record_write(user_id=user_id)
         logger.info(f"User {user_id} record updated with {file_type}_path: {file_path}")
     else:
         logger.warning(f"User with id {user_id} not found in database.")
@@ -76,22 +90,33 @@ async def upload_file(user_id: int, file_type: str, file: UploadFile = File(...)
 
 
 @router.get("/preview/{user_id}/{file_type}", summary="Preview JD or Resume")
-def preview_file(user_id: int, file_type: str, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter_by(id=user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if file_type == "jd":
-        if user.jd_text:
-            return {"text": user.jd_text}
-        else:
-            raise HTTPException(status_code=404, detail="JD text not found")
-    elif file_type == "resume":
-        if user.resume_text:
-            return {"text": user.resume_text}
-        else:
-            raise HTTPException(status_code=404, detail="Resume text not found")
-    else:
+def preview_file(user_id: int, file_type: str, request: Request, db: Session = Depends(get_read_db)):
+    if file_type not in ["jd", "resume"]:
         raise HTTPException(status_code=400, detail="Invalid file type")
+    key = f"preview:{user_id}:{file_type}"
+    cached = response_cache.get(key)
+    if cached and cached.fresh:
+        return response_cache.respond(request, cached.etag, cached.body)
+
+    stamp = get_document_stamp(db, user_id, file_type)
+    if not stamp:
+        response_cache.invalidate(key)
+        if not db.query(models.User.id).filter_by(id=user_id).first():
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=404, detail=f"{'JD' if file_type == 'jd' else 'Resume'} text not found")
+    etag = f'"{stamp[0]}-{stamp[1]}"'
+    if cached and cached.etag == etag:
+        response_cache.revalidated(cached)
+        return response_cache.respond(request, etag, cached.body)
+    if response_cache.not_modified(request, etag):
+        return response_cache.respond(request, etag, None)
+
+    text = get_document_text(db, user_id, file_type)
+    if not text:
+        raise HTTPException(status_code=404, detail=f"{'JD' if file_type == 'jd' else 'Resume'} text not found")
+    body = json.dumps({"text": text}).encode("utf-8")
+    response_cache.put(key, etag, body)
+    return response_cache.respond(request, etag, body)
 
 
 
@@ -108,17 +133,24 @@ def delete_file(user_id: int, file_type: str, db: Session = Depends(get_db)):
                 os.remove(f"{dir_path}/{f}")
                 deleted = True
     # Update DB fields
+    response_cache.invalidate(f"preview:{user_id}:{file_type}")
     if file_type == "jd":
         user.jd_path = None
-        user.jd_text = None
+        set_document_text(db, user.id, "jd", None)
         user.jd_status = "NOT_AVAILABLE"
+        upsert_document_vector(db, user.id, "jd", None)
+        bump_user_interview_versions(db, user.id)
         db.commit()
+        record_write(user_id=user_id)
         return {"detail": "JD deleted"}
     elif file_type == "resume":
         user.resume_path = None
-        user.resume_text = None
+        set_document_text(db, user.id, "resume", None)
         user.resume_status = "NOT_AVAILABLE"
+        upsert_document_vector(db, user.id, "resume", None)
+        bump_user_interview_versions(db, user.id)
         db.commit()
+        record_write(user_id=user_id)
         return {"detail": "Resume deleted"}
     else:
         raise HTTPException(status_code=400, detail="Invalid file type")
@@ -1,17 +1,20 @@
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from shared.database import engine
 from shared.models import Base
 from .auth import router as auth_router
 from .interview import router as interview_router
-from . import interview, jd_resume, performance
+from . import interview, jd_resume, performance, search, matching, admin
 import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Create the database tables
-Base.metadata.create_all(bind=engine)
+# Tables are normally created by the Alembic migrations; create_all remains as a
+# convenience for local setups and runs at startup rather than at import
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "true").lower() == "true"
 
 # Initialize FastAPI app
 app = FastAPI()
@@ -31,6 +34,9 @@ app.include_router(auth_router)
 app.include_router(interview.router, prefix="/api/interview", tags=["Interview"])
 app.include_router(jd_resume.router, prefix="/api/files", tags=["JobDescription & Resume"])
 app.include_router(performance.router, prefix="/api/performance", tags=["Performance"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(matching.router, prefix="/api/matching", tags=["Matching"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -38,4 +44,14 @@ logger = logging.getLogger(__name__)
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the AI Interviewer API"}
\ No newline at end of file
+    return {"message": "Welcome to the AI Interviewer API"}
+
+@app.on_event("startup")
+def create_schema():
+    if not AUTO_CREATE_SCHEMA:
+        return
+    try:
+        Base.metadata.create_all(bind=engine)
+    except Exception as e:
+        # Serve anyway; requests fail until the database is reachable
+        logger.error(f"Could not create database tables at startup: {e}")
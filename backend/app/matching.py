@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from typing import List
+
+from shared import models
+from shared import schemas
+from shared.database import ReadSessionLocal
+from shared.logger import logger
+from shared.documents import get_document_text
+from shared.matching import rank_documents
+
+
+router = APIRouter()
+
+MAX_TOP_K = 200
+
+def get_read_db(request: Request):
+    # Ranking only reads document_vectors, which the doc_upload worker maintains (resumes
+    # from before that are vectorized by python -m worker.app.backfill_vectors)
+    db = ReadSessionLocal(request.path_params)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.post("/rank", response_model=List[schemas.MatchResult])
+def rank_candidates(request: schemas.MatchRequest, db: Session = Depends(get_read_db)):
+    """
+    Ranks every candidate resume against a job description with TF-IDF cosine similarity.
+    The JD is taken from jd_text, or from the JD uploaded by jd_user_id.
+    """
+    jd_text = request.jd_text
+    if not jd_text and request.jd_user_id:
+        jd_user = db.query(models.User).filter_by(id=request.jd_user_id).first()
+        if not jd_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        jd_text = get_document_text(db, jd_user.id, "jd")
+    if not jd_text:
+        raise HTTPException(status_code=400, detail="JD text not found")
+    top_k = max(1, min(request.top_k, MAX_TOP_K))
+
+    rows = (
+        db.query(models.DocumentVector.user_id, models.DocumentVector.term_indices, models.DocumentVector.term_weights)
+        .filter_by(doc_type="resume")
+        .all()
+    )
+    ranked = rank_documents(jd_text, rows, top_k=top_k)
+    names = dict(
+        db.query(models.User.id, models.User.username)
+        .filter(models.User.id.in_([match["key"] for match in ranked]))
+        .all()
+    )
+    logger.info(f"Ranked {len(rows)} resumes, returning top {len(ranked)}")
+    return [
+        schemas.MatchResult(
+            user_id=match["key"],
+            candidate_name=names.get(match["key"], ""),
+            score=match["score"],
+            matched_terms=match["matched_terms"],
+        )
+        for match in ranked
+    ]
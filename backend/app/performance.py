@@ -1,66 +1,235 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from shared import models
-from shared.database import SessionLocal
+from shared.database import ReadSessionLocal
+from shared.interview_archive import read_archive
 from shared import schemas
-from typing import List
+from typing import List, Optional
 from shared.logger import logger
+from . import exports, response_cache
+from .admin import require_admin
+import os
 
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+def get_read_db(request: Request):
+    # Read-only endpoints may be served by a replica; see shared.database.ReadSessionLocal
+    db = ReadSessionLocal(request.path_params)
     try:
         yield db
     finally:
         db.close()
 
+LISTING_SORTS = {
+    "id": models.Interview.id.desc(),
+    "score": models.Interview.score_percent.desc().nullslast(),
+    "score_asc": models.Interview.score_percent.asc().nullslast(),
+}
+
 @router.get("/interviews/{user_id}", response_model=List[schemas.InterviewSummary])
-def list_completed_interviews(user_id: int, db: Session = Depends(get_db)):
-    interviews = db.query(models.Interview).filter_by(user_id=user_id).all()
-    summaries = []
-    for interview in interviews:
-        candidate_name = interview.user.username if interview.user else ""
-        qa = (
-            db.query(models.QuestionAnswer)
-            .filter_by(interview_id=interview.id)
-            .order_by(models.QuestionAnswer.id.desc())
-            .first()
-        )
-        candidate_grade = qa.candidate_grade if qa else None
-
-        summaries.append(
-            schemas.InterviewSummary(
-                id=interview.id,
-                user_id=interview.user_id,
-                interview_name=interview.interview_name,
-                status=interview.status,
-                score_in_percentage=interview.score_in_percentage,
-                interview_cleared_by_candidate=interview.interview_cleared_by_candidate,
-                candidate_name=candidate_name,
-                candidate_grade=candidate_grade,
-            )
+def list_completed_interviews(
+    user_id: int,
+    sort: str = "id",
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    db: Session = Depends(get_read_db),
+):
+    if sort not in LISTING_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(LISTING_SORTS)}")
+    # Summary columns are kept on interviews by the worker (shared/interview_summary.py),
+    # so the listing is one scan of ix_interviews_user_score
+    query = db.query(models.Interview).filter(models.Interview.user_id == user_id)
+    if min_score is not None:
+        query = query.filter(models.Interview.score_percent >= min_score)
+    if max_score is not None:
+        query = query.filter(models.Interview.score_percent <= max_score)
+    interviews = query.order_by(LISTING_SORTS[sort]).all()
+    if not interviews:
+        return []
+    candidate_name = db.query(models.User.username).filter_by(id=user_id).scalar() or ""
+
+    summaries = [
+        schemas.InterviewSummary(
+            id=interview.id,
+            user_id=interview.user_id,
+            interview_name=interview.interview_name,
+            status=interview.status,
+            score_in_percentage=interview.score_in_percentage,
+            interview_cleared_by_candidate=interview.interview_cleared_by_candidate,
+            candidate_name=candidate_name,
+            candidate_grade=interview.latest_grade,
+            score_percent=interview.score_percent,
+            question_count=interview.question_count,
+            answered_count=interview.answered_count,
+            created_at=interview.created_at,
+            last_answered_at=interview.last_answered_at,
+            evaluated_at=interview.evaluated_at,
         )
+        for interview in interviews
+    ]
     logger.info(f"summaries {summaries}")
     return summaries
 
 @router.get("/interview/{interview_id}/details", response_model=schemas.InterviewDetails)
-def interview_details(interview_id: int, db: Session = Depends(get_db)):
+def interview_details(interview_id: int, request: Request, db: Session = Depends(get_read_db)):
+    key = f"interview_details:{interview_id}"
+    cached = response_cache.get(key)
+    if cached and cached.fresh:
+        return response_cache.respond(request, cached.etag, cached.body)
+
+    version = db.query(models.Interview.details_version).filter_by(id=interview_id).scalar()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    etag = f'"{interview_id}-{version}"'
+    if cached and cached.etag == etag:
+        response_cache.revalidated(cached)
+        return response_cache.respond(request, etag, cached.body)
+    if response_cache.not_modified(request, etag):
+        return response_cache.respond(request, etag, None)
+
+    # The interview row (and its version) is read before the questions, so the cached body
+    # is never older than the ETag it is stored under
     interview = db.query(models.Interview).filter_by(id=interview_id).first()
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
-    questions = (
-        db.query(models.QuestionAnswer)
-        .filter_by(interview_id=interview_id)
-        .order_by(models.QuestionAnswer.question_id.asc())
-        .all()
-    )
+    etag = f'"{interview_id}-{interview.details_version}"'
+    if interview.archive_path:
+        # Archived by worker/app/archive.py: the answers live in cold storage
+        try:
+            questions = [schemas.QuestionAnswer(**q) for q in read_archive(interview.archive_path)]
+        except OSError as e:
+            logger.error(f"Could not read archive {interview.archive_path} of interview {interview_id}: {e}")
+            raise HTTPException(status_code=503, detail="Archived interview is not available")
+    else:
+        questions = [
+            schemas.QuestionAnswer.from_orm(q)
+            for q in db.query(models.QuestionAnswer)
+            .filter_by(interview_id=interview_id)
+            .order_by(models.QuestionAnswer.question_id.asc())
+            .all()
+        ]
     response = schemas.InterviewDetails(
         interview=schemas.Interview.from_orm(interview),
-        questions=[schemas.QuestionAnswer.from_orm(q) for q in questions]
+        questions=questions
+    )
+    logger.info(f"Returning interview details for interview {interview_id} ({len(questions)} questions)")
+    body = response.model_dump_json().encode("utf-8")
+    response_cache.put(key, etag, body)
+    return response_cache.respond(request, etag, body)
+
+
+# One row per question answer with its interview; (name, column, Parquet kind)
+EXPORT_FIELDS = [
+    ("interview_id", models.Interview.id, "int"),
+    ("user_id", models.Interview.user_id, "int"),
+    ("candidate_name", models.User.username, "str"),
+    ("interview_name", models.Interview.interview_name, "str"),
+    ("interview_status", models.Interview.status, "str"),
+    ("created_at", models.Interview.created_at, "timestamp"),
+    ("evaluated_at", models.Interview.evaluated_at, "timestamp"),
+    ("score_percent", models.Interview.score_percent, "float"),
+    ("interview_cleared_by_candidate", models.Interview.interview_cleared_by_candidate, "str"),
+    ("question_id", models.QuestionAnswer.question_id, "int"),
+    ("question_status", models.QuestionAnswer.status, "str"),
+    ("question_text", models.QuestionAnswer.question_text, "str"),
+    ("answer_text", models.QuestionAnswer.answer_text, "str"),
+    ("candidate_score", models.QuestionAnswer.candidate_score, "float"),
+    ("candidate_grade", models.QuestionAnswer.candidate_grade, "str"),
+    ("ai_remark", models.QuestionAnswer.ai_remark, "str"),
+]
+# Archived interviews have no question_answers rows; their answer columns come from the
+# archive file, whose keys these are
+ARCHIVED_ANSWER_KEYS = [
+    "question_id", "status", "question_text", "answer_text", "candidate_score", "candidate_grade", "ai_remark",
+]
+
+def with_archived_answers(batches):
+    """
+    Replaces the single answerless row of each archived interview (archive_path, the last
+    selected column, is set) with one row per answer in its archive file.
+    """
+    interview_columns = len(EXPORT_FIELDS) - len(ARCHIVED_ANSWER_KEYS)
+    for rows in batches:
+        expanded = []
+        for row in rows:
+            values, archive_path = tuple(row[:-1]), row[-1]
+            if not archive_path:
+                expanded.append(values)
+                continue
+            try:
+                answers = read_archive(archive_path)
+            except OSError as e:
+                # Flagged in the output rather than exported as an interview without answers
+                logger.error(f"Could not read archive {archive_path} for export: {e}")
+                answers = [{"status": "ARCHIVE_UNAVAILABLE"}]
+            for answer in answers:
+                expanded.append(values[:interview_columns] + tuple(answer.get(key) for key in ARCHIVED_ANSWER_KEYS))
+        yield expanded
+
+def stream_export(statement, format: str, ids: dict):
+    """
+    Runs statement on its own session with a server-side cursor and encodes it batch by
+    batch. The session lives as long as the response body, not the request handler.
+    """
+    db = ReadSessionLocal(ids)
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        batches = with_archived_answers(result.partitions())
+        names = [name for name, _, _ in EXPORT_FIELDS]
+        if format == "csv":
+            yield from exports.csv_stream(names, batches)
+        elif format == "ndjson":
+            yield from exports.ndjson_stream(names, batches)
+        else:
+            yield from exports.parquet_stream([(name, kind) for name, _, kind in EXPORT_FIELDS], batches)
+    finally:
+        db.close()
+
+@router.get("/export", summary="Stream interview results as CSV, NDJSON or Parquet")
+def export_results(
+    admin_user_id: int,
+    format: str = "csv",
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    require_admin(admin_user_id, db)
+    if format not in exports.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(exports.EXPORT_FORMATS)}")
+    if format == "parquet" and not exports.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed on the server")
+    if status is not None and status not in models.INTERVIEW_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown interview status {status}")
+
+    statement = (
+        select(*[column for _, column, _ in EXPORT_FIELDS], models.Interview.archive_path)
+        .select_from(models.Interview)
+        .join(models.User, models.User.id == models.Interview.user_id)
+        .outerjoin(models.QuestionAnswer, models.QuestionAnswer.interview_id == models.Interview.id)
+    )
+    if user_id is not None:
+        statement = statement.where(models.Interview.user_id == user_id)
+    if status is not None:
+        statement = statement.where(models.Interview.status == status)
+    if created_from is not None:
+        statement = statement.where(models.Interview.created_at >= created_from)
+    if created_to is not None:
+        statement = statement.where(models.Interview.created_at < created_to)
+    statement = statement.order_by(models.Interview.id, models.QuestionAnswer.id)
+
+    logger.info(f"Export requested by admin {admin_user_id}: format={format}, user_id={user_id}, status={status}, created_from={created_from}, created_to={created_to}")
+    filename = f"interview_results_{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(statement, format, {"user_id": user_id} if user_id is not None else None),
+        media_type=exports.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    logger.info(f"Returning interview details: {response.model_dump_json(indent=2)}")
-    return response
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+In-process cache of serialized GET responses, validated by ETag.
+
+Each entry is the response body as bytes plus the ETag built from the row's version stamp
+(interviews.details_version, user_documents.version). Within RESPONSE_CACHE_TTL_SECONDS an
+entry is served as-is, with no database query; after that the endpoint re-reads only the
+version and serves the cached bytes again if it is unchanged. Writes made by this process
+invalidate entries immediately; writes by the worker or another replica are picked up at
+the next revalidation. Clients get Cache-Control: no-cache so they always revalidate with
+If-None-Match and receive 304 when nothing changed.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request, Response
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+
+
+class CachedResponse:
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self.validated_at = time.time()
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.validated_at < RESPONSE_CACHE_TTL_SECONDS
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+
+def get(key: str) -> Optional[CachedResponse]:
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+        return entry
+
+
+def put(key: str, etag: str, body: bytes) -> CachedResponse:
+    entry = CachedResponse(etag, body)
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > RESPONSE_CACHE_SIZE:
+            _entries.popitem(last=False)
+    return entry
+
+
+def revalidated(entry: CachedResponse) -> CachedResponse:
+    entry.validated_at = time.time()
+    return entry
+
+
+def invalidate(key: str):
+    with _lock:
+        _entries.pop(key, None)
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    return etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+
+
+def respond(request: Request, etag: str, body: Optional[bytes]) -> Response:
+    """
+    304 when the client already has etag, otherwise the JSON body.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import REAL, cast, func, tuple_, literal
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from shared import models
+from shared import schemas
+from shared.database import ReadSessionLocal
+from shared.logger import logger
+
+
+router = APIRouter()
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=25, MinWords=8, StartSel=<mark>, StopSel=</mark>"
+MAX_PAGE_SIZE = 100
+
+def get_read_db(request: Request):
+    # Read-only endpoints may be served by a replica; see shared.database.ReadSessionLocal
+    db = ReadSessionLocal(request.path_params)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def parse_cursor(cursor: Optional[str]):
+    """
+    Cursors are "<rank>:<id>" of the last hit on the previous page.
+    """
+    if not cursor:
+        return None
+    try:
+        rank, row_id = cursor.split(":", 1)
+        return float(rank), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def ranked_page(db: Session, id_col, vector_col, extra_cols, tsquery, cursor, limit: int, filters=()):
+    """
+    Returns one keyset page of (id, *extra_cols, rank) ordered by rank desc, id desc.
+    Matching goes through the GIN index; ranking only touches matching rows.
+    """
+    rank = func.ts_rank_cd(vector_col, tsquery)
+    query = (
+        db.query(id_col.label("id"), *extra_cols, rank.label("rank"))
+        .filter(vector_col.op("@@")(tsquery), *filters)
+    )
+    if cursor:
+        # ts_rank_cd is a real; compared as one, the cursor's rank equals the row it came from
+        # (as a float8 literal, 0.1 would sort below the real 0.1 and skip its ties)
+        query = query.filter(tuple_(rank, id_col) < tuple_(cast(literal(cursor[0]), REAL), literal(cursor[1])))
+    return query.order_by(rank.desc(), id_col.desc()).limit(limit + 1).subquery()
+
+
+def search_answers(db: Session, q: str, cursor, limit: int):
+    QA = models.QuestionAnswer
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    page = ranked_page(
+        db, QA.id, QA.search_vector, [QA.user_id, QA.interview_id, QA.question_id], tsquery, cursor, limit
+    )
+    # Highlighting is the expensive part, so it only runs over the rows of this page
+    document = func.concat_ws(" ... ", QA.question_text, QA.answer_text, QA.ai_remark)
+    headline = func.ts_headline(SEARCH_CONFIG, document, tsquery, HEADLINE_OPTIONS)
+    rows = (
+        db.query(*page.c, headline.label("headline"))
+        .join(QA, QA.id == page.c.id)
+        .order_by(page.c.rank.desc(), page.c.id.desc())
+        .all()
+    )
+    return [
+        schemas.SearchHit(
+            scope="answers",
+            id=row.id,
+            user_id=row.user_id,
+            interview_id=row.interview_id,
+            question_id=row.question_id,
+            rank=row.rank,
+            headline=row.headline,
+        )
+        for row in rows
+    ]
+
+
+def search_resumes(db: Session, q: str, cursor, limit: int):
+    Document = models.UserDocument
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # The doc_type filter matches the partial GIN index over resumes
+    is_resume = Document.doc_type == "resume"
+    page = ranked_page(db, Document.user_id, Document.search_vector, [], tsquery, cursor, limit, filters=[is_resume])
+    headline = func.ts_headline(SEARCH_CONFIG, Document.content, tsquery, HEADLINE_OPTIONS)
+    rows = (
+        db.query(*page.c, headline.label("headline"))
+        .join(Document, (Document.user_id == page.c.id) & is_resume)
+        .order_by(page.c.rank.desc(), page.c.id.desc())
+        .all()
+    )
+    return [
+        schemas.SearchHit(scope="resumes", id=row.id, user_id=row.id, rank=row.rank, headline=row.headline)
+        for row in rows
+    ]
+
+
+SEARCH_SCOPES = {
+    "answers": search_answers,
+    "resumes": search_resumes,
+}
+
+
+@router.get("", response_model=schemas.SearchResults)
+def search(
+    q: str = Query(..., min_length=1),
+    scope: str = "answers",
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Full-text search over question/answer transcripts and remarks ("answers") or resumes ("resumes").
+    Results are ranked with ts_rank_cd and paginated with an opaque keyset cursor.
+    """
+    search_scope = SEARCH_SCOPES.get(scope)
+    if not search_scope:
+        raise HTTPException(status_code=400, detail="Invalid search scope")
+    hits = search_scope(db, q, parse_cursor(cursor), limit)
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = f"{hits[-1].rank!r}:{hits[-1].id}"
+    logger.info(f"Search scope={scope} q={q!r} returned {len(hits)} hits")
+    return schemas.SearchResults(hits=hits, next_cursor=next_cursor)
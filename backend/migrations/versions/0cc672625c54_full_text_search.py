@@ -0,0 +1,53 @@
+"""full text search
+
+Revision ID: 0cc672625c54
+Revises: d6ddfe3e5d61
+Create Date: 2026-10-19 09:12:04.118240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0cc672625c54'
+down_revision: Union[str, None] = 'd6ddfe3e5d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+QUESTION_ANSWER_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(question_text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(answer_text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(ai_remark, '')), 'C')"
+)
+RESUME_DOCUMENT = "to_tsvector('english', coalesce(resume_text, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored generated columns keep the tsvector in sync on every INSERT/UPDATE,
+    # whether the write comes from the backend or from the worker.
+    op.add_column('question_answers', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(QUESTION_ANSWER_DOCUMENT, persisted=True), nullable=True
+    ))
+    op.create_index(
+        'ix_question_answers_search_vector', 'question_answers', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+    op.add_column('users', sa.Column(
+        'resume_search_vector', postgresql.TSVECTOR(), sa.Computed(RESUME_DOCUMENT, persisted=True), nullable=True
+    ))
+    op.create_index(
+        'ix_users_resume_search_vector', 'users', ['resume_search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_resume_search_vector', table_name='users')
+    op.drop_column('users', 'resume_search_vector')
+    op.drop_index('ix_question_answers_search_vector', table_name='question_answers')
+    op.drop_column('question_answers', 'search_vector')
@@ -0,0 +1,36 @@
+"""processed messages
+
+Revision ID: 11e4bffcfcf0
+Revises: d011d0524d56
+Create Date: 2026-10-19 15:12:08.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11e4bffcfcf0'
+down_revision: Union[str, None] = 'd011d0524d56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('processed_messages',
+    sa.Column('correlation_id', sa.String(), nullable=False),
+    sa.Column('action_type', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('claimed_at', sa.Float(), nullable=False),
+    sa.Column('completed_at', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('correlation_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('processed_messages')
@@ -0,0 +1,43 @@
+"""dead letters
+
+Revision ID: 190c07be07f1
+Revises: 11e4bffcfcf0
+Create Date: 2026-10-19 15:48:51.630174
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '190c07be07f1'
+down_revision: Union[str, None] = '11e4bffcfcf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dead_letters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('correlation_id', sa.String(), nullable=True),
+    sa.Column('action_type', sa.String(), nullable=True),
+    sa.Column('session_id', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('dead_lettered_at', sa.Float(), nullable=False),
+    sa.Column('replayed_at', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dead_letters_id'), 'dead_letters', ['id'], unique=False)
+    op.create_index(op.f('ix_dead_letters_correlation_id'), 'dead_letters', ['correlation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_dead_letters_correlation_id'), table_name='dead_letters')
+    op.drop_index(op.f('ix_dead_letters_id'), table_name='dead_letters')
+    op.drop_table('dead_letters')
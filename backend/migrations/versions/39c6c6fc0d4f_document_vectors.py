@@ -0,0 +1,40 @@
+"""document vectors
+
+Revision ID: 39c6c6fc0d4f
+Revises: 0cc672625c54
+Create Date: 2026-10-19 11:40:52.603117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '39c6c6fc0d4f'
+down_revision: Union[str, None] = '0cc672625c54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_vectors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(), nullable=False),
+    sa.Column('term_indices', sa.LargeBinary(), nullable=False),
+    sa.Column('term_weights', sa.LargeBinary(), nullable=False),
+    sa.Column('term_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'doc_type', name='uq_document_vectors_user_doc_type')
+    )
+    op.create_index(op.f('ix_document_vectors_id'), 'document_vectors', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_vectors_id'), table_name='document_vectors')
+    op.drop_table('document_vectors')
@@ -0,0 +1,56 @@
+"""cohort rollups
+
+Revision ID: 3f92c70095fa
+Revises: 95b588369160
+Create Date: 2026-10-19 20:41:08.519634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f92c70095fa'
+down_revision: Union[str, None] = '95b588369160'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cohort_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=True),
+    sa.Column('status', postgresql.ENUM(name='interview_status', create_type=False), nullable=True),
+    sa.Column('jd_digest', sa.String(length=32), nullable=True),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('bucket', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cohort_rollups_day_status', 'cohort_rollups', ['day', 'status'], unique=False)
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_index(
+        'ix_interviews_created_day', 'interviews', [sa.text("((created_at AT TIME ZONE 'UTC')::date)")], unique=False
+    )
+    op.create_index(
+        'ix_interviews_last_activity', 'interviews',
+        [sa.text('(greatest(created_at, last_answered_at, evaluated_at))')], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interviews_last_activity', table_name='interviews')
+    op.drop_index('ix_interviews_created_day', table_name='interviews')
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_cohort_rollups_day_status', table_name='cohort_rollups')
+    op.drop_table('cohort_rollups')
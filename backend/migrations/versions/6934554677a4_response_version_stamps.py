@@ -0,0 +1,30 @@
+"""response version stamps
+
+Revision ID: 6934554677a4
+Revises: b22ae04b9a81
+Create Date: 2026-10-19 19:12:55.604871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6934554677a4'
+down_revision: Union[str, None] = 'b22ae04b9a81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('details_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_documents', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_documents', 'version')
+    op.drop_column('interviews', 'details_version')
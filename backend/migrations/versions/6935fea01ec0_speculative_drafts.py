@@ -0,0 +1,45 @@
+"""speculative drafts
+
+Revision ID: 6935fea01ec0
+Revises: cff11fe38663
+Create Date: 2026-10-19 17:20:13.552870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6935fea01ec0'
+down_revision: Union[str, None] = 'cff11fe38663'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('speculative_drafts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('partial_answer', sa.Text(), nullable=False),
+    sa.Column('draft_question', sa.Text(), nullable=False),
+    sa.Column('context_version', sa.Integer(), nullable=False),
+    sa.Column('generation_seconds', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('coverage', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.Float(), nullable=False),
+    sa.Column('resolved_at', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interviews.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('interview_id', 'question_id', name='uq_speculative_drafts_interview_question')
+    )
+    op.create_index(op.f('ix_speculative_drafts_id'), 'speculative_drafts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_speculative_drafts_id'), table_name='speculative_drafts')
+    op.drop_table('speculative_drafts')
@@ -0,0 +1,72 @@
+"""interview summary columns
+
+Revision ID: 95b588369160
+Revises: 6934554677a4
+Create Date: 2026-10-19 20:03:41.227316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '95b588369160'
+down_revision: Union[str, None] = '6934554677a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('score_percent', sa.Float(), nullable=True))
+    op.add_column('interviews', sa.Column('latest_grade', sa.String(), nullable=True))
+    op.add_column('interviews', sa.Column('question_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('interviews', sa.Column('answered_count', sa.Integer(), server_default='0', nullable=False))
+    # Added without a default so existing interviews keep an unknown creation time
+    op.add_column('interviews', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    op.alter_column('interviews', 'created_at', server_default=sa.text('now()'))
+    op.add_column('interviews', sa.Column('last_answered_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('interviews', sa.Column('evaluated_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.execute("""
+        UPDATE interviews i
+        SET question_count = c.total, answered_count = c.answered
+        FROM (
+            SELECT interview_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE coalesce(trim(answer_text), '') <> '') AS answered
+            FROM question_answers
+            GROUP BY interview_id
+        ) c
+        WHERE c.interview_id = i.id
+    """)
+    op.execute("""
+        UPDATE interviews i
+        SET latest_grade = l.candidate_grade
+        FROM (
+            SELECT DISTINCT ON (interview_id) interview_id, candidate_grade
+            FROM question_answers
+            ORDER BY interview_id, id DESC
+        ) l
+        WHERE l.interview_id = i.id
+    """)
+    op.execute("""
+        UPDATE interviews
+        SET score_percent = trim(trailing '%' from trim(score_in_percentage))::double precision
+        WHERE trim(score_in_percentage) ~ '^[0-9]+(\\.[0-9]+)?%?$'
+    """)
+    op.create_index('ix_interviews_user_score', 'interviews', ['user_id', 'score_percent'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interviews_user_score', table_name='interviews')
+    op.drop_column('interviews', 'evaluated_at')
+    op.drop_column('interviews', 'last_answered_at')
+    op.drop_column('interviews', 'created_at')
+    op.drop_column('interviews', 'answered_count')
+    op.drop_column('interviews', 'question_count')
+    op.drop_column('interviews', 'latest_grade')
+    op.drop_column('interviews', 'score_percent')
@@ -0,0 +1,32 @@
+"""jd search index
+
+Revision ID: a7d3c9e1f482
+Revises: e5a8f1c3d207
+Create Date: 2026-10-19 23:41:09.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3c9e1f482'
+down_revision: Union[str, None] = 'e5a8f1c3d207'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The admin cohort endpoint's jd filter matches JDs through this index
+    op.create_index(
+        'ix_user_documents_jd_search_vector', 'user_documents', ['search_vector'], unique=False,
+        postgresql_using='gin', postgresql_where=sa.text("doc_type = 'jd'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_documents_jd_search_vector', table_name='user_documents')
@@ -0,0 +1,81 @@
+"""user documents
+
+Revision ID: b22ae04b9a81
+Revises: b92cbdf500ea
+Create Date: 2026-10-19 18:41:09.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b22ae04b9a81'
+down_revision: Union[str, None] = 'b92cbdf500ea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DOCUMENT = "to_tsvector('english', coalesce(content, ''))"
+RESUME_DOCUMENT = "to_tsvector('english', coalesce(resume_text, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(DOCUMENT, persisted=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'doc_type', name='uq_user_documents_user_doc_type')
+    )
+    op.create_index(op.f('ix_user_documents_id'), 'user_documents', ['id'], unique=False)
+
+    op.execute(
+        "INSERT INTO user_documents (user_id, doc_type, content) "
+        "SELECT id, 'jd', jd_text FROM users WHERE jd_text IS NOT NULL AND jd_text <> ''"
+    )
+    op.execute(
+        "INSERT INTO user_documents (user_id, doc_type, content) "
+        "SELECT id, 'resume', resume_text FROM users WHERE resume_text IS NOT NULL AND resume_text <> ''"
+    )
+    # Built after the backfill, which is much faster than maintaining it row by row
+    op.create_index(
+        'ix_user_documents_resume_search_vector', 'user_documents', ['search_vector'], unique=False,
+        postgresql_using='gin', postgresql_where=sa.text("doc_type = 'resume'")
+    )
+
+    op.drop_index('ix_users_resume_search_vector', table_name='users')
+    op.drop_column('users', 'resume_search_vector')
+    op.drop_column('users', 'resume_text')
+    op.drop_column('users', 'jd_text')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column('jd_text', sa.Text(), nullable=True))
+    op.add_column('users', sa.Column('resume_text', sa.Text(), nullable=True))
+    op.execute(
+        "UPDATE users SET jd_text = d.content FROM user_documents d "
+        "WHERE d.user_id = users.id AND d.doc_type = 'jd'"
+    )
+    op.execute(
+        "UPDATE users SET resume_text = d.content FROM user_documents d "
+        "WHERE d.user_id = users.id AND d.doc_type = 'resume'"
+    )
+    op.add_column('users', sa.Column(
+        'resume_search_vector', postgresql.TSVECTOR(), sa.Computed(RESUME_DOCUMENT, persisted=True), nullable=True
+    ))
+    op.create_index(
+        'ix_users_resume_search_vector', 'users', ['resume_search_vector'], unique=False, postgresql_using='gin'
+    )
+
+    op.drop_index('ix_user_documents_resume_search_vector', table_name='user_documents')
+    op.drop_index(op.f('ix_user_documents_id'), table_name='user_documents')
+    op.drop_table('user_documents')
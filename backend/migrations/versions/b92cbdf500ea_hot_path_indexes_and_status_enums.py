@@ -0,0 +1,80 @@
+"""hot path indexes and status enums
+
+Revision ID: b92cbdf500ea
+Revises: 6935fea01ec0
+Create Date: 2026-10-19 18:02:41.307512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b92cbdf500ea'
+down_revision: Union[str, None] = '6935fea01ec0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# enum type -> (values, [(table, column, nullable)])
+STATUS_ENUMS = {
+    'interview_status': (
+        ('Active', 'NEW', 'DONE_ASKING_QUESTIONS', 'AI_EVALUATION_DONE'),
+        [('interviews', 'status', True)],
+    ),
+    'question_status': (
+        ('NEW', 'ATTEMPTED', 'Answer_Audio_Extracted', 'ANSWERED'),
+        [('question_answers', 'status', True)],
+    ),
+    'document_status': (
+        ('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', 'NOT_AVAILABLE'),
+        [('users', 'jd_status', True), ('users', 'resume_status', True)],
+    ),
+    'message_status': (
+        ('IN_PROGRESS', 'DONE', 'FAILED'),
+        [('processed_messages', 'status', False)],
+    ),
+    'draft_status': (
+        ('READY', 'USED', 'DISCARDED'),
+        [('speculative_drafts', 'status', False)],
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails on any value outside the enum rather than rewriting it
+    for name, (values, columns) in STATUS_ENUMS.items():
+        status_enum = postgresql.ENUM(*values, name=name)
+        status_enum.create(op.get_bind())
+        for table, column, nullable in columns:
+            op.alter_column(table, column,
+                existing_type=sa.String(),
+                type_=status_enum,
+                existing_nullable=nullable,
+                postgresql_using=f'{column}::{name}')
+
+    op.create_index(op.f('ix_interviews_user_id'), 'interviews', ['user_id'], unique=False)
+    op.create_index('ix_question_answers_interview_question', 'question_answers', ['interview_id', 'question_id'], unique=False)
+    op.create_index('ix_question_answers_user_interview_status', 'question_answers', ['user_id', 'interview_id', 'status'], unique=False)
+    op.create_index('ix_question_answers_interview_latest', 'question_answers', ['interview_id', 'id'], unique=False, postgresql_include=['candidate_grade'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_question_answers_interview_latest', table_name='question_answers')
+    op.drop_index('ix_question_answers_user_interview_status', table_name='question_answers')
+    op.drop_index('ix_question_answers_interview_question', table_name='question_answers')
+    op.drop_index(op.f('ix_interviews_user_id'), table_name='interviews')
+
+    for name, (values, columns) in STATUS_ENUMS.items():
+        status_enum = postgresql.ENUM(*values, name=name)
+        for table, column, nullable in columns:
+            op.alter_column(table, column,
+                existing_type=status_enum,
+                type_=sa.String(),
+                existing_nullable=nullable,
+                postgresql_using=f'{column}::text')
+        status_enum.drop(op.get_bind())
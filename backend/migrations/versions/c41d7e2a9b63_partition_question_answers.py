@@ -0,0 +1,140 @@
+"""partition question_answers by month, interview archival
+
+Revision ID: c41d7e2a9b63
+Revises: 3f92c70095fa
+Create Date: 2026-10-19 21:15:47.302918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2a9b63'
+down_revision: Union[str, None] = '3f92c70095fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+QUESTION_ANSWER_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(question_text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(answer_text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(ai_remark, '')), 'C')"
+)
+COPIED_COLUMNS = (
+    "id, user_id, interview_id, question_id, question_text, status, answer_text, camera_recording_path, "
+    "screen_recording_path, audio_recording_path, combined_recording_path, ai_answer, ai_remark, "
+    "candidate_score, candidate_grade"
+)
+MONTHS_AHEAD = 3
+
+
+def create_indexes() -> None:
+    op.create_index('ix_question_answers_id', 'question_answers', ['id'], unique=False)
+    op.create_index(
+        'ix_question_answers_search_vector', 'question_answers', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_question_answers_interview_question', 'question_answers', ['interview_id', 'question_id'], unique=False
+    )
+    op.create_index(
+        'ix_question_answers_user_interview_status', 'question_answers', ['user_id', 'interview_id', 'status'],
+        unique=False
+    )
+    op.create_index(
+        'ix_question_answers_interview_latest', 'question_answers', ['interview_id', 'id'], unique=False,
+        postgresql_include=['candidate_grade']
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('interviews', sa.Column('archive_path', sa.String(), nullable=True))
+    op.add_column('interviews', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Rebuild question_answers as a table partitioned by month on created_at. Existing rows
+    # take their interview's creation time, or the epoch when that is unknown.
+    op.execute("ALTER TABLE question_answers RENAME TO question_answers_unpartitioned")
+    op.execute(f"""
+        CREATE TABLE question_answers (
+            id integer NOT NULL DEFAULT nextval('question_answers_id_seq'),
+            user_id integer REFERENCES users (id),
+            interview_id integer REFERENCES interviews (id),
+            question_id integer,
+            question_text text,
+            status question_status,
+            answer_text text,
+            camera_recording_path varchar,
+            screen_recording_path varchar,
+            audio_recording_path varchar,
+            combined_recording_path varchar,
+            ai_answer text,
+            ai_remark text,
+            candidate_score double precision,
+            candidate_grade varchar,
+            search_vector tsvector GENERATED ALWAYS AS ({QUESTION_ANSWER_DOCUMENT}) STORED,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # Month boundaries in UTC, as worker/app/archive.py creates them
+    op.execute("CREATE TABLE question_answers_before PARTITION OF question_answers "
+               "FOR VALUES FROM (MINVALUE) TO (date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')")
+    for month in range(MONTHS_AHEAD + 1):
+        op.execute(f"""
+            DO $$
+            DECLARE start timestamptz := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{month} month') AT TIME ZONE 'UTC';
+            BEGIN
+                EXECUTE format(
+                    'CREATE TABLE question_answers_%s PARTITION OF question_answers FOR VALUES FROM (%L) TO (%L)',
+                    to_char(start, 'YYYYMM'), start, start + interval '1 month'
+                );
+            END $$
+        """)
+    op.execute("CREATE TABLE question_answers_default PARTITION OF question_answers DEFAULT")
+    op.execute(f"""
+        INSERT INTO question_answers ({COPIED_COLUMNS}, created_at)
+        SELECT {', '.join('q.' + column.strip() for column in COPIED_COLUMNS.split(','))},
+               coalesce(i.created_at, to_timestamp(0))
+        FROM question_answers_unpartitioned q
+        LEFT JOIN interviews i ON i.id = q.interview_id
+    """)
+    op.execute("ALTER SEQUENCE question_answers_id_seq OWNED BY question_answers.id")
+    op.execute("DROP TABLE question_answers_unpartitioned")
+    create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE question_answers RENAME TO question_answers_partitioned")
+    op.execute(f"""
+        CREATE TABLE question_answers (
+            id integer PRIMARY KEY DEFAULT nextval('question_answers_id_seq'),
+            user_id integer REFERENCES users (id),
+            interview_id integer REFERENCES interviews (id),
+            question_id integer,
+            question_text text,
+            status question_status,
+            answer_text text,
+            camera_recording_path varchar,
+            screen_recording_path varchar,
+            audio_recording_path varchar,
+            combined_recording_path varchar,
+            ai_answer text,
+            ai_remark text,
+            candidate_score double precision,
+            candidate_grade varchar,
+            search_vector tsvector GENERATED ALWAYS AS ({QUESTION_ANSWER_DOCUMENT}) STORED
+        )
+    """)
+    op.execute(f"INSERT INTO question_answers ({COPIED_COLUMNS}) SELECT {COPIED_COLUMNS} FROM question_answers_partitioned")
+    op.execute("ALTER SEQUENCE question_answers_id_seq OWNED BY question_answers.id")
+    op.execute("DROP TABLE question_answers_partitioned")
+    create_indexes()
+
+    op.drop_column('interviews', 'archived_at')
+    op.drop_column('interviews', 'archive_path')
+    op.drop_column('interviews', 'completed_at')
@@ -0,0 +1,28 @@
+"""interview context version
+
+Revision ID: cff11fe38663
+Revises: 190c07be07f1
+Create Date: 2026-10-19 16:31:44.918265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cff11fe38663'
+down_revision: Union[str, None] = '190c07be07f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('context_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interviews', 'context_version')
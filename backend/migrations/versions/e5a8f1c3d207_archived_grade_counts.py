@@ -0,0 +1,30 @@
+"""archived grade counts
+
+Revision ID: e5a8f1c3d207
+Revises: c41d7e2a9b63
+Create Date: 2026-10-19 22:02:31.774190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a8f1c3d207'
+down_revision: Union[str, None] = 'c41d7e2a9b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Interviews archived before this revision get their counts from `python -m worker.app.regrade`
+    op.add_column('interviews', sa.Column('archived_grades', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interviews', 'archived_grades')
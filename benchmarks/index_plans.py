@@ -0,0 +1,126 @@
+"""
+Benchmark: before/after EXPLAIN of the hot-path QuestionAnswer and Interview queries.
+
+Runs EXPLAIN (ANALYZE, BUFFERS) for each access path the hot-path indexes serve, with ids
+sampled from the database, and prints the median and p95 execution time, shared buffers
+touched and the plan's scan nodes. Save a run before applying the index migration and
+compare after it:
+
+    python -m benchmarks.index_plans --output before.json
+    (cd backend && alembic upgrade head)
+    python -m benchmarks.index_plans --compare before.json
+
+Seed the database with benchmarks/seed_data.py first; on small tables the planner
+prefers sequential scans whatever the indexes.
+"""
+import argparse
+import json
+import statistics
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from benchmarks.query_benchmark import plan_nodes
+from shared.database import SessionLocal, engine
+from shared.models import Interview, QuestionAnswer
+from worker.app.lanes import percentile
+
+# name -> (query sampling one parameter row, builder of the query as the code issues it)
+ACCESS_PATHS: Dict[str, tuple] = {
+    # worker process_question / speculate_question
+    "qa_by_interview_question": (
+        "SELECT interview_id, question_id FROM question_answers ORDER BY random() LIMIT :count",
+        lambda db, row: db.query(QuestionAnswer).filter_by(interview_id=row[0], question_id=row[1]).limit(1),
+    ),
+    # backend more_questions
+    "new_questions_of_interview": (
+        "SELECT user_id, id FROM interviews ORDER BY random() LIMIT :count",
+        lambda db, row: db.query(QuestionAnswer).filter_by(user_id=row[0], interview_id=row[1], status="NEW"),
+    ),
+    # backend list_completed_interviews, worker process_question
+    "latest_answer_grade": (
+        "SELECT id FROM interviews ORDER BY random() LIMIT :count",
+        lambda db, row: db.query(QuestionAnswer.candidate_grade)
+        .filter_by(interview_id=row[0]).order_by(QuestionAnswer.id.desc()).limit(1),
+    ),
+    # backend list_completed_interviews
+    "interviews_of_user": (
+        "SELECT user_id FROM interviews ORDER BY random() LIMIT :count",
+        lambda db, row: db.query(Interview).filter_by(user_id=row[0]),
+    ),
+}
+
+
+def literal_sql(query: Query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def explain_analyze(connection, sql: str) -> Dict:
+    result = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()[0]
+    plan = result["Plan"]
+
+    def buffers(node: Dict) -> int:
+        return node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0)
+
+    return {
+        "execution_ms": result["Execution Time"],
+        "buffers": buffers(plan),
+        "nodes": [node for node in plan_nodes(plan) if "Scan" in node],
+    }
+
+
+def run_path(name: str, samples: int) -> Dict:
+    sample_query, build = ACCESS_PATHS[name]
+    db = SessionLocal()
+    try:
+        with engine.connect() as connection:
+            rows = list(connection.execute(text(sample_query), {"count": samples}))
+            if not rows:
+                raise RuntimeError(f"No rows to sample for {name}; seed the database first")
+            runs = [explain_analyze(connection, literal_sql(build(db, row))) for row in rows]
+    finally:
+        db.close()
+    timings = sorted(run["execution_ms"] for run in runs)
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": percentile(timings, 0.95),
+        "median_buffers": statistics.median(run["buffers"] for run in runs),
+        "nodes": runs[0]["nodes"],
+    }
+
+
+def print_comparison(results: Dict, before: Dict):
+    for name, after in results.items():
+        previous = before.get(name)
+        print(name)
+        if previous:
+            print(f"    before: {previous['median_ms']:9.3f}ms median  {previous['p95_ms']:9.3f}ms p95  "
+                  f"{previous['median_buffers']:8.0f} buffers  {'; '.join(previous['nodes'])}")
+        print(f"    after:  {after['median_ms']:9.3f}ms median  {after['p95_ms']:9.3f}ms p95  "
+              f"{after['median_buffers']:8.0f} buffers  {'; '.join(after['nodes'])}")
+        if previous and after["median_ms"]:
+            print(f"    speedup: {previous['median_ms'] / after['median_ms']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=50, help="Sampled parameter sets per access path")
+    parser.add_argument("--output", help="Write this run's results to a JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = {name: run_path(name, args.samples) for name in ACCESS_PATHS}
+    before = {}
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+    print_comparison(results, before)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark: end-to-end load test of the backend and worker against local fakes.
+
+Runs the backend app (over an in-process ASGI transport) and the worker's Service Bus
+listener in one process, with every external service replaced by a local stand-in:
+SERVICE_BUS_BACKEND=local (shared/local_queue.py), LLM_PROVIDER=fake, ASR_BACKEND=fake
+and DOC_EXTRACTOR_BACKEND=fake (worker/app/fakes.py). Only PostgreSQL is real: point
+DATABASE_URL at a disposable database with the migrations applied (or leave
+AUTO_CREATE_SCHEMA on).
+
+Each simulated candidate signs up, uploads a JD and resume, creates an interview and
+then answers questions through more_questions, upload_answer and the question PATCH
+until no more questions come, ends the interview and waits for the evaluation. The
+report lists throughput and latency percentiles per stage; "next_question" is the
+candidate-visible wait between submitting an answer and receiving the next question.
+
+The backend has no start_interview endpoint in this tree, so the first question of
+each interview is generated by calling the worker's generate_next_question directly.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.load_test --candidates 20 --think-time 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+os.environ.setdefault("SERVICE_BUS_BACKEND", "local")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("ASR_BACKEND", "fake")
+os.environ.setdefault("DOC_EXTRACTOR_BACKEND", "fake")
+os.environ.setdefault("TOPIC_NAME", "loadtest")
+os.environ.setdefault("SUBSCRIPTION_NAME", "loadtest-worker")
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="interv-loadtest-"))
+
+import anyio.to_thread  # noqa: E402
+import httpx  # noqa: E402
+
+from backend.app.main import app  # noqa: E402
+from shared.database import SessionLocal  # noqa: E402
+from worker.app import interview_cache, speculation, worker  # noqa: E402
+from worker.app.lanes import percentile  # noqa: E402
+from worker.app.langchain_chat import generate_next_question  # noqa: E402
+from worker.app.llm_routing import routing_stats  # noqa: E402
+
+FAKE_PDF = b"%PDF-1.4\n% load test document\n"
+FAKE_AUDIO = b"\x1aE\xdf\xa3" + b"\x00" * 4096  # webm magic followed by padding
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def timed(self, stage: str, coroutine):
+        started = time.perf_counter()
+        try:
+            result = await coroutine
+        except Exception:
+            self.errors[stage] += 1
+            raise
+        self.samples[stage].append(time.perf_counter() - started)
+        return result
+
+    def report(self):
+        rows = {}
+        for stage in sorted(set(self.samples) | set(self.errors)):
+            samples = sorted(self.samples[stage])
+            rows[stage] = {
+                "count": len(samples),
+                "errors": self.errors[stage],
+                "p50_seconds": percentile(samples, 0.5),
+                "p95_seconds": percentile(samples, 0.95),
+                "p99_seconds": percentile(samples, 0.99),
+                "max_seconds": samples[-1] if samples else None,
+            }
+        return rows
+
+
+def generate_first_question(interview_id: int):
+    db = SessionLocal()
+    try:
+        generate_next_question(interview_id, db)
+    finally:
+        db.close()
+
+
+async def wait_for(check, timeout: float, interval: float = 0.5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if await check():
+            return
+        await asyncio.sleep(interval)
+    raise TimeoutError("Timed out waiting for the worker")
+
+
+async def candidate(client: httpx.AsyncClient, number: int, run_id: str, recorder: Recorder, args):
+    username = f"loadtest-{run_id}-{number}"
+    await client.post("/signup", json={"username": username, "password": "loadtest", "user_type": "CANDIDATE"})
+    login = await client.post("/login", json={"username": username, "password": "loadtest"})
+    user_id = login.json()["user_data"]["id"]
+
+    async def documents_ready():
+        for file_type in ("jd", "resume"):
+            if (await client.get(f"/api/files/preview/{user_id}/{file_type}")).status_code != 200:
+                return False
+        return True
+
+    async def upload_documents():
+        for file_type in ("jd", "resume"):
+            files = {"file": (f"{file_type}.pdf", FAKE_PDF, "application/pdf")}
+            (await client.post(f"/api/files/upload/{user_id}/{file_type}", files=files)).raise_for_status()
+        await wait_for(documents_ready, args.timeout)
+
+    await recorder.timed("documents", upload_documents())
+
+    response = await recorder.timed("create_interview", client.post(
+        "/api/interview/interview", json={"interview_name": f"Load test {number}", "user_id": user_id}
+    ))
+    interview_id = response.json()["id"]
+    loop = asyncio.get_event_loop()
+    await recorder.timed("first_question", loop.run_in_executor(None, generate_first_question, interview_id))
+
+    answered = 0
+    stage = "first_more_questions"
+    while True:
+        response = await recorder.timed(stage, client.post(
+            "/api/interview/more_questions", json={"user_id": user_id, "interview_id": interview_id}
+        ))
+        questions = response.json()
+        if not questions:
+            break
+        question = questions[0]
+        await asyncio.sleep(args.think_time)
+
+        files = {"file": (f"{question['question_id']}_audio.webm", FAKE_AUDIO, "video/webm")}
+        upload = await recorder.timed("upload_answer", client.post(
+            f"/api/interview/upload_answer/{user_id}/{interview_id}/{question['question_id']}/audio", files=files
+        ))
+        await recorder.timed("patch_answer", client.patch(
+            f"/api/interview/question/{question['id']}",
+            json={"audio_recording_path": os.path.abspath(upload.json()["path"]), "status": "ATTEMPTED"},
+        ))
+        answered += 1
+        stage = "next_question"
+
+    async def evaluated():
+        status = await client.get(f"/api/interview/interview/{interview_id}/status")
+        return status.json().get("status") == "AI_EVALUATION_DONE"
+
+    await recorder.timed("end_interview", client.post(f"/api/interview/end_interview/{interview_id}"))
+    await recorder.timed("evaluation", wait_for(evaluated, args.timeout))
+    return answered
+
+
+async def run(args):
+    # Sync endpoints run in AnyIO's thread pool; more_questions blocks a thread while it polls
+    anyio.to_thread.current_default_thread_limiter().total_tokens = max(40, args.candidates * 3)
+    listener = asyncio.ensure_future(worker.listen_to_service_bus())
+    await asyncio.sleep(0.5)
+
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(args.candidates)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+        async def one(number: int):
+            async with semaphore:
+                await asyncio.sleep(number * args.ramp_up / max(1, args.candidates))
+                return await recorder.timed("interview", candidate(client, number, run_id, recorder, args))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(n) for n in range(args.interviews or args.candidates)), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+    listener.cancel()
+
+    completed = [r for r in results if not isinstance(r, Exception)]
+    failures = [r for r in results if isinstance(r, Exception)]
+    return {
+        "candidates": args.candidates,
+        "interviews_completed": len(completed),
+        "interviews_failed": len(failures),
+        "first_failures": [repr(f) for f in failures[:5]],
+        "elapsed_seconds": elapsed,
+        "interviews_per_minute": len(completed) * 60 / elapsed,
+        "answers_per_second": sum(completed) / elapsed,
+        "stages": recorder.report(),
+        "worker": {
+            "lanes": worker.lane_dispatcher.metrics() if worker.lane_dispatcher else {},
+            "llm_routes": routing_stats(),
+            "interview_cache": interview_cache.cache_stats(),
+            "speculation": speculation.speculation_stats(),
+        },
+    }
+
+
+def print_report(result):
+    print(
+        f"{result['interviews_completed']} interviews completed, {result['interviews_failed']} failed "
+        f"with {result['candidates']} concurrent candidates in {result['elapsed_seconds']:.1f}s"
+    )
+    print(f"throughput: {result['interviews_per_minute']:.2f} interviews/min, {result['answers_per_second']:.2f} answers/s")
+    print(f"{'stage':<22} {'count':>6} {'errors':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for stage, row in result["stages"].items():
+        cells = [row[key] for key in ("p50_seconds", "p95_seconds", "p99_seconds", "max_seconds")]
+        print(f"{stage:<22} {row['count']:>6} {row['errors']:>6} " + " ".join(
+            f"{cell:>8.2f}" if cell is not None else f"{'-':>8}" for cell in cells
+        ))
+    for failure in result["first_failures"]:
+        print(f"failure: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=10, help="Concurrent simulated candidates")
+    parser.add_argument("--interviews", type=int, default=0, help="Total interviews to run (default: one per candidate)")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Seconds a candidate spends answering")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which candidates start")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Per-request and per-wait timeout")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Benchmark: latency and query plans of the backend's read endpoints at data scale.
+
+Run against a database seeded with benchmarks/seed_data.py. For each endpoint it samples
+real ids, times --requests calls through the app in-process and reports p50/p95/p99 and
+the number of SQL statements per request. It also records the EXPLAIN plan of every
+distinct statement the endpoint issues and lists the tables it reads with a sequential
+scan.
+
+With a baseline file (written by --update-baseline) the run fails when an endpoint's p95
+grows by more than --tolerance (and at least --min-delta seconds), or when a statement
+starts seq-scanning a table the baseline reached through an index.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.query_benchmark --update-baseline
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.query_benchmark
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from backend.app.main import app
+from shared.database import engine, replica_engines
+from shared.logger import logger
+from worker.app.lanes import percentile
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "query_baseline.json")
+
+# name -> (method, path template, query sampling the ids it needs); the POST is a login as the sampled user
+ENDPOINTS = {
+    "login": (
+        "POST", "/login",
+        "SELECT username FROM users ORDER BY random() LIMIT :count",
+    ),
+    "list_completed_interviews": (
+        "GET", "/api/performance/interviews/{id}",
+        "SELECT user_id FROM interviews ORDER BY random() LIMIT :count",
+    ),
+    "interview_details": (
+        "GET", "/api/performance/interview/{id}/details",
+        "SELECT id FROM interviews ORDER BY random() LIMIT :count",
+    ),
+    "get_interview_status": (
+        "GET", "/api/interview/interview/{id}/status",
+        "SELECT id FROM interviews ORDER BY random() LIMIT :count",
+    ),
+    "preview_file": (
+        "GET", "/api/files/preview/{id}/resume",
+        "SELECT id FROM users WHERE resume_status = 'COMPLETED' ORDER BY random() LIMIT :count",
+    ),
+}
+
+
+class StatementRecorder:
+    """
+    Collects the SQL statements (with their first parameters and the engine that ran them)
+    executed while recording, on the primary or any replica.
+    """
+
+    def __init__(self):
+        self.recording = False
+        self.statements: Dict[str, tuple] = {}
+        self.executed = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording:
+            self.statements.setdefault(statement, (parameters, conn.engine))
+            self.executed += 1
+
+    def start(self):
+        self.recording, self.statements, self.executed = True, {}, 0
+
+    def stop(self):
+        self.recording = False
+
+
+def plan_nodes(plan: Dict) -> List[str]:
+    nodes = []
+    node = plan["Node Type"]
+    if "Relation Name" in plan:
+        node += f" on {plan['Relation Name']}"
+    if "Index Name" in plan:
+        node += f" using {plan['Index Name']}"
+    nodes.append(node)
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def explain(statement: str, parameters, on_engine) -> Dict:
+    connection = on_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = cursor.fetchone()[0][0]["Plan"]
+        cursor.close()
+    finally:
+        connection.close()
+    nodes = plan_nodes(plan)
+    return {
+        "total_cost": plan["Total Cost"],
+        "nodes": nodes,
+        "seq_scans": sorted({node.split(" on ")[1] for node in nodes if node.startswith("Seq Scan on ")}),
+    }
+
+
+def sample_ids(query: str, count: int) -> List:
+    with engine.connect() as connection:
+        return [row[0] for row in connection.execute(text(query), {"count": count})]
+
+
+def measure(client: TestClient, recorder: StatementRecorder, name: str, requests: int) -> Dict:
+    method, path, sample_query = ENDPOINTS[name]
+    ids = sample_ids(sample_query, requests)
+    if not ids:
+        raise RuntimeError(f"No rows to sample for {name}; seed the database first")
+
+    def call(sample):
+        if method == "POST":
+            return client.post(path, json={"username": sample, "password": "password"})
+        return client.get(path.format(id=sample))
+
+    # One recorded call for the plans, then the timed calls
+    recorder.start()
+    call(ids[0])
+    recorder.stop()
+    if not recorder.statements:
+        # Nothing to check plans of: the recorder is not listening on the engine the endpoint used
+        raise RuntimeError(f"{name} issued no recorded SQL statements")
+    plans = {
+        statement: explain(statement, parameters, on_engine)
+        for statement, (parameters, on_engine) in recorder.statements.items()
+    }
+
+    samples, statements_per_request = [], []
+    for i in range(requests):
+        recorder.start()
+        started = time.perf_counter()
+        response = call(ids[i % len(ids)])
+        samples.append(time.perf_counter() - started)
+        recorder.stop()
+        statements_per_request.append(recorder.executed)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{name} returned {response.status_code}: {response.text[:200]}")
+    samples.sort()
+    statements_per_request.sort()
+    return {
+        "requests": requests,
+        "p50_seconds": percentile(samples, 0.5),
+        "p95_seconds": percentile(samples, 0.95),
+        "p99_seconds": percentile(samples, 0.99),
+        "statements_p50": percentile(statements_per_request, 0.5),
+        "statements_max": statements_per_request[-1],
+        "plans": plans,
+    }
+
+
+def seq_scanned(result: Dict) -> set:
+    return {table for plan in result["plans"].values() for table in plan["seq_scans"]}
+
+
+def regressions(results: Dict, baseline: Dict, tolerance: float, min_delta: float) -> List[str]:
+    failures = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        limit = max(before["p95_seconds"] * (1 + tolerance), before["p95_seconds"] + min_delta)
+        if result["p95_seconds"] > limit:
+            failures.append(
+                f"{name}: p95 {result['p95_seconds'] * 1000:.1f}ms, baseline {before['p95_seconds'] * 1000:.1f}ms"
+            )
+        new_scans = seq_scanned(result) - seq_scanned(before)
+        if new_scans:
+            failures.append(f"{name}: new sequential scan on {', '.join(sorted(new_scans))}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), action="append", help="Endpoints to run (default: all)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 growth")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore p95 growth below this many seconds")
+    args = parser.parse_args()
+
+    # The endpoints log every response; keep that out of the timings' output
+    logger.setLevel(logging.WARNING)
+    recorder = StatementRecorder()
+    # Read-only endpoints may run on a replica (shared.database.ReadSessionLocal)
+    for recorded_engine in [engine, *replica_engines]:
+        event.listen(recorded_engine, "before_cursor_execute", recorder)
+
+    results = {}
+    with TestClient(app) as client:
+        print(f"{'endpoint':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8}  seq scans")
+        for name in args.endpoint or sorted(ENDPOINTS):
+            result = results[name] = measure(client, recorder, name, args.requests)
+            print(
+                f"{name:<28} {result['p50_seconds'] * 1000:>8.1f} {result['p95_seconds'] * 1000:>8.1f} "
+                f"{result['p99_seconds'] * 1000:>8.1f} {result['statements_p50']:>8.0f}  "
+                f"{', '.join(sorted(seq_scanned(result))) or '-'}"
+            )
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        failures = regressions(results, json.load(f), args.tolerance, args.min_delta)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
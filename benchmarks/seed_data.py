@@ -0,0 +1,245 @@
+"""
+Synthetic dataset generator: bulk-loads users with their JD/resume documents, interviews
+and question/answer rows with realistic text bodies into DATABASE_URL using COPY, for
+benchmarks/query_benchmark.py.
+
+Rows are generated deterministically from --seed and streamed straight into COPY, so
+memory stays flat at any volume. New rows get ids above the current maximum (and the id
+sequences are advanced afterwards), so seeding an existing database adds to it. Usernames
+are prefixed with --prefix to keep repeated runs apart. Roughly 85% of interviews are
+evaluated, 5% finished asking and 10% still in progress; 80% of users have a parsed JD
+and resume.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.seed_data --users 100000 --interviews 1000000 --questions 5000000
+"""
+import argparse
+import io
+import random
+import time
+from typing import Iterator, List
+
+from sqlalchemy import text
+
+from shared.database import engine
+from worker.app.fakes import ANSWER_SENTENCES, DOCUMENT_TEXT, QUESTION_TOPICS
+from worker.app.grading import PASS_THRESHOLD, grade_score
+
+QUESTION_TEMPLATES = [
+    "Can you tell me about your experience with {}?",
+    "How would you approach {}?",
+    "Walk me through a time you were {}.",
+    "What trade-offs do you consider when {}?",
+]
+
+REMARKS = [
+    "Clear structure and a concrete example, but the trade-offs were only touched on.",
+    "Covers the basics; lacks depth on failure modes and monitoring.",
+    "Strong answer with measurable outcomes and good communication.",
+    "Mostly off-topic; the candidate did not address the question directly.",
+    "Reasonable approach, though testing and rollback were not mentioned.",
+]
+
+
+class CopyStream(io.RawIOBase):
+    """
+    File-like view over an iterator of COPY text lines, read by copy_expert in chunks.
+    """
+
+    def __init__(self, lines: Iterator[str]):
+        self.lines = lines
+        self.leftover = b""
+
+    def readable(self):
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        chunks, length = [self.leftover], len(self.leftover)
+        while size < 0 or length < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            encoded = line.encode("utf-8")
+            chunks.append(encoded)
+            length += len(encoded)
+        data = b"".join(chunks)
+        if size < 0:
+            size = len(data)
+        self.leftover = data[size:]
+        return data[:size]
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_line(*values) -> str:
+    return "\t".join(copy_value(value) for value in values) + "\n"
+
+
+def paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(ANSWER_SENTENCES) for _ in range(sentences))
+
+
+def next_id(connection, table: str) -> int:
+    return connection.execute(text(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")).scalar()
+
+
+def copy_rows(connection, table: str, columns: List[str], lines: Iterator[str]):
+    started = time.perf_counter()
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", CopyStream(lines), size=1 << 20)
+        count = cursor.rowcount
+    finally:
+        cursor.close()
+    print(f"{table}: {count} rows in {time.perf_counter() - started:.1f}s")
+
+
+def user_lines(first_id: int, prefix: str, with_documents: List[bool]) -> Iterator[str]:
+    for offset, has_documents in enumerate(with_documents):
+        user_id = first_id + offset
+        status = "COMPLETED" if has_documents else "PENDING"
+        yield copy_line(
+            user_id, f"{prefix}-{user_id}", "password", "CANDIDATE",
+            f"/app/uploads/jd_resume/jd_resume/{user_id}/jd_jd.pdf" if has_documents else "",
+            f"/app/uploads/jd_resume/jd_resume/{user_id}/resume_resume.pdf" if has_documents else "",
+            status, status,
+        )
+
+
+def document_lines(rng: random.Random, first_user_id: int, with_documents: List[bool]) -> Iterator[str]:
+    for offset, has_documents in enumerate(with_documents):
+        if has_documents:
+            yield copy_line(first_user_id + offset, "jd", f"{DOCUMENT_TEXT} {paragraph(rng, 6)}")
+            yield copy_line(first_user_id + offset, "resume", f"{DOCUMENT_TEXT} {paragraph(rng, 12)}")
+
+
+def interview_status(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.85:
+        return "AI_EVALUATION_DONE"
+    return "DONE_ASKING_QUESTIONS" if roll < 0.9 else "NEW"
+
+
+def interview_lines(first_id: int, owners: List[int], statuses: List[str]) -> Iterator[str]:
+    # Scores and pass/fail are derived from the seeded answers afterwards, in seed()
+    for offset, (user_id, status) in enumerate(zip(owners, statuses)):
+        yield copy_line(first_id + offset, user_id, f"Interview {first_id + offset}", status, 0)
+
+
+def question_lines(
+    rng: random.Random, first_id: int, first_interview_id: int, owners: List[int],
+    statuses: List[str], counts: List[int],
+) -> Iterator[str]:
+    qa_id = first_id
+    for offset, (user_id, status, count) in enumerate(zip(owners, statuses, counts)):
+        interview_id = first_interview_id + offset
+        for question_id in range(1, count + 1):
+            question_text = rng.choice(QUESTION_TEMPLATES).format(rng.choice(QUESTION_TOPICS))
+            in_progress = status == "NEW" and question_id == count
+            evaluated = status == "AI_EVALUATION_DONE"
+            score = rng.randint(0, 10) if evaluated else None
+            yield copy_line(
+                qa_id, user_id, interview_id, question_id, question_text,
+                "NEW" if in_progress else "ANSWERED",
+                None if in_progress else paragraph(rng, rng.randint(3, 8)),
+                None if in_progress else f"/app/uploads/{user_id}/{interview_id}/{question_id}_audio.webm",
+                paragraph(rng, 3) if evaluated else None,
+                rng.choice(REMARKS) if evaluated else None,
+                score,
+                grade_score(score) if evaluated else None,
+            )
+            qa_id += 1
+
+
+def split_questions(rng: random.Random, interviews: int, questions: int) -> List[int]:
+    # Every interview has at least one question; the rest are spread unevenly
+    counts = [1] * interviews
+    for _ in range(max(0, questions - interviews)):
+        counts[rng.randrange(interviews)] += 1
+    return counts
+
+
+def seed(users: int, interviews: int, questions: int, seed_value: int, prefix: str, documents: float):
+    rng = random.Random(seed_value)
+    with engine.begin() as connection:
+        first_user_id = next_id(connection, "users")
+        first_interview_id = next_id(connection, "interviews")
+        first_qa_id = next_id(connection, "question_answers")
+
+        with_documents = [rng.random() < documents for _ in range(users)]
+        copy_rows(connection, "users", [
+            "id", "username", "password", "user_type", "jd_path", "resume_path", "jd_status", "resume_status",
+        ], user_lines(first_user_id, prefix, with_documents))
+        copy_rows(connection, "user_documents", ["user_id", "doc_type", "content"],
+                  document_lines(rng, first_user_id, with_documents))
+
+        owners = [first_user_id + rng.randrange(users) for _ in range(interviews)]
+        statuses = [interview_status(rng) for _ in range(interviews)]
+        copy_rows(connection, "interviews", [
+            "id", "user_id", "interview_name", "status", "context_version",
+        ], interview_lines(first_interview_id, owners, statuses))
+
+        counts = split_questions(rng, interviews, questions)
+        copy_rows(connection, "question_answers", [
+            "id", "user_id", "interview_id", "question_id", "question_text", "status", "answer_text",
+            "audio_recording_path", "ai_answer", "ai_remark", "candidate_score", "candidate_grade",
+        ], question_lines(rng, first_qa_id, first_interview_id, owners, statuses, counts))
+        # Scores, pass/fail (as performance_measure computes them) and the summary columns the
+        # worker maintains (shared/interview_summary.py), set-based for the seeded range
+        connection.execute(text("""
+            UPDATE interviews i
+            SET question_count = s.total,
+                answered_count = s.answered,
+                latest_grade = s.latest_grade,
+                score_in_percentage = s.percent::text,
+                score_percent = s.percent,
+                interview_cleared_by_candidate = CASE
+                    WHEN s.scored = 0 THEN NULL
+                    WHEN s.passed >= s.scored * :pass_threshold THEN 'Pass'
+                    ELSE 'Fail'
+                END
+            FROM (
+                SELECT interview_id,
+                       count(*) AS total,
+                       count(*) FILTER (WHERE coalesce(trim(answer_text), '') <> '') AS answered,
+                       (array_agg(candidate_grade ORDER BY id DESC))[1] AS latest_grade,
+                       count(candidate_score) AS scored,
+                       count(*) FILTER (WHERE candidate_score IS NOT NULL AND candidate_grade <> 'F') AS passed,
+                       round((sum(candidate_score) * 100.0 / nullif(count(candidate_score) * 10, 0))::numeric, 2) AS percent
+                FROM question_answers
+                WHERE interview_id >= :first_id
+                GROUP BY interview_id
+            ) s
+            WHERE s.interview_id = i.id
+        """), {"first_id": first_interview_id, "pass_threshold": PASS_THRESHOLD})
+
+        for table in ("users", "interviews", "question_answers"):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in ("users", "user_documents", "interviews", "question_answers"):
+            connection.execute(text(f"ANALYZE {table}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--interviews", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=5_000_000)
+    parser.add_argument("--documents", type=float, default=0.8, help="Share of users with a parsed JD and resume")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="seed", help="Username prefix")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.users, args.interviews, args.questions, args.seed, args.prefix, args.documents)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
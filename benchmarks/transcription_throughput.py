@@ -0,0 +1,64 @@
+"""
+Benchmark: audio decode/resample throughput of the worker's media process pool.
+
+Generates synthetic recordings and decodes them through worker.app.media_pool with
+1..N worker processes, printing files per second for each pool size. Throughput should
+grow roughly linearly until the pool size reaches the number of available cores.
+
+Usage:
+    python -m benchmarks.transcription_throughput --files 32 --seconds 60
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pydub.generators import Sine
+
+from worker.app import media_pool
+
+
+def make_recordings(directory: str, count: int, seconds: int):
+    # 48 kHz stereo, like a browser recording, so resampling does real work
+    tone = Sine(440, sample_rate=48000).to_audio_segment(duration=seconds * 1000).set_channels(2)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"answer_{i}.wav")
+        tone.export(path, format="wav")
+        paths.append(path)
+    return paths
+
+
+def run(paths, workers: int) -> float:
+    media_pool.resize(workers)
+    media_pool.warm_up()
+    started = time.perf_counter()
+    # Handler threads submit concurrently, as the worker lanes do
+    with ThreadPoolExecutor(max_workers=workers * 2) as threads:
+        list(threads.map(media_pool.decode_audio, paths))
+    return len(paths) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--seconds", type=int, default=30, help="Length of each synthetic recording")
+    parser.add_argument("--max-workers", type=int, default=media_pool.available_cores())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_recordings(directory, args.files, args.seconds)
+        baseline = None
+        print(f"{'workers':>8} {'files/s':>10} {'speedup':>8}")
+        for workers in sorted({1, 2, 4, 8, 16, args.max_workers}):
+            if workers > args.max_workers:
+                continue
+            throughput = run(paths, workers)
+            baseline = baseline or throughput
+            print(f"{workers:>8} {throughput:>10.2f} {throughput / baseline:>7.2f}x")
+    media_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,9 @@ import axios from "../../api";
 // Dummy user id for demo; replace with real user context
 // Get user id from localStorage (set after login)
 const USER_ID = JSON.parse(localStorage.getItem("user_data"))?.id;
+// While an answer is being recorded, upload the audio so far this often so the
+// worker can draft the next question before the answer is finished
+const SPECULATE_INTERVAL_MS = 15000;
 
 function useJDResumeStatus() {
   const [status, setStatus] = useState({ jd: false, resume: false, loading: true });
@@ -111,17 +114,18 @@ function useContinuousMultiMediaRecorder() {
       ...screenStream.getVideoTracks(),
     ]);
 
-    const startRecorder = (stream, type) => {
+    const startRecorder = (stream, type, timeslice) => {
       chunksRef.current[type] = [];
       const recorder = new MediaRecorder(stream);
       recorder.ondataavailable = (e) => {
         if (e.data.size > 0) chunksRef.current[type].push(e.data);
       };
-      recorder.start();
+      recorder.start(timeslice);
       recordersRef.current[type] = recorder;
     };
 
-    startRecorder(audioStream, "audio");
+    // Audio is flushed every second so a partial recording can be read while it runs
+    startRecorder(audioStream, "audio", 1000);
     startRecorder(cameraStream, "camera");
     startRecorder(screenStream, "screen");
     startRecorder(combinedStream, "combined");
@@ -162,9 +166,15 @@ function useContinuousMultiMediaRecorder() {
     return result;
   }, [stop]);
 
+  // Audio recorded so far, without stopping the recorder
+  const getPartialAudio = useCallback(
+    () => new Blob(chunksRef.current.audio, { type: "video/webm" }),
+    []
+  );
+
   useEffect(() => () => { stop(); }, [stop]);
 
-  return { start, stop, recording, getSegment };
+  return { start, stop, recording, getSegment, getPartialAudio };
 }
 
 export default function Interview() {
@@ -227,8 +237,28 @@ export default function Interview() {
     stop: stopContinuousMulti,
     recording: recordingContinuousMulti,
     getSegment: getSegmentContinuousMulti,
+    getPartialAudio,
   } = useContinuousMultiMediaRecorder();
 
+  // Periodically send the partial answer so the next question can be drafted speculatively
+  useEffect(() => {
+    if (!recordingContinuousMulti || !interviewId || !questions[currentIdx]) return undefined;
+    const questionId = questions[currentIdx].question_id;
+    const timer = setInterval(async () => {
+      const blob = getPartialAudio();
+      if (blob.size === 0) return;
+      const formData = new FormData();
+      formData.append("file", new File([blob], `${questionId}_partial_audio.webm`, { type: "video/webm" }));
+      try {
+        await axios.post(`/api/interview/partial_answer/${USER_ID}/${interviewId}/${questionId}`, formData);
+      } catch (err) {
+        console.warn(`[Interview] Partial answer upload failed:`, err);
+      }
+    }, SPECULATE_INTERVAL_MS);
+    return () => clearInterval(timer);
+    // eslint-disable-next-line
+  }, [recordingContinuousMulti, interviewId, currentIdx]);
+
   const handleStartInterview = async () => {
     setLoading(true);
     try {
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Runs once when the primary's data directory is initialised (docker-entrypoint-initdb.d):
+# lets the replica container stream WAL with the superuser credentials.
+set -e
+echo "host replication ${POSTGRES_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
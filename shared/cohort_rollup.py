@@ -0,0 +1,185 @@
+"""
+Cohort rollup: additive counts per (UTC creation day, interview status, JD) kept in
+cohort_rollups, so the admin dashboard sums a few rows per day instead of scanning every
+interview and answer ever recorded.
+
+Metrics (metric, bucket -> count, total):
+  interviews         ''            interviews
+  evaluated          ''            interviews with a score; total is the sum of score_percent
+  passed             ''            interviews cleared "Pass"
+  score              '0'..'9'      score_percent in tens (90-100 is '9')
+  grade              'A'..'F'      graded answers
+  answering_seconds  log bucket    created_at -> last_answered_at
+  evaluation_seconds log bucket    last_answered_at -> evaluated_at
+
+Durations are bucketed on a log scale (DURATION_BUCKETS_PER_E buckets per factor e), which
+keeps them additive; medians read from the buckets are within a few percent.
+
+refresh_cohort_rollup recomputes only the days that have interviews active since the last
+refresh (minus COHORT_ROLLUP_OVERLAP_SECONDS for transactions that committed late). The JD of
+an interview is its candidate's JD at refresh time. Answers of archived interviews are no
+longer in question_answers; their grades are counted from interviews.archived_grades.
+"""
+import math
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from .models import CohortRollup, RollupWatermark
+
+COHORT_ROLLUP_OVERLAP_SECONDS = int(os.getenv("COHORT_ROLLUP_OVERLAP_SECONDS", "300"))
+DURATION_BUCKETS_PER_E = 20
+WATERMARK = "cohort_rollups"
+
+_DAY = "((i.created_at AT TIME ZONE 'UTC')::date)"
+
+_REFRESH_SQL = f"""
+WITH scoped AS (
+    SELECT i.id,
+           {_DAY} AS day,
+           i.status,
+           md5(d.content) AS jd_digest,
+           i.score_percent,
+           i.interview_cleared_by_candidate AS cleared,
+           i.archived_grades,
+           extract(epoch FROM i.last_answered_at - i.created_at) AS answering_seconds,
+           extract(epoch FROM i.evaluated_at - i.last_answered_at) AS evaluation_seconds
+    FROM interviews i
+    LEFT JOIN user_documents d ON d.user_id = i.user_id AND d.doc_type = 'jd'
+    WHERE {{scope}}
+)
+INSERT INTO cohort_rollups (day, status, jd_digest, metric, bucket, count, total)
+SELECT day, status, jd_digest, 'interviews', '', count(*), 0
+FROM scoped GROUP BY day, status, jd_digest
+UNION ALL
+SELECT day, status, jd_digest, 'evaluated', '', count(*), sum(score_percent)
+FROM scoped WHERE score_percent IS NOT NULL GROUP BY day, status, jd_digest
+UNION ALL
+SELECT day, status, jd_digest, 'passed', '', count(*), 0
+FROM scoped WHERE cleared = 'Pass' GROUP BY day, status, jd_digest
+UNION ALL
+SELECT day, status, jd_digest, 'score', least(floor(score_percent / 10), 9)::int::text, count(*), sum(score_percent)
+FROM scoped WHERE score_percent IS NOT NULL GROUP BY 1, 2, 3, 5
+UNION ALL
+SELECT s.day, s.status, s.jd_digest, 'grade', qa.candidate_grade, count(*), coalesce(sum(qa.candidate_score), 0)
+FROM scoped s JOIN question_answers qa ON qa.interview_id = s.id
+WHERE qa.candidate_grade IS NOT NULL GROUP BY 1, 2, 3, 5
+UNION ALL
+SELECT s.day, s.status, s.jd_digest, 'grade', g.key, sum(g.value::int), 0
+FROM scoped s CROSS JOIN LATERAL jsonb_each_text(s.archived_grades) g
+GROUP BY 1, 2, 3, 5
+UNION ALL
+SELECT day, status, jd_digest, 'answering_seconds',
+       floor(:per_e * ln(1 + greatest(answering_seconds, 0)))::int::text, count(*), sum(answering_seconds)
+FROM scoped WHERE answering_seconds IS NOT NULL GROUP BY 1, 2, 3, 5
+UNION ALL
+SELECT day, status, jd_digest, 'evaluation_seconds',
+       floor(:per_e * ln(1 + greatest(evaluation_seconds, 0)))::int::text, count(*), sum(evaluation_seconds)
+FROM scoped WHERE evaluation_seconds IS NOT NULL GROUP BY 1, 2, 3, 5
+"""
+
+
+def refresh_cohort_rollup(db: Session, full: bool = False) -> bool:
+    """
+    Brings cohort_rollups up to date; everything is rebuilt when full or on the first run.
+    Returns False without doing anything if another refresh holds the lock. The caller commits.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": WATERMARK}).scalar():
+        return False
+    started = db.execute(text("SELECT now()")).scalar()
+    watermark = db.query(RollupWatermark).filter_by(name=WATERMARK).with_for_update().first()
+
+    if full or watermark is None:
+        db.query(CohortRollup).delete(synchronize_session=False)
+        db.execute(text(_REFRESH_SQL.format(scope="true")), {"per_e": DURATION_BUCKETS_PER_E})
+    else:
+        since = watermark.refreshed_at - timedelta(seconds=COHORT_ROLLUP_OVERLAP_SECONDS)
+        days = db.execute(
+            text(f"SELECT DISTINCT {_DAY} FROM interviews i "
+                 "WHERE greatest(i.created_at, i.last_answered_at, i.evaluated_at) >= :since"),
+            {"since": since},
+        ).scalars().all()
+        _recompute_days(db, days)
+
+    if watermark is None:
+        db.add(RollupWatermark(name=WATERMARK, refreshed_at=started))
+    else:
+        watermark.refreshed_at = started
+    return True
+
+
+def _recompute_days(db: Session, days: Iterable[Optional[date]]):
+    days = set(days)
+    if not days:
+        return
+    dated = [day for day in days if day is not None]
+    legacy = None in days
+    db.execute(
+        text("DELETE FROM cohort_rollups WHERE day = ANY(:days) OR (day IS NULL AND :legacy)"),
+        {"days": dated, "legacy": legacy},
+    )
+    db.execute(
+        text(_REFRESH_SQL.format(scope=f"({_DAY} = ANY(:days) OR (i.created_at IS NULL AND :legacy))")),
+        {"days": dated, "legacy": legacy, "per_e": DURATION_BUCKETS_PER_E},
+    )
+
+
+def refresh_cohort_days(db: Session, days: Iterable[Optional[date]]) -> bool:
+    """
+    Recomputes the rollup of the given UTC creation days (None for undated interviews),
+    e.g. after a re-grade that changed no activity timestamps. Returns False if another
+    refresh holds the lock. The caller commits.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": WATERMARK}).scalar():
+        return False
+    _recompute_days(db, days)
+    return True
+
+
+def rollup_age_seconds(db: Session) -> Optional[float]:
+    """
+    Seconds since the last refresh started, or None if the rollup was never built.
+    """
+    return db.execute(
+        text("SELECT extract(epoch FROM now() - refreshed_at) FROM rollup_watermarks WHERE name = :name"),
+        {"name": WATERMARK},
+    ).scalar()
+
+
+def duration_bucket_seconds(bucket: int) -> float:
+    """
+    Midpoint of a log-scale duration bucket, in seconds.
+    """
+    return math.exp((bucket + 0.5) / DURATION_BUCKETS_PER_E) - 1
+
+
+def median_from_buckets(counts: Dict[int, int]) -> Optional[float]:
+    total = sum(counts.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(counts):
+        seen += counts[bucket]
+        if seen * 2 >= total:
+            return round(duration_bucket_seconds(bucket), 1)
+    return None
+
+
+def cohort_totals(db: Session, filters: List) -> Dict[str, Dict[str, tuple]]:
+    """
+    Sums cohort_rollups under filters (SQLAlchemy conditions on CohortRollup) into
+    {metric: {bucket: (count, total)}} with one GROUP BY.
+    """
+    rows = (
+        db.query(CohortRollup.metric, CohortRollup.bucket, func.sum(CohortRollup.count), func.sum(CohortRollup.total))
+        .filter(*filters)
+        .group_by(CohortRollup.metric, CohortRollup.bucket)
+        .all()
+    )
+    totals: Dict[str, Dict[str, tuple]] = {}
+    for metric, bucket, count, total in rows:
+        totals.setdefault(metric, {})[bucket] = (int(count), float(total or 0))
+    return totals
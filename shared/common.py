@@ -1,16 +1,17 @@
 import uuid
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
 from pydantic import BaseModel
 from typing import Optional, Dict, Union
 import logging
-from azure.servicebus import ServiceBusClient,ServiceBusMessage
 
 
 SERVICE_BUS_CONNECTION_STR = os.getenv("SERVICE_BUS_CONNECTION_STR")
 TOPIC_NAME = os.getenv("TOPIC_NAME")
 SUBSCRIPTION_NAME = os.getenv("SUBSCRIPTION_NAME")
+# "azure", or "local" for the in-process stand-in in shared/local_queue.py
+SERVICE_BUS_BACKEND = os.getenv("SERVICE_BUS_BACKEND", "azure")
 
 logger = logging.getLogger("servicebus")
 logger.setLevel(logging.INFO)
@@ -23,7 +24,13 @@ class QuestionProcessPayload(BaseModel):
     interview_id: int
     question_id: int
 
-ServiceBusMessagePayload = Union[FileProcessPayload, QuestionProcessPayload]
+class SpeculationPayload(BaseModel):
+    interview_id: int
+    question_id: int
+    audio_path: str
+
+# SpeculationPayload precedes QuestionProcessPayload, whose fields it extends
+ServiceBusMessagePayload = Union[FileProcessPayload, SpeculationPayload, QuestionProcessPayload]
 
 class ServiceBusMessageModel(BaseModel):
     correlationId: str
@@ -33,18 +40,58 @@ class ServiceBusMessageModel(BaseModel):
     timestamp: str
     status: str
     payload: ServiceBusMessagePayload
+    attempt: int = 0  # delivery attempts so far; bumped by the worker on every retry
+
+def get_service_bus_client():
+    # The Service Bus SDK is imported on first use so importing this module stays cheap
+    if SERVICE_BUS_BACKEND == "local":
+        from shared.local_queue import LocalServiceBusClient
+        return LocalServiceBusClient()
+    from azure.servicebus import ServiceBusClient
+    return ServiceBusClient.from_connection_string(conn_str=SERVICE_BUS_CONNECTION_STR)
+
+def get_lock_renewer(max_lock_renewal_duration: float):
+    if SERVICE_BUS_BACKEND == "local":
+        from shared.local_queue import LocalLockRenewer
+        return LocalLockRenewer()
+    from azure.servicebus import AutoLockRenewer
+    return AutoLockRenewer(max_lock_renewal_duration=max_lock_renewal_duration)
+
+def build_service_bus_message(message: dict):
+    if SERVICE_BUS_BACKEND == "local":
+        from shared.local_queue import LocalMessage as ServiceBusMessage
+    else:
+        from azure.servicebus import ServiceBusMessage
+
+    # action_type is also set as a property so lane subscriptions can filter on it
+    return ServiceBusMessage(
+        json.dumps(message),
+        correlation_id=message.get("correlationId"),
+        application_properties={"action_type": message.get("action_type")},
+    )
+
+def schedule_message_to_service_bus(message: dict, delay_seconds: float):
+    """
+    Enqueues message to become visible after delay_seconds. Unlike
+    send_message_to_service_bus this raises on failure, so a caller that is retrying
+    a message can keep the original until the retry is safely scheduled.
+    """
+    enqueue_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    servicebus_client = get_service_bus_client()
+    with servicebus_client, servicebus_client.get_topic_sender(topic_name=TOPIC_NAME) as sender:
+        sender.schedule_messages(build_service_bus_message(message), enqueue_at)
+    logger.info(f"Scheduled {message.get('action_type')} message {message.get('correlationId')} for {enqueue_at.isoformat()}")
 
 def send_message_to_service_bus(message: dict):
     logger.info("Preparing to send message to Azure Service Bus.")
     try:
-        servicebus_client = ServiceBusClient.from_connection_string(conn_str=SERVICE_BUS_CONNECTION_STR)
+        servicebus_client = get_service_bus_client()
         logger.debug("ServiceBusClient created.")
         sender = servicebus_client.get_topic_sender(topic_name=TOPIC_NAME)
         logger.debug(f"Topic sender created for topic: {TOPIC_NAME}")
         
-        json_msg = json.dumps(message)
-        logger.debug(f"Message serialized to JSON: {json_msg}")
-        service_bus_message = ServiceBusMessage(json_msg)  # This is Azure's ServiceBusMessage
+        service_bus_message = build_service_bus_message(message)  # This is Azure's ServiceBusMessage
+        logger.debug(f"Message serialized to JSON: {str(service_bus_message)}")
         
         with sender:
             sender.send_messages(service_bus_message)
@@ -0,0 +1,41 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from .models import Interview
+
+
+def bump_interview_version(db: Session, interview_id: int) -> int:
+    """
+    Increments the interview's context_version and returns the new value. The turns are
+    part of the interview details too, so details_version is bumped with it. The caller commits.
+    """
+    return db.execute(
+        update(Interview)
+        .where(Interview.id == interview_id)
+        .values(context_version=Interview.context_version + 1, details_version=Interview.details_version + 1)
+        .returning(Interview.context_version)
+    ).scalar_one()
+
+
+def bump_details_version(db: Session, interview_id: int):
+    """
+    Marks what interview_details returns (status, scores, grades) as changed without
+    touching the prompt context. The caller commits.
+    """
+    db.execute(
+        update(Interview)
+        .where(Interview.id == interview_id)
+        .values(details_version=Interview.details_version + 1)
+    )
+
+
+def bump_user_interview_versions(db: Session, user_id: int):
+    """
+    Invalidates the context of every interview of a user, e.g. after their JD or resume
+    changed. The caller commits.
+    """
+    db.execute(
+        update(Interview)
+        .where(Interview.user_id == user_id)
+        .values(context_version=Interview.context_version + 1)
+    )
@@ -1,13 +1,115 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import itertools
 import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional
 from dotenv import load_dotenv
+from shared.logger import logger
 
 load_dotenv()  # Load environment variables from .env file
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Comma-separated URLs of streaming replicas that read-only endpoints may use
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+# A replica further behind than this is skipped until it catches up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "2"))
+# A replica whose WAL receiver heard nothing from the primary for this long is disconnected.
+# Idle primaries send keepalives every wal_sender_timeout / 2 (30s by default).
+REPLICA_RECEIVER_TIMEOUT_SECONDS = float(os.getenv("REPLICA_RECEIVER_TIMEOUT_SECONDS", "60"))
+# Reads about an interview or user written through this process stay on the primary this long
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+replica_engines = [
+    create_engine(url, pool_pre_ping=True, connect_args={"connect_timeout": 2}) for url in REPLICA_DATABASE_URLS
+]
+
+# Path/query parameters that identify whose data a request reads or writes
+STICKY_IDS = ("interview_id", "user_id")
+
+# Received == replayed only means no lag if WAL is still being received: a replica whose
+# receiver is down or silent reports infinite lag. Reading pg_stat_wal_receiver's status
+# needs superuser or pg_read_all_stats; without it the replica is never used.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming' "
+    "AND last_msg_receipt_time > now() - make_interval(secs => :receiver_timeout)) THEN 'Infinity'::float8 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_lock = threading.Lock()
+_replica_lag: Dict[int, tuple] = {}      # replica index -> (lag seconds or None if unreachable, checked_at)
+_recent_writes: Dict[str, float] = {}    # sticky key -> time of the last write
+_next_replica = itertools.count()
+
+
+def _sticky_keys(ids: Mapping) -> List[str]:
+    return [f"{name}:{ids[name]}" for name in STICKY_IDS if ids.get(name) is not None]
+
+
+def record_write(**ids):
+    """
+    Call after committing a write about an interview or user (record_write(interview_id=...,
+    user_id=...)) so the following reads about them go to the primary until replicas catch up.
+    """
+    if not replica_engines:
+        return
+    now = time.time()
+    with _lock:
+        for key in _sticky_keys(ids):
+            _recent_writes[key] = now
+        if len(_recent_writes) > 10000:
+            for key, written_at in list(_recent_writes.items()):
+                if now - written_at > READ_YOUR_WRITES_SECONDS:
+                    del _recent_writes[key]
+
+
+def _replica_lag_seconds(index: int) -> Optional[float]:
+    now = time.time()
+    with _lock:
+        lag, checked_at = _replica_lag.get(index, (None, 0.0))
+    if now - checked_at < REPLICA_LAG_CHECK_SECONDS:
+        return lag
+    try:
+        with replica_engines[index].connect() as connection:
+            lag = float(connection.execute(REPLICA_LAG_QUERY, {"receiver_timeout": REPLICA_RECEIVER_TIMEOUT_SECONDS}).scalar())
+    except Exception as e:
+        logger.warning(f"Replica {index} is unreachable, reading from the primary: {e}")
+        lag = None
+    with _lock:
+        _replica_lag[index] = (lag, now)
+    return lag
+
+
+def _read_engine(ids: Mapping):
+    if not replica_engines:
+        return engine
+    now = time.time()
+    with _lock:
+        for key in _sticky_keys(ids):
+            if now - _recent_writes.get(key, 0.0) < READ_YOUR_WRITES_SECONDS:
+                return engine
+    start = next(_next_replica)
+    for offset in range(len(replica_engines)):
+        index = (start + offset) % len(replica_engines)
+        lag = _replica_lag_seconds(index)
+        if lag is not None and lag <= REPLICA_MAX_LAG_SECONDS:
+            return replica_engines[index]
+    return engine
+
+
+def ReadSessionLocal(ids: Optional[Mapping] = None):
+    """
+    Session for read-only work: on a healthy replica (round robin) unless none is
+    configured, all lag more than REPLICA_MAX_LAG_SECONDS, or ids (e.g. the request's path
+    parameters) name an interview or user written here in the last READ_YOUR_WRITES_SECONDS.
+    """
+    return SessionLocal(bind=_read_engine(ids or {}))
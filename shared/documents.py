@@ -0,0 +1,50 @@
+"""
+Extracted JD and resume text, kept in user_documents rather than on users so logins,
+signups and every interview.user access load a small row. Only the code that needs the
+text (prompt builders, preview, matching) reads it, through these helpers.
+"""
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .models import UserDocument
+
+DOC_TYPES = ("jd", "resume")
+
+
+def get_document_text(db: Session, user_id: int, doc_type: str) -> Optional[str]:
+    row = db.query(UserDocument.content).filter_by(user_id=user_id, doc_type=doc_type).first()
+    return row.content if row else None
+
+
+def get_document_stamp(db: Session, user_id: int, doc_type: str) -> Optional[Tuple[int, int]]:
+    """
+    (row id, version) of a user's document without loading its text, for cache validation.
+    """
+    row = db.query(UserDocument.id, UserDocument.version).filter_by(user_id=user_id, doc_type=doc_type).first()
+    return (row.id, row.version) if row else None
+
+
+def get_document_texts(db: Session, user_id: int) -> Dict[str, str]:
+    """
+    Both of a user's documents in one query, keyed by doc_type; missing ones are absent.
+    """
+    return dict(db.query(UserDocument.doc_type, UserDocument.content).filter_by(user_id=user_id).all())
+
+
+def set_document_text(db: Session, user_id: int, doc_type: str, content: Optional[str]):
+    """
+    Stores the text of a user's JD or resume, or removes it when content is empty.
+    The caller commits.
+    """
+    row = db.query(UserDocument).filter_by(user_id=user_id, doc_type=doc_type).first()
+    if not content:
+        if row:
+            db.delete(row)
+        return
+    if not row:
+        row = UserDocument(user_id=user_id, doc_type=doc_type, version=1)
+        db.add(row)
+    elif row.content != content:
+        row.version += 1
+    row.content = content
@@ -0,0 +1,34 @@
+"""
+Cold storage for finished interviews. worker/app/archive.py writes an interview's question
+answers to ARCHIVE_DIR as gzipped JSON (the same fields interview_details returns), records
+the file in interviews.archive_path and deletes the rows, so old answers leave the hot
+question_answers partitions and their indexes. interview_details reads the file back.
+"""
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "/app/archive")
+
+
+def archive_path_for(interview_id: int, created_at: datetime = None) -> str:
+    month = created_at.strftime("%Y/%m") if created_at else "undated"
+    return os.path.join(ARCHIVE_DIR, month, f"interview_{interview_id}.json.gz")
+
+
+def write_archive(path: str, questions: List[Dict]):
+    """
+    Written to a temporary file and renamed, so a reader never sees a partial archive.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+    with gzip.open(partial, "wt", encoding="utf-8") as f:
+        json.dump(questions, f)
+    os.replace(partial, path)
+
+
+def read_archive(path: str) -> List[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,37 @@
+"""
+Denormalized per-interview summary (question/answer counts, latest grade, timestamps,
+numeric score) kept on the interviews row so listings read a single table.
+
+refresh_interview_summary recounts from question_answers with one UPDATE, so it is exact
+whatever wrote before it. Call it in the same transaction as the change; the caller commits.
+"""
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from .models import Interview, QuestionAnswer
+
+
+def refresh_interview_summary(db: Session, interview_id: int, **values):
+    """
+    values sets further summary columns in the same statement, e.g. last_answered_at=func.now().
+    Pending changes are flushed first so the counts include them.
+    """
+    interview_id = int(interview_id)
+    db.flush()
+    of_interview = QuestionAnswer.interview_id == interview_id
+    db.execute(
+        update(Interview)
+        .where(Interview.id == interview_id)
+        .values(
+            question_count=select(func.count()).where(of_interview).scalar_subquery(),
+            answered_count=select(func.count())
+            .where(of_interview, func.coalesce(func.trim(QuestionAnswer.answer_text), "") != "")
+            .scalar_subquery(),
+            latest_grade=select(QuestionAnswer.candidate_grade)
+            .where(of_interview)
+            .order_by(QuestionAnswer.id.desc())
+            .limit(1)
+            .scalar_subquery(),
+            **values,
+        )
+    )
@@ -0,0 +1,157 @@
+"""
+In-process stand-in for the Azure Service Bus topic, selected with SERVICE_BUS_BACKEND=local.
+
+Implements the part of the azure.servicebus client API the backend and worker use:
+sending and scheduling messages on a topic, and peek-lock receiving, completing and
+abandoning them on a subscription. Every subscription gets every message (there are no
+SQL filters, so dedicated lane subscriptions should not be configured), and messages
+published before any receiver exists are kept for the first subscription. Producer and
+consumer must share a process, as in benchmarks/load_test.py.
+"""
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+class LocalMessage:
+    def __init__(self, body: str, correlation_id: Optional[str] = None, application_properties: Optional[Dict] = None):
+        self.body = body
+        self.correlation_id = correlation_id
+        self.application_properties = application_properties or {}
+        self.message_id = uuid.uuid4().hex
+        self.enqueued_time_utc: Optional[datetime] = None
+        self.delivery_count = 0
+
+    def __str__(self):
+        return self.body
+
+
+class LocalTopic:
+    def __init__(self, name: str):
+        self.name = name
+        self.condition = threading.Condition()
+        self.subscriptions: Dict[str, deque] = {}
+        self.unclaimed: deque = deque()
+        self.scheduled: List = []  # heap of (due, sequence, message)
+        self.sequence = itertools.count()
+
+    def subscription(self, name: str) -> deque:
+        with self.condition:
+            if name not in self.subscriptions:
+                self.subscriptions[name] = deque() if self.subscriptions else self.unclaimed
+            return self.subscriptions[name]
+
+    def publish(self, message: LocalMessage, due: Optional[float] = None):
+        with self.condition:
+            if due and due > time.time():
+                heapq.heappush(self.scheduled, (due, next(self.sequence), message))
+            else:
+                self._enqueue(message)
+            self.condition.notify_all()
+
+    def _enqueue(self, message: LocalMessage):
+        message.enqueued_time_utc = datetime.now(timezone.utc)
+        for queue in (self.subscriptions.values() if self.subscriptions else [self.unclaimed]):
+            queue.append(message)
+
+    def _release_due(self):
+        now = time.time()
+        while self.scheduled and self.scheduled[0][0] <= now:
+            self._enqueue(heapq.heappop(self.scheduled)[2])
+
+    def receive(self, subscription: str, max_message_count: int, max_wait_time: float) -> List[LocalMessage]:
+        queue = self.subscription(subscription)
+        deadline = time.time() + (max_wait_time or 0)
+        with self.condition:
+            while True:
+                self._release_due()
+                if queue:
+                    messages = [queue.popleft() for _ in range(min(max_message_count, len(queue)))]
+                    for message in messages:
+                        message.delivery_count += 1
+                    return messages
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return []
+                if self.scheduled:
+                    remaining = min(remaining, max(0.0, self.scheduled[0][0] - time.time()))
+                self.condition.wait(remaining)
+
+    def abandon(self, subscription: str, message: LocalMessage):
+        with self.condition:
+            self.subscription(subscription).appendleft(message)
+            self.condition.notify_all()
+
+
+_topics_lock = threading.Lock()
+_topics: Dict[str, LocalTopic] = {}
+
+
+def get_topic(name: str) -> LocalTopic:
+    with _topics_lock:
+        if name not in _topics:
+            _topics[name] = LocalTopic(name)
+        return _topics[name]
+
+
+class _Closable:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def close(self):
+        pass
+
+
+class LocalSender(_Closable):
+    def __init__(self, topic: LocalTopic):
+        self.topic = topic
+
+    def send_messages(self, message: LocalMessage):
+        self.topic.publish(message)
+
+    def schedule_messages(self, message: LocalMessage, schedule_time_utc: datetime):
+        self.topic.publish(message, due=schedule_time_utc.timestamp())
+
+
+class LocalReceiver(_Closable):
+    def __init__(self, topic: LocalTopic, subscription_name: str):
+        self.topic = topic
+        self.subscription_name = subscription_name
+        topic.subscription(subscription_name)
+
+    def receive_messages(self, max_message_count: int = 1, max_wait_time: Optional[float] = None) -> List[LocalMessage]:
+        return self.topic.receive(self.subscription_name, max_message_count, max_wait_time)
+
+    def complete_message(self, message: LocalMessage):
+        pass
+
+    def abandon_message(self, message: LocalMessage):
+        self.topic.abandon(self.subscription_name, message)
+
+
+class LocalServiceBusClient(_Closable):
+    def get_topic_sender(self, topic_name: str) -> LocalSender:
+        return LocalSender(get_topic(topic_name))
+
+    def get_subscription_receiver(self, topic_name: str, subscription_name: str, **kwargs) -> LocalReceiver:
+        return LocalReceiver(get_topic(topic_name), subscription_name)
+
+
+class LocalLockRenewer(_Closable):
+    """
+    Local messages never lose their lock, so there is nothing to renew.
+    """
+
+    def __init__(self, **kwargs):
+        pass
+
+    def register(self, receiver, message, **kwargs):
+        pass
@@ -0,0 +1,147 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .models import DocumentVector
+from .logger import logger
+
+# Terms are hashed into a fixed space so vectors never need a shared vocabulary
+HASH_BITS = 20
+HASH_MASK = (1 << HASH_BITS) - 1
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just may me more most must my no nor not now of off on once
+only or other our ours out over own per same she should so some such than that the their theirs them then
+there these they this those through to too under until up upon us very via was we well were what when where
+which while who whom why will with within without would you your yours
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall((text or "").lower()) if token not in STOP_WORDS]
+
+
+def term_index(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) & HASH_MASK
+
+
+def vectorize(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turns text into a sparse, sublinear term-frequency vector.
+    Returns (sorted unique int32 term indices, float32 weights).
+    """
+    indices = np.fromiter((term_index(t) for t in tokenize(text)), dtype=np.int32)
+    if indices.size == 0:
+        return indices, np.zeros(0, dtype=np.float32)
+    unique, counts = np.unique(indices, return_counts=True)
+    weights = (1.0 + np.log(counts)).astype(np.float32)
+    return unique.astype(np.int32), weights
+
+
+def upsert_document_vector(db: Session, user_id: int, doc_type: str, text: Optional[str]):
+    """
+    Stores the compact vector for a user's JD or resume. The caller commits.
+    """
+    row = db.query(DocumentVector).filter_by(user_id=user_id, doc_type=doc_type).first()
+    if not text:
+        if row:
+            db.delete(row)
+        return
+    indices, weights = vectorize(text)
+    if not row:
+        row = DocumentVector(user_id=user_id, doc_type=doc_type)
+        db.add(row)
+    row.term_indices = indices.tobytes()
+    row.term_weights = weights.tobytes()
+    row.term_count = int(indices.size)
+
+
+def rank_documents(
+    query_text: str,
+    documents: Sequence[Tuple[int, bytes, bytes]],
+    top_k: int = 10,
+    explain_terms: int = 8,
+) -> List[Dict]:
+    """
+    Scores every stored document against the query in one pass and returns the top_k that
+    match it at all (score above 0).
+
+    documents is a sequence of (key, term_indices bytes, term_weights bytes) as stored in
+    DocumentVector. IDF is computed over the candidate set itself, so weights adapt to the
+    pool being ranked. Scores are TF-IDF cosine similarities in [0, 1].
+    """
+    query_terms = tokenize(query_text)
+    query_indices, query_weights = vectorize(query_text)
+    if not documents or query_indices.size == 0:
+        return []
+
+    keys = np.array([key for key, _, _ in documents])
+    doc_indices = [np.frombuffer(indices, dtype=np.int32) for _, indices, _ in documents]
+    doc_weights = [np.frombuffer(weights, dtype=np.float32) for _, _, weights in documents]
+    lengths = np.array([indices.size for indices in doc_indices])
+    n_docs = len(documents)
+
+    # Flatten the corpus into COO form: one entry per (document, term)
+    rows = np.repeat(np.arange(n_docs), lengths)
+    cols = np.concatenate(doc_indices) if lengths.sum() else np.zeros(0, dtype=np.int32)
+    vals = np.concatenate(doc_weights).astype(np.float64) if lengths.sum() else np.zeros(0)
+
+    terms, inverse, df = np.unique(cols, return_inverse=True, return_counts=True)
+    if terms.size == 0:
+        # No document has any term, so nothing can match
+        return []
+    idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+    tfidf = vals * idf[inverse]
+    doc_norms = np.sqrt(np.bincount(rows, weights=tfidf ** 2, minlength=n_docs))
+
+    # Query weights use the corpus IDF; unseen terms get the maximum IDF
+    query_idf = np.full(query_indices.size, np.log(1.0 + n_docs) + 1.0)
+    seen = np.searchsorted(terms, query_indices)
+    seen_mask = (seen < terms.size) & (terms[np.minimum(seen, terms.size - 1)] == query_indices)
+    query_idf[seen_mask] = idf[seen[seen_mask]]
+    query_tfidf = query_weights * query_idf
+    query_norm = np.sqrt(np.sum(query_tfidf ** 2))
+
+    # Dot products: align every corpus entry with the (sorted) query terms
+    position = np.searchsorted(query_indices, cols)
+    position = np.minimum(position, query_indices.size - 1)
+    matches = query_indices[position] == cols
+    contributions = tfidf[matches] * query_tfidf[position[matches]]
+    dots = np.bincount(rows[matches], weights=contributions, minlength=n_docs)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(doc_norms > 0, dots / (doc_norms * query_norm), 0.0)
+
+    top_k = min(top_k, n_docs)
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    # Documents sharing no term with the query are not matches
+    top = top[scores[top] > 0]
+
+    # Map hashed indices back to readable terms from the query for explanations
+    index_terms = {}
+    for term in query_terms:
+        index_terms.setdefault(term_index(term), term)
+
+    results = []
+    match_rows = rows[matches]
+    match_cols = cols[matches]
+    for doc in top:
+        doc_mask = match_rows == doc
+        doc_terms = match_cols[doc_mask]
+        doc_contrib = contributions[doc_mask]
+        order = np.argsort(-doc_contrib)[:explain_terms]
+        results.append({
+            "key": keys[doc].item(),
+            "score": float(scores[doc]),
+            "matched_terms": [index_terms.get(int(doc_terms[i]), "") for i in order],
+        })
+    logger.debug(f"Ranked {n_docs} documents against query with {query_indices.size} terms")
+    return results
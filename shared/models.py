@@ -1,10 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Float
+from sqlalchemy import DDL, event
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Float, Computed, Index, LargeBinary, UniqueConstraint, Enum, text, DateTime, Date
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from .database import Base
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+# Allowed values of the status columns, stored as native Postgres enums
+INTERVIEW_STATUSES = ("Active", "NEW", "DONE_ASKING_QUESTIONS", "AI_EVALUATION_DONE")
+QUESTION_STATUSES = ("NEW", "ATTEMPTED", "Answer_Audio_Extracted", "ANSWERED")
+DOCUMENT_STATUSES = ("PENDING", "PROCESSING", "COMPLETED", "FAILED", "NOT_AVAILABLE")
+MESSAGE_STATUSES = ("IN_PROGRESS", "DONE", "FAILED")
+DRAFT_STATUSES = ("READY", "USED", "DISCARDED")
+document_status = Enum(*DOCUMENT_STATUSES, name="document_status")
+interview_status = Enum(*INTERVIEW_STATUSES, name="interview_status")
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -14,29 +25,54 @@ class User(Base):
     interviews = relationship("Interview", back_populates="user")
     jd_path = Column(String, nullable=True)
     resume_path = Column(String, nullable=True)
-    jd_text = Column(Text, nullable=True)             # <-- Add this line
-    resume_text = Column(Text, nullable=True)         # <-- Add this line
-    jd_status = Column(String, default="PENDING")     # <-- Add this line
-    resume_status = Column(String, default="PENDING") # <-- Add this line
+    jd_status = Column(document_status, default="PENDING")
+    resume_status = Column(document_status, default="PENDING")
+    # The extracted JD/resume text lives in user_documents (see shared/documents.py)
 
 class Interview(Base):
     __tablename__ = "interviews"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     interview_name = Column(String)
     user = relationship("User", back_populates="interviews")
     score_in_percentage = Column(String)
     interview_cleared_by_candidate  = Column(String)
-    status = Column(String, default="Active") 
+    status = Column(interview_status, default="Active")
+    # Bumped whenever the prompt context changes (turns, JD/resume), so worker caches can revalidate
+    context_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever anything interview_details returns changes, for ETag revalidation
+    details_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Summary maintained by the worker (shared/interview_summary.py) so listings read one table
+    score_percent = Column(Float, nullable=True)
+    latest_grade = Column(String, nullable=True)
+    question_count = Column(Integer, nullable=False, default=0, server_default="0")
+    answered_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), nullable=True, server_default=text("now()"))
+    last_answered_at = Column(DateTime(timezone=True), nullable=True)
+    evaluated_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)      # when the last question was asked
+    # Set once worker/app/archive.py has moved the question answers to a gzipped JSON file
+    archive_path = Column(String, nullable=True)
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    # Answer grade counts of an archived interview ({"A": 2, ...}), for the cohort rollup
+    archived_grades = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        # A user's listing sorted or filtered by score, straight off the index
+        Index("ix_interviews_user_score", "user_id", "score_percent"),
+        # UTC creation day and last activity, for the incremental cohort rollup refresh
+        Index("ix_interviews_created_day", text("((created_at AT TIME ZONE 'UTC')::date)")),
+        Index("ix_interviews_last_activity", text("(greatest(created_at, last_answered_at, evaluated_at))")),
+    )
 
 class QuestionAnswer(Base):
     __tablename__ = "question_answers"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     interview_id = Column(Integer, ForeignKey("interviews.id"))
     question_id = Column(Integer)
     question_text = Column(Text)
-    status = Column(String, default="NEW")
+    status = Column(Enum(*QUESTION_STATUSES, name="question_status"), default="NEW")
     answer_text = Column(Text, nullable=True)
     camera_recording_path = Column(String, nullable=True)
     screen_recording_path = Column(String, nullable=True)
@@ -46,5 +82,145 @@ class QuestionAnswer(Base):
     ai_remark = Column(Text, nullable=True)
     candidate_score = Column(Float, nullable=True)
     candidate_grade = Column(String, nullable=True)
+    # Full-text search document over question, transcript and remark, maintained by Postgres
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(question_text, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(answer_text, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(ai_remark, '')), 'C')",
+            persisted=True,
+        ),
+    )
+    # Partition key: the table is partitioned by month on created_at, so its primary key in
+    # the database is (id, created_at). id alone stays unique through the sequence and is
+    # the ORM identity.
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=text("now()"))
+    __mapper_args__ = {"primary_key": [id]}
+
+    __table_args__ = (
+        Index("ix_question_answers_search_vector", "search_vector", postgresql_using="gin"),
+        # Turn lookups by the worker: filter_by(interview_id, question_id)
+        Index("ix_question_answers_interview_question", "interview_id", "question_id"),
+        # more_questions: the NEW questions of a user's interview
+        Index("ix_question_answers_user_interview_status", "user_id", "interview_id", "status"),
+        # Latest answer of an interview (ORDER BY id DESC); the grade is read from the index alone
+        Index("ix_question_answers_interview_latest", "interview_id", "id", postgresql_include=["candidate_grade"]),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+# Monthly partitions are created by worker/app/archive.py; the default partition takes
+# anything outside them (and everything in schemas made by create_all)
+event.listen(
+    QuestionAnswer.__table__, "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS question_answers_default PARTITION OF question_answers DEFAULT"),
+)
+
+
+class UserDocument(Base):
+    __tablename__ = "user_documents"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    doc_type = Column(String, nullable=False)          # "jd" or "resume"
+    content = Column(Text, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every content change
+    # Full-text search document, maintained by Postgres on every write
+    search_vector = Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', coalesce(content, ''))", persisted=True),
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "doc_type", name="uq_user_documents_user_doc_type"),
+        Index(
+            "ix_user_documents_resume_search_vector", "search_vector",
+            postgresql_using="gin", postgresql_where=text("doc_type = 'resume'"),
+        ),
+        # JD matching for the admin cohort filter
+        Index(
+            "ix_user_documents_jd_search_vector", "search_vector",
+            postgresql_using="gin", postgresql_where=text("doc_type = 'jd'"),
+        ),
+    )
+
+
+class DocumentVector(Base):
+    __tablename__ = "document_vectors"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    doc_type = Column(String, nullable=False)          # "jd" or "resume"
+    term_indices = Column(LargeBinary, nullable=False) # sorted int32 hashed term ids
+    term_weights = Column(LargeBinary, nullable=False) # float32 sublinear term frequencies
+    term_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "doc_type", name="uq_document_vectors_user_doc_type"),
+    )
+
+
+class LLMRateLimit(Base):
+    __tablename__ = "llm_rate_limits"
+    name = Column(String, primary_key=True)  # "<model>:requests" or "<model>:tokens"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False) # epoch seconds of the last refill
+
+class ProcessedMessage(Base):
+    __tablename__ = "processed_messages"
+    correlation_id = Column(String, primary_key=True)
+    action_type = Column(String, nullable=True)
+    status = Column(Enum(*MESSAGE_STATUSES, name="message_status"), nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    claimed_at = Column(Float, nullable=False)        # epoch seconds; a stale claim can be taken over
+    completed_at = Column(Float, nullable=True)
+
+class DeadLetter(Base):
+    __tablename__ = "dead_letters"
+    id = Column(Integer, primary_key=True, index=True)
+    correlation_id = Column(String, index=True, nullable=True)
+    action_type = Column(String, nullable=True)
+    session_id = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False)
+    error = Column(Text, nullable=True)
+    body = Column(Text, nullable=False)               # the message envelope as last delivered
+    dead_lettered_at = Column(Float, nullable=False)
+    replayed_at = Column(Float, nullable=True)
+
+class SpeculativeDraft(Base):
+    __tablename__ = "speculative_drafts"
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False)
+    question_id = Column(Integer, nullable=False)          # the question being answered
+    partial_answer = Column(Text, nullable=False)
+    draft_question = Column(Text, nullable=False)
+    context_version = Column(Integer, nullable=False)      # interviews.context_version when drafted
+    generation_seconds = Column(Float, nullable=False)
+    status = Column(Enum(*DRAFT_STATUSES, name="draft_status"), nullable=False, default="READY")
+    coverage = Column(Float, nullable=True)                # share of the final answer's terms in the partial
+    created_at = Column(Float, nullable=False)
+    resolved_at = Column(Float, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("interview_id", "question_id", name="uq_speculative_drafts_interview_question"),
+    )
+
+# Additive per-day counts behind the admin cohort dashboard (shared/cohort_rollup.py): one row per
+# (UTC creation day, status, JD, metric, bucket). day is NULL for interviews older than created_at.
+class CohortRollup(Base):
+    __tablename__ = "cohort_rollups"
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=True)
+    status = Column(interview_status, nullable=True)
+    jd_digest = Column(String(32), nullable=True)          # md5 of the candidate's JD text
+    metric = Column(String, nullable=False)
+    bucket = Column(String, nullable=False, default="")
+    count = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False, default=0)
 
+    __table_args__ = (
+        Index("ix_cohort_rollups_day_status", "day", "status"),
+    )
 
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+    name = Column(String, primary_key=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)   # database time the refresh started
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
@@ -26,7 +26,7 @@ class QuestionAnswerUpdate(BaseModel):
     screen_recording_path: Optional[str] = None
     audio_recording_path: Optional[str] = None
     combined_recording_path: Optional[str] = None
-    status: Optional[str] = None
+    status: Optional[Literal["NEW", "ATTEMPTED", "Answer_Audio_Extracted", "ANSWERED"]] = None
     ai_answer: Optional[str] = None
     ai_remark: Optional[str] = None
     candidate_score: Optional[float] = None
@@ -61,6 +61,12 @@ class InterviewSummary(BaseModel):
     interview_cleared_by_candidate: Optional[str] = None
     candidate_name: str
     candidate_grade: Optional[str] = None
+    score_percent: Optional[float] = None
+    question_count: int = 0
+    answered_count: int = 0
+    created_at: Optional[datetime] = None
+    last_answered_at: Optional[datetime] = None
+    evaluated_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
@@ -101,4 +107,57 @@ class InterviewDetails(BaseModel):
     questions: List[QuestionAnswer]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SearchHit(BaseModel):
+    scope: str
+    id: int
+    user_id: int
+    interview_id: Optional[int] = None
+    question_id: Optional[int] = None
+    rank: float
+    headline: str
+
+class SearchResults(BaseModel):
+    hits: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+class MatchRequest(BaseModel):
+    jd_text: Optional[str] = None
+    jd_user_id: Optional[int] = None
+    top_k: int = 10
+
+class MatchResult(BaseModel):
+    user_id: int
+    candidate_name: str
+    score: float
+    matched_terms: List[str]
+
+class DeadLetterOut(BaseModel):
+    id: int
+    correlation_id: Optional[str] = None
+    action_type: Optional[str] = None
+    session_id: Optional[str] = None
+    attempts: int
+    error: Optional[str] = None
+    body: str
+    dead_lettered_at: float
+    replayed_at: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class CohortBucket(BaseModel):
+    bucket: str
+    count: int
+
+class CohortStats(BaseModel):
+    interviews: int
+    evaluated: int
+    passed: int
+    pass_rate: Optional[float] = None
+    mean_score: Optional[float] = None
+    score_distribution: List[CohortBucket]
+    grade_histogram: List[CohortBucket]
+    median_seconds_per_stage: dict
+    rollup_age_seconds: Optional[float] = None
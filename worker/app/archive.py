@@ -0,0 +1,190 @@
+"""
+Hot/cold maintenance for interviews and question answers.
+
+question_answers is partitioned by month on created_at. This job
+  1. creates the monthly partitions for the coming QA_PARTITION_MONTHS_AHEAD months,
+  2. moves the answers of interviews with no activity for ARCHIVE_AFTER_DAYS (evaluated or
+     abandoned) to gzipped JSON files (shared/interview_archive.py) and deletes their rows,
+  3. drops partitions that lie wholly before the cutoff and are empty by then (monthly ones,
+     and question_answers_before, which holds the answers from before partitioning),
+so the hot partitions and their indexes only cover recent interviews. Archived interviews
+stay listed and interview_details serves their answers from the file.
+
+Usage (e.g. daily from cron):
+    python -m worker.app.archive
+    python -m worker.app.archive --older-than-days 180 --dry-run
+
+The monthly partitions only pay off once this runs regularly: until old partitions are
+dropped, lookups by interview still probe every partition's index.
+"""
+import argparse
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.orm import Session
+
+from shared import schemas
+from shared.database import SessionLocal
+from shared.interview_archive import archive_path_for, write_archive
+from shared.logger import logger
+from shared.models import Interview, QuestionAnswer
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+QA_PARTITION_MONTHS_AHEAD = int(os.getenv("QA_PARTITION_MONTHS_AHEAD", "3"))
+
+# Upper bound of every range partition of question_answers (None for the default partition)
+PARTITION_UPPER_BOUNDS = text(
+    "SELECT c.relname, substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \\(''([^'']+)''\\)')::timestamptz "
+    "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = 'question_answers'::regclass ORDER BY c.relname"
+)
+
+# Last activity of an interview, exactly the expression ix_interviews_last_activity indexes
+LAST_ACTIVITY = func.greatest(Interview.created_at, Interview.last_answered_at, Interview.evaluated_at)
+
+
+def archivable(cutoff: datetime):
+    """
+    Interviews not yet archived and inactive since before cutoff, whatever their status:
+    unfinished interviews that old are abandoned, and leaving their answers behind would
+    keep old partitions from ever emptying.
+    """
+    # NULL when none of the timestamps is set: interviews from before created_at, which count
+    # as old. Both arms can be served by the index.
+    return [Interview.archive_path.is_(None), or_(LAST_ACTIVITY < cutoff, LAST_ACTIVITY.is_(None))]
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def question_answer_partitions(db: Session) -> List[str]:
+    return db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'question_answers'::regclass ORDER BY c.relname"
+    )).scalars().all()
+
+
+def ensure_partitions(db: Session, months_ahead: int = QA_PARTITION_MONTHS_AHEAD) -> List[str]:
+    """
+    Creates the missing monthly partitions from this month on. A month whose rows already
+    went to the default partition is skipped with a warning. The caller commits.
+    """
+    existing = set(question_answer_partitions(db))
+    now = datetime.now(timezone.utc)
+    created = []
+    for offset in range(months_ahead + 1):
+        start, end = month_start(now, offset), month_start(now, offset + 1)
+        name = f"question_answers_{start:%Y%m}"
+        if name in existing:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF question_answers "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+            created.append(name)
+        except Exception as e:
+            logger.warning(f"Could not create partition {name}: {e}")
+    return created
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    Archives up to batch_size interviews last active before cutoff. The caller commits.
+    """
+    interviews = (
+        db.query(Interview)
+        .filter(*archivable(cutoff))
+        .order_by(Interview.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for interview in interviews:
+        questions = (
+            db.query(QuestionAnswer)
+            .filter_by(interview_id=interview.id)
+            .order_by(QuestionAnswer.question_id.asc())
+            .all()
+        )
+        path = archive_path_for(interview.id, interview.created_at)
+        write_archive(path, [schemas.QuestionAnswer.from_orm(q).model_dump(mode="json") for q in questions])
+        interview.archive_path = path
+        interview.archived_at = func.now()
+        interview.archived_grades = dict(Counter(q.candidate_grade for q in questions if q.candidate_grade))
+    if interviews:
+        db.query(QuestionAnswer).filter(
+            QuestionAnswer.interview_id.in_([interview.id for interview in interviews])
+        ).delete(synchronize_session=False)
+    return len(interviews)
+
+
+def drop_empty_partitions(db: Session, cutoff: datetime) -> List[str]:
+    """
+    Drops range partitions that end before cutoff and hold no rows. The caller commits.
+    """
+    dropped = []
+    for name, end in db.execute(PARTITION_UPPER_BOUNDS).all():
+        if end is None or end > cutoff:
+            continue
+        if db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+            # Only answers of interviews still active after the cutoff can be left here; they
+            # are archived, and the partition dropped, once those interviews go quiet
+            logger.info(f"Partition {name} is past the cutoff but still has rows, keeping it")
+            continue
+        db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+def run(older_than_days: int, batch_size: int, dry_run: bool = False):
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    db = SessionLocal()
+    try:
+        created = ensure_partitions(db)
+        db.commit()
+        if created:
+            logger.info(f"Created partitions {', '.join(created)}")
+
+        if dry_run:
+            pending = db.query(func.count(Interview.id)).filter(*archivable(cutoff)).scalar()
+            print(f"{pending} interviews would be archived (cutoff {cutoff:%Y-%m-%d})")
+            return
+
+        archived = 0
+        while True:
+            count = archive_batch(db, cutoff, batch_size)
+            db.commit()
+            if not count:
+                break
+            archived += count
+            print(f"archived {archived} interviews", flush=True)
+
+        dropped = drop_empty_partitions(db, cutoff)
+        db.commit()
+        print(f"Archived {archived} interviews older than {cutoff:%Y-%m-%d}; dropped partitions: {', '.join(dropped) or 'none'}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Create question_answers partitions and archive old interviews.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many interviews would be archived")
+    args = parser.parse_args(argv)
+    run(args.older_than_days, args.batch_size, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,52 @@
+import io
 import logging
-from pydub import AudioSegment
-import speech_recognition as sr
 import os
+from typing import Callable, Optional
+
+from worker.app.fakes import ASR_BACKEND, fake_transcribe
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def extract_text_from_audio(audio_path: str) -> str:
+def convert_to_wav_bytes(audio_path: str) -> bytes:
+    """
+    Decodes an audio file and resamples it to 16 kHz mono WAV. This is the CPU-bound
+    stage and is safe to run in a worker process.
+    Args:
+        audio_path (str): Path to the input audio file (.webm unless the extension says otherwise).
+    Returns:
+        bytes: The WAV file contents.
+    """
+    from pydub import AudioSegment  # imported on first use; pool workers preload it
+
+    audio_format = os.path.splitext(audio_path)[1].lstrip(".").lower() or "webm"
+    audio = AudioSegment.from_file(audio_path, format=audio_format)
+    audio = audio.set_channels(1).set_frame_rate(16000)
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return buffer.getvalue()
+
+def extract_text_from_audio(audio_path: str, decode: Optional[Callable[[str], bytes]] = None) -> str:
     """
     Converts a .webm audio file to .wav and transcribes it to text.
     Args:
         audio_path (str): Path to the input .webm audio file.
+        decode: Optional replacement for convert_to_wav_bytes, e.g. one that runs in a process pool.
     Returns:
         str: Transcribed text from the audio.
     """
+    if ASR_BACKEND == "fake":
+        return fake_transcribe(audio_path)
+
+    import speech_recognition as sr
+
     try:
         logger.info(f"Loading audio file: {audio_path}")
-        audio = AudioSegment.from_file(audio_path, format="webm")
-        audio = audio.set_channels(1).set_frame_rate(16000)
-        wav_path = "converted.wav"
-        audio.export(wav_path, format="wav")
-        logger.info(f"Exported WAV file: {wav_path}")
+        wav_bytes = (decode or convert_to_wav_bytes)(audio_path)
+        logger.info(f"Converted audio to WAV ({len(wav_bytes)} bytes)")
 
         r = sr.Recognizer()
-        with sr.AudioFile(wav_path) as source:
+        with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
             audio_data = r.record(source)
         logger.info("Audio data loaded for transcription.")
 
@@ -39,14 +62,7 @@ def extract_text_from_audio(audio_path: str) -> str:
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         return ""
-    finally:
-        # Clean up the temporary wav file if it exists
-        if os.path.exists("converted.wav"):
-            os.remove("converted.wav")
-            logger.info("Temporary WAV file removed.")
 
 # Example usage:
 # text = extract_text_from_audio("audio.webm")
 # print(text)
-
-
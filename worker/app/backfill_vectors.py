@@ -0,0 +1,70 @@
+"""
+One-off backfill of document_vectors for resumes extracted before the doc_upload worker
+stored vectors. New uploads get their vector from doc_upload, so /api/matching/rank only
+reads document_vectors; run this once after upgrading an existing database.
+
+Usage:
+    python -m worker.app.backfill_vectors
+    python -m worker.app.backfill_vectors --batch-size 200
+"""
+import argparse
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from shared.database import SessionLocal
+from shared.matching import upsert_document_vector
+from shared.models import DocumentVector, UserDocument
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_batch(db: Session, after_user_id: int, batch_size: int) -> Optional[int]:
+    """
+    Vectorizes up to batch_size resumes without a vector, of users after after_user_id.
+    Returns the last user id done, or None when there are none left. The caller commits.
+    """
+    missing = (
+        db.query(UserDocument.user_id, UserDocument.content)
+        .outerjoin(
+            DocumentVector,
+            (DocumentVector.user_id == UserDocument.user_id) & (DocumentVector.doc_type == "resume"),
+        )
+        .filter(UserDocument.doc_type == "resume", DocumentVector.id.is_(None), UserDocument.user_id > after_user_id)
+        .order_by(UserDocument.user_id)
+        .limit(batch_size)
+        .all()
+    )
+    for user_id, resume_text in missing:
+        upsert_document_vector(db, user_id, "resume", resume_text)
+    return missing[-1].user_id if missing else None
+
+
+def run(batch_size: int):
+    db = SessionLocal()
+    try:
+        after_user_id = 0
+        while True:
+            last_user_id = backfill_batch(db, after_user_id, batch_size)
+            db.commit()
+            if last_user_id is None:
+                break
+            after_user_id = last_user_id
+            print(f"  resumes up to user {after_user_id} vectorized", flush=True)
+        print("Every resume has a vector")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Store vectors for resumes that have none.")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="Resumes per transaction")
+    args = parser.parse_args(argv)
+    run(args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
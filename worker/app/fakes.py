@@ -0,0 +1,116 @@
+"""
+Deterministic local stand-ins for the worker's external services, used for load tests
+and offline development:
+
+- LLM_PROVIDER=fake: FakeChatModel replaces ChatOpenAI. It answers each prompt kind
+  (question, closing note, ideal answer, score) with canned text chosen by a hash of the
+  prompt, after FAKE_LLM_LATENCY_SECONDS plus the completion length at
+  FAKE_LLM_TOKENS_PER_SECOND.
+- ASR_BACKEND=fake: fake_transcribe replaces decoding and Google speech recognition.
+- DOC_EXTRACTOR_BACKEND=fake: fake_extract_text replaces Document Intelligence.
+"""
+import os
+import time
+import zlib
+from typing import List, Optional
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+ASR_BACKEND = os.getenv("ASR_BACKEND", "google")
+DOC_EXTRACTOR_BACKEND = os.getenv("DOC_EXTRACTOR_BACKEND", "azure")
+
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5"))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50"))
+FAKE_ASR_LATENCY_SECONDS = float(os.getenv("FAKE_ASR_LATENCY_SECONDS", "0.5"))
+FAKE_EXTRACTOR_LATENCY_SECONDS = float(os.getenv("FAKE_EXTRACTOR_LATENCY_SECONDS", "1.0"))
+
+# Distinct topics so generated questions never trip the duplicate-question check
+QUESTION_TOPICS = [
+    "designing a REST API for a payments service",
+    "debugging a memory leak in a long-running process",
+    "choosing between SQL and NoSQL storage",
+    "writing unit tests for legacy code",
+    "handling a production outage under pressure",
+    "scaling a message queue consumer",
+    "reviewing a teammate's pull request",
+    "securing secrets in a CI pipeline",
+    "profiling a slow database query",
+    "migrating a monolith to services",
+    "mentoring a junior engineer",
+    "estimating a project with unclear requirements",
+]
+
+ANSWER_SENTENCES = [
+    "I would start by reproducing the problem and collecting metrics from the affected service.",
+    "In my last role I owned the deployment pipeline and reduced release time by half.",
+    "The key trade-off is consistency against availability, so I would look at the access patterns first.",
+    "I usually write a failing test before touching the code so the fix is verifiable.",
+    "We used feature flags to roll the change out gradually and watched the error rate.",
+    "I would communicate early with stakeholders and agree on what done means.",
+    "Caching helped, but the real fix was adding an index on the foreign key.",
+    "I prefer small pull requests because they are easier to review and revert.",
+]
+
+DOCUMENT_TEXT = (
+    "Senior Python Engineer. Builds FastAPI services on PostgreSQL, runs workloads on Azure, "
+    "works with message queues, writes automated tests and mentors other engineers. "
+    "Experience with Docker, CI/CD, SQLAlchemy, REST API design and production on-call."
+)
+
+
+def _pick(options: List[str], seed: str, offset: int = 0) -> str:
+    return options[(zlib.crc32(seed.encode("utf-8")) + offset) % len(options)]
+
+
+class FakeResponse:
+    def __init__(self, content: str, input_tokens: int, output_tokens: int):
+        self.content = content
+        self.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+
+class FakeChatModel:
+    """
+    Drop-in for the ChatOpenAI methods the gateway uses.
+    """
+
+    def __init__(self, model: str, temperature: float):
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, messages: List, timeout: Optional[float] = None) -> FakeResponse:
+        prompt = "\n".join(str(getattr(message, "content", message)) for message in messages)
+        content = self._reply(prompt, messages)
+        input_tokens, output_tokens = len(prompt) // 4, max(1, len(content) // 4)
+        latency = FAKE_LLM_LATENCY_SECONDS + output_tokens / FAKE_LLM_TOKENS_PER_SECOND
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Fake {self.model} call took longer than {timeout}s")
+        time.sleep(latency)
+        return FakeResponse(content, input_tokens, output_tokens)
+
+    @staticmethod
+    def _reply(prompt: str, messages: List) -> str:
+        if "Score the candidate's answer" in prompt:
+            score = zlib.crc32(prompt.encode("utf-8")) % 11
+            grade = "ABCDF"[min(4, (10 - score) // 2)]
+            return f'{{"score": {score}, "grade": "{grade}"}} The answer covers the main points with some gaps.'
+        if "What is the ideal answer" in prompt:
+            return " ".join(ANSWER_SENTENCES[:3])
+        if "generate a professional closing note" in str(getattr(messages[-1], "content", "")):
+            return "Thank you for your time today. We will review your answers and get back to you soon."
+        asked = sum(1 for message in messages if type(message).__name__ == "AIMessage")
+        return f"Can you tell me about your experience with {_pick(QUESTION_TOPICS, prompt[:200], asked)}?"
+
+
+def fake_transcribe(audio_path: str) -> str:
+    time.sleep(FAKE_ASR_LATENCY_SECONDS)
+    return " ".join(_pick(ANSWER_SENTENCES, audio_path, i) for i in range(3))
+
+
+def fake_extract_text(pdf_path: str) -> str:
+    time.sleep(FAKE_EXTRACTOR_LATENCY_SECONDS)
+    return DOCUMENT_TEXT
+
@@ -0,0 +1,17 @@
+# An interview is passed when at least this share of its scored answers is not an F
+PASS_THRESHOLD = 0.6
+
+GRADE_SCALE = [
+    (9, "A"),
+    (8, "B"),
+    (7, "C"),
+    (5, "D"),
+    (3, "E"),
+    (0, "F"),
+]
+
+def grade_score(score):
+    for min_score, grade in GRADE_SCALE:
+        if score >= min_score:
+            return grade
+    return "F"
@@ -0,0 +1,136 @@
+"""
+Idempotent message handling keyed on the envelope's correlationId.
+
+With peek-lock delivery a message can reach more than one replica (lock expiry, a crash
+before settlement), so every handler runs behind a claim in the processed_messages
+table: the first replica to insert the row does the work, later deliveries of a DONE
+message are completed without running it again, and a claim whose holder stopped
+renewing it for PROCESSING_LEASE_SECONDS is taken over.
+
+While a handler runs, hold_claim keeps its claim alive: one heartbeat thread bumps
+claimed_at of every claim held by this replica each CLAIM_HEARTBEAT_SECONDS, so the lease
+can stay short and a crashed replica's work is taken over within a minute.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Set
+
+from sqlalchemy.dialects.postgresql import insert
+
+from shared.database import SessionLocal
+from shared.logger import logger
+from shared.models import ProcessedMessage
+
+PROCESSING_LEASE_SECONDS = float(os.getenv("PROCESSING_LEASE_SECONDS", "60"))
+CLAIM_HEARTBEAT_SECONDS = float(os.getenv("CLAIM_HEARTBEAT_SECONDS", "15"))
+# A duplicate of a message another replica is still handling is re-sent after this delay
+IN_PROGRESS_RECHECK_SECONDS = float(os.getenv("IN_PROGRESS_RECHECK_SECONDS", "30"))
+
+# Outcomes of claim_message
+CLAIMED = "claimed"
+ALREADY_DONE = "already_done"
+IN_PROGRESS = "in_progress"
+
+
+def claim_message(correlation_id: str, action_type: str) -> str:
+    db = SessionLocal()
+    try:
+        now = time.time()
+        inserted = db.execute(
+            insert(ProcessedMessage)
+            .values(correlation_id=correlation_id, action_type=action_type, status="IN_PROGRESS", attempts=1, claimed_at=now)
+            .on_conflict_do_nothing(index_elements=["correlation_id"])
+            .returning(ProcessedMessage.correlation_id)
+        ).first()
+        if inserted:
+            db.commit()
+            return CLAIMED
+
+        row = db.query(ProcessedMessage).filter_by(correlation_id=correlation_id).with_for_update().first()
+        if row.status == "DONE":
+            db.commit()
+            return ALREADY_DONE
+        if row.status == "IN_PROGRESS" and now - row.claimed_at < PROCESSING_LEASE_SECONDS:
+            db.commit()
+            return IN_PROGRESS
+        logger.info(f"Taking over {row.status} message {correlation_id} (attempt {row.attempts + 1})")
+        row.status = "IN_PROGRESS"
+        row.attempts += 1
+        row.claimed_at = now
+        db.commit()
+        return CLAIMED
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def finish_message(correlation_id: str, succeeded: bool):
+    db = SessionLocal()
+    try:
+        db.query(ProcessedMessage).filter_by(correlation_id=correlation_id).update(
+            {
+                ProcessedMessage.status: "DONE" if succeeded else "FAILED",
+                ProcessedMessage.completed_at: time.time() if succeeded else None,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+_held_claims: Set[str] = set()
+_held_lock = threading.Lock()
+_heartbeat_thread = None
+
+
+def renew_claims(correlation_ids):
+    db = SessionLocal()
+    try:
+        db.query(ProcessedMessage).filter(
+            ProcessedMessage.correlation_id.in_(correlation_ids), ProcessedMessage.status == "IN_PROGRESS"
+        ).update({ProcessedMessage.claimed_at: time.time()}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not renew {len(correlation_ids)} message claims: {e}")
+    finally:
+        db.close()
+
+
+def _heartbeat():
+    while True:
+        time.sleep(CLAIM_HEARTBEAT_SECONDS)
+        with _held_lock:
+            held = list(_held_claims)
+        if held:
+            renew_claims(held)
+
+
+@contextmanager
+def hold_claim(correlation_id: str):
+    """
+    Keeps the claim on correlation_id alive for as long as the block runs.
+    """
+    global _heartbeat_thread
+    with _held_lock:
+        _held_claims.add(correlation_id)
+        if _heartbeat_thread is None:
+            _heartbeat_thread = threading.Thread(target=_heartbeat, name="claim-heartbeat", daemon=True)
+            _heartbeat_thread.start()
+    try:
+        yield
+    finally:
+        with _held_lock:
+            _held_claims.discard(correlation_id)
+
+
+class MessageInProgress(Exception):
+    """
+    Another replica holds a live claim on the message and it could not be re-sent for a
+    later check; it is abandoned so the broker redelivers it.
+    """
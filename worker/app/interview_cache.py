@@ -0,0 +1,153 @@
+"""
+In-process LRU cache of interview prompt context between turns.
+
+An entry holds the JD/resume text, the prior turns, their chat messages and the dedup
+index of asked questions, tagged with the interview's context_version. A turn on this
+worker advances the entry in place (record_answer / record_question); any other change
+(a turn handled by another replica, a JD/resume upload, a PATCH from the frontend)
+bumps the version in the database and the stale entry is reloaded on next use. An entry
+can be read by several lanes at once (a speculative draft alongside the live turn), so its
+turns are only changed and read under its own lock.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from shared.documents import get_document_texts
+from shared.logger import logger
+from shared.models import Interview, QuestionAnswer, User
+from worker.app.question_dedup import QuestionIndex
+
+INTERVIEW_CACHE_SIZE = int(os.getenv("INTERVIEW_CACHE_SIZE", "512"))
+
+
+class InterviewContext:
+    def __init__(self, version: int, user_id: int, job_description: Optional[str], candidate_resume: Optional[str]):
+        self.version = version
+        self.user_id = user_id
+        self.job_description = job_description
+        self.candidate_resume = candidate_resume
+        self.turns: List[Dict] = []  # {"question_id", "question_text", "answer_text"} in asking order
+        self.asked = QuestionIndex()
+        self._history: Optional[List] = None
+        self.lock = threading.Lock()
+
+    @property
+    def question_count(self) -> int:
+        with self.lock:
+            return sum(1 for turn in self.turns if turn["question_text"])
+
+    def add_turn(self, question_id: int, question_text: Optional[str], answer_text: Optional[str] = None):
+        with self.lock:
+            self.turns.append({"question_id": question_id, "question_text": question_text, "answer_text": answer_text})
+            if question_text:
+                self.asked.add(question_text)
+            self._history = None
+
+    def set_answer(self, question_id: int, answer_text: Optional[str]) -> bool:
+        with self.lock:
+            for turn in reversed(self.turns):
+                if turn["question_id"] == question_id:
+                    turn["answer_text"] = answer_text
+                    self._history = None
+                    return True
+        return False
+
+    def history_messages(self, answer_overrides: Optional[Dict[int, str]] = None) -> List:
+        """
+        The prior turns as chat messages: each question, then its answer or SKIP.
+        answer_overrides (question_id -> text) substitutes answers without touching the
+        cached messages, e.g. a partial transcript for a speculative draft.
+        """
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        with self.lock:
+            if self._history is None or answer_overrides:
+                history = []
+                for turn in self.turns:
+                    if turn["question_text"]:
+                        history.append(AIMessage(content=f"{turn['question_text']}"))
+                    answer = (answer_overrides or {}).get(turn["question_id"], turn["answer_text"])
+                    history.append(HumanMessage(content=answer if answer is not None and answer.strip() else "SKIP"))
+                if answer_overrides:
+                    return history
+                self._history = history
+            return list(self._history)
+
+
+_lock = threading.Lock()
+_contexts: "OrderedDict[int, InterviewContext]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "advanced": 0, "evicted": 0}
+
+
+def load_context(db: Session, interview: Interview) -> InterviewContext:
+    """
+    Returns the cached context if it matches interview.context_version, otherwise loads
+    the user's documents and all turns and caches them.
+    """
+    version = interview.context_version or 0
+    with _lock:
+        context = _contexts.get(interview.id)
+        if context is not None and context.version == version:
+            _contexts.move_to_end(interview.id)
+            _stats["hits"] += 1
+            return context
+        _stats["misses"] += 1
+
+    user = db.query(User).filter_by(id=interview.user_id).first()
+    if not user:
+        logger.error(f"User not found for user_id={interview.user_id}")
+        raise ValueError("User not found")
+    documents = get_document_texts(db, user.id)
+    context = InterviewContext(
+        version,
+        user.id,
+        documents.get("jd") if user.jd_status == "COMPLETED" else None,
+        documents.get("resume") if user.resume_status == "COMPLETED" else None,
+    )
+    qas = db.query(QuestionAnswer).filter_by(interview_id=interview.id).order_by(QuestionAnswer.id).all()
+    for qa in qas:
+        context.add_turn(qa.question_id, qa.question_text, qa.answer_text)
+    logger.debug(f"Loaded context for interview_id={interview.id} (version {version}, {len(qas)} turns)")
+
+    with _lock:
+        _contexts[interview.id] = context
+        _contexts.move_to_end(interview.id)
+        while len(_contexts) > INTERVIEW_CACHE_SIZE:
+            _contexts.popitem(last=False)
+            _stats["evicted"] += 1
+    return context
+
+
+def _advance(interview_id: int, new_version: int, update: Callable[[InterviewContext], bool]):
+    # Only an entry at the version just before this write can be advanced; anything else
+    # missed a change made elsewhere and is dropped
+    with _lock:
+        context = _contexts.get(interview_id)
+        if context is None:
+            return
+        if context.version == new_version - 1 and update(context):
+            context.version = new_version
+            _stats["advanced"] += 1
+        else:
+            del _contexts[interview_id]
+
+
+def record_answer(interview_id: int, question_id: int, answer_text: Optional[str], new_version: int):
+    _advance(interview_id, new_version, lambda context: context.set_answer(question_id, answer_text))
+
+
+def record_question(interview_id: int, question_id: int, question_text: str, new_version: int):
+    def update(context: InterviewContext) -> bool:
+        context.add_turn(question_id, question_text)
+        return True
+
+    _advance(interview_id, new_version, update)
+
+
+def cache_stats() -> Dict:
+    with _lock:
+        return {**_stats, "size": len(_contexts), "capacity": INTERVIEW_CACHE_SIZE}
@@ -0,0 +1,218 @@
+"""
+Priority lanes for the worker dispatcher.
+
+Each action type belongs to a lane with its own buffer, concurrency limit and latency
+SLO, so a burst of document uploads or evaluations never sits in front of the next
+question of a live interview. Lanes can share the main subscription or be fed by a
+dedicated one (SUBSCRIPTION_NAME_<LANE>, filtered on the action_type message property).
+Every lane runs its handlers on a thread pool of its own, sized to its concurrency, so
+no lane can take another lane's threads.
+
+What happens to a message whose lane buffer is full depends on the lane's when_full:
+"wait" holds up the receiver (the interactive lane only, so a full background lane never
+keeps questions from being received), "reschedule" sends the message back to the topic for
+LANE_OVERFLOW_DELAY_SECONDS later, and "drop" discards it. Background buffers hold only a
+few jobs per handler, so a buffered message gets handled well within its lock renewal.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from shared.logger import logger
+
+LANES = {
+    "interactive": {
+        "actions": ["process_question"],
+        "concurrency": int(os.getenv("LANE_INTERACTIVE_CONCURRENCY", "4")),
+        "slo_seconds": float(os.getenv("LANE_INTERACTIVE_SLO_SECONDS", "10")),
+        "buffer": int(os.getenv("LANE_INTERACTIVE_BUFFER", "100")),
+        "when_full": "wait",
+    },
+    "documents": {
+        "actions": ["doc_upload"],
+        "concurrency": int(os.getenv("LANE_DOCUMENTS_CONCURRENCY", "2")),
+        "slo_seconds": float(os.getenv("LANE_DOCUMENTS_SLO_SECONDS", "60")),
+        "buffer": int(os.getenv("LANE_DOCUMENTS_BUFFER", "4")),
+        "when_full": "reschedule",
+    },
+    "batch": {
+        "actions": ["performance_measure"],
+        "concurrency": int(os.getenv("LANE_BATCH_CONCURRENCY", "1")),
+        "slo_seconds": float(os.getenv("LANE_BATCH_SLO_SECONDS", "300")),
+        "buffer": int(os.getenv("LANE_BATCH_BUFFER", "2")),
+        "when_full": "reschedule",
+    },
+    # Drafts are an optimisation waiting at batch LLM priority; they never hold interactive
+    # slots, and are dropped rather than holding up intake when this lane is backed up
+    "speculative": {
+        "actions": ["speculate_question"],
+        "concurrency": int(os.getenv("LANE_SPECULATIVE_CONCURRENCY", "1")),
+        "slo_seconds": float(os.getenv("LANE_SPECULATIVE_SLO_SECONDS", "30")),
+        "buffer": int(os.getenv("LANE_SPECULATIVE_BUFFER", "10")),
+        "when_full": "drop",
+    },
+}
+DEFAULT_LANE = "batch"
+LANE_OVERFLOW_DELAY_SECONDS = float(os.getenv("LANE_OVERFLOW_DELAY_SECONDS", "30"))
+
+ACTION_LANES = {action: lane for lane, config in LANES.items() for action in config["actions"]}
+
+
+def lane_for(message_body: str) -> str:
+    try:
+        action_type = json.loads(message_body).get("action_type")
+    except (ValueError, AttributeError):
+        return DEFAULT_LANE
+    return ACTION_LANES.get(action_type, DEFAULT_LANE)
+
+
+def lane_subscription(lane: str) -> Optional[str]:
+    return os.getenv(f"SUBSCRIPTION_NAME_{lane.upper()}")
+
+
+class LaneStats:
+    def __init__(self, slo_seconds: float):
+        self.slo_seconds = slo_seconds
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.overflowed = 0
+        self.queue_waits = deque(maxlen=500)
+        self.latencies = deque(maxlen=500)
+
+    def snapshot(self, queue_depth: int) -> Dict:
+        waits = sorted(self.queue_waits)
+        latencies = sorted(self.latencies)
+        return {
+            "queue_depth": queue_depth,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "overflowed": self.overflowed,
+            "queue_wait_p50_seconds": percentile(waits, 0.5),
+            "queue_wait_p95_seconds": percentile(waits, 0.95),
+            "latency_p50_seconds": percentile(latencies, 0.5),
+            "latency_p95_seconds": percentile(latencies, 0.95),
+            "slo_seconds": self.slo_seconds,
+            "slo_attainment": (
+                sum(1 for latency in latencies if latency <= self.slo_seconds) / len(latencies) if latencies else None
+            ),
+        }
+
+
+def percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class LaneDispatcher:
+    """
+    Buffers received messages per lane and runs each lane with its own concurrency.
+    Messages of one session (interview) are handled one at a time, in arrival order.
+    """
+
+    def __init__(self, handle: Callable[[str], None]):
+        self.handle = handle
+        self.queues = {lane: asyncio.Queue(maxsize=config["buffer"]) for lane, config in LANES.items()}
+        self.stats = {lane: LaneStats(config["slo_seconds"]) for lane, config in LANES.items()}
+        self.executors = {
+            lane: ThreadPoolExecutor(max_workers=config["concurrency"], thread_name_prefix=f"lane-{lane}")
+            for lane, config in LANES.items()
+        }
+        self.session_locks: Dict[str, list] = {}  # session_id -> [lock, users]
+        self.tasks = []
+
+    def start(self):
+        for lane, config in LANES.items():
+            for _ in range(config["concurrency"]):
+                self.tasks.append(asyncio.ensure_future(self._run_lane(lane)))
+        logger.info(f"Started lanes: { {lane: config['concurrency'] for lane, config in LANES.items()} }")
+
+    async def submit(
+        self,
+        message_body: str,
+        enqueued_at: Optional[float] = None,
+        lane: Optional[str] = None,
+        on_done: Optional[Callable[[bool], None]] = None,
+    ) -> bool:
+        """
+        Queues a message on its lane. When the lane's buffer is full a "wait" lane waits for
+        space, a "drop" lane discards the message (calling on_done(True)) and a "reschedule"
+        lane returns False without queuing it, for the caller to send it back to the topic.
+        on_done is called with True or False once the handler has succeeded or raised.
+        """
+        lane = lane or lane_for(message_body)
+        when_full = LANES[lane]["when_full"]
+        if when_full != "wait" and self.queues[lane].full():
+            self.stats[lane].overflowed += 1
+            if when_full == "reschedule":
+                return False
+            logger.info(f"Lane {lane} is full, dropping message")
+            if on_done:
+                on_done(True)
+            return True
+        await self.queues[lane].put((enqueued_at or time.time(), message_body, on_done))
+        return True
+
+    def free_slots(self, lane: Optional[str] = None) -> Optional[int]:
+        """
+        Buffer space left in the lanes a receiver may wait for: a dedicated subscription's
+        own lane, which holds up nothing else, or on a shared subscription the "wait" lanes.
+        """
+        lanes = [lane] if lane else [name for name, config in LANES.items() if config["when_full"] == "wait"]
+        return min(self.queues[name].maxsize - self.queues[name].qsize() for name in lanes)
+
+    async def _run_lane(self, lane: str):
+        queue = self.queues[lane]
+        stats = self.stats[lane]
+        while True:
+            enqueued_at, message_body, on_done = await queue.get()
+            stats.queue_waits.append(max(0.0, time.time() - enqueued_at))
+            stats.in_flight += 1
+            session_id = self._session_id(message_body)
+            lock = self._enter_session(session_id)
+            succeeded = False
+            try:
+                async with lock:
+                    await asyncio.get_event_loop().run_in_executor(self.executors[lane], self.handle, message_body)
+                stats.processed += 1
+                succeeded = True
+            except Exception as e:
+                stats.failed += 1
+                logger.error(f"Lane {lane} failed to handle message: {e}", exc_info=True)
+            finally:
+                if on_done:
+                    on_done(succeeded)
+                self._leave_session(session_id)
+                stats.in_flight -= 1
+                stats.latencies.append(max(0.0, time.time() - enqueued_at))
+                queue.task_done()
+
+    @staticmethod
+    def _session_id(message_body: str) -> str:
+        try:
+            return json.loads(message_body).get("session_id") or ""
+        except (ValueError, AttributeError):
+            return ""
+
+    def _enter_session(self, session_id: str) -> asyncio.Lock:
+        if not session_id:
+            return asyncio.Lock()
+        entry = self.session_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+    def _leave_session(self, session_id: str):
+        entry = self.session_locks.get(session_id)
+        if entry:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.session_locks[session_id]
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {lane: self.stats[lane].snapshot(self.queues[lane].qsize()) for lane in LANES}
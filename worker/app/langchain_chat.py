@@ -1,7 +1,8 @@
+import os
+from typing import Dict, Optional
 from shared.logger import logger
 from shared.models import Interview, QuestionAnswer
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain.chat_models import ChatOpenAI
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from shared import models
 from shared.common import (
@@ -11,37 +12,36 @@ from shared.common import (
 )
 from datetime import datetime
 from uuid import uuid4
+from worker.app.llm_routing import invoke_task
+from worker.app import interview_cache, speculation
+from worker.app.speculation import SPECULATION_ENABLED
+from shared.context_version import bump_details_version, bump_interview_version
+from shared.interview_summary import refresh_interview_summary
 from dotenv import load_dotenv
 load_dotenv() 
-   
-llm = ChatOpenAI(model="gpt-4", temperature=0.7)
 
 MAX_QUESTIONS = 5
+# How many times a near-duplicate question is regenerated before it is accepted anyway
+DEDUP_MAX_REGENERATIONS = int(os.getenv("DEDUP_MAX_REGENERATIONS", "2"))
     
     
-def generate_next_question(interview_id: int, db: Session):
-    logger.info(f"Generating next question for interview_id={interview_id}")
-    interview = db.query(models.Interview).filter_by(id=interview_id).first()
-    if not interview:
-        logger.error(f"Interview not found for interview_id={interview_id}")
-        raise ValueError("Interview not found")
-    user = db.query(models.User).filter_by(id=interview.user_id).first()
-    if not user:
-        logger.error(f"User not found for user_id={interview.user_id}")
-        raise ValueError("User not found")
-
-    job_description = user.jd_text if user.jd_status == "COMPLETED" else None
-    candidate_resume = user.resume_text if user.resume_status == "COMPLETED" else None
+def draft_question(context, interview_id: int, task: str, answer_overrides: Optional[Dict[int, str]] = None) -> str:
+    """
+    Builds the interviewer prompt from the interview context and asks the model routed for
+    task for the next question (or the closing note), regenerating near-duplicates.
+    """
+    from langchain_core.messages import SystemMessage
 
-    qas = db.query(QuestionAnswer).filter_by(interview_id=interview_id).order_by(QuestionAnswer.id).all()
-    logger.debug(f"Found {len(qas)} previous question-answer pairs for interview_id={interview_id}")
+    job_description = context.job_description
+    candidate_resume = context.candidate_resume
+    question_count = context.question_count
 
     messages = [
         SystemMessage(
             content=f"""You are a professional AI interviewer. 
             Ask only one interview question at a time based on the job description and candidate resume. 
             
-            Do not list multiple questions. Wait for the candidate's answer before asking the next question. When you reach the last question (Question {len(qas)+1} out of {MAX_QUESTIONS}), instead of asking a question, generate a professional closing note to end the interview.
+            Do not list multiple questions. Wait for the candidate's answer before asking the next question. When you reach the last question (Question {len(context.turns)+1} out of {MAX_QUESTIONS}), instead of asking a question, generate a professional closing note to end the interview.
 
             Job Description:
             {job_description.strip() if job_description else ''}
@@ -52,25 +52,8 @@ def generate_next_question(interview_id: int, db: Session):
         )
     ]
 
-    # Append previous questions with their count
-    question_number = 1
-    for qa in qas:
-        if qa.question_text:
-            messages.append(AIMessage(content=f"{qa.question_text}"))
-            question_number += 1
-        if qa.answer_text is not None and qa.answer_text.strip():
-            messages.append(HumanMessage(content=qa.answer_text))
-        else:
-            messages.append(HumanMessage(content="SKIP"))
-    question_count = question_number - 1
-
-    logger.info(f"Current question count: {question_count} for interview_id={interview_id}")
-
-    if question_count >= MAX_QUESTIONS:
-        interview.status = "DONE_ASKING_QUESTIONS"
-        db.commit()
-        logger.info(f"Interview {interview_id} already completed.")
-        return "Interview already completed."
+    # Append previous questions and answers
+    messages.extend(context.history_messages(answer_overrides))
 
     # If it's the last question, instruct AI to generate a closing note
     if question_count == MAX_QUESTIONS - 1:
@@ -79,11 +62,65 @@ def generate_next_question(interview_id: int, db: Session):
         ))
 
     logger.debug(f"Invoking LLM for interview_id={interview_id} with {len(messages)} messages")
-    response = llm.invoke(messages)
+    response = invoke_task(task, messages, interview_id=interview_id)
     next_content = response.content.strip()
     logger.info(f"LLM response for interview_id={interview_id}: {next_content}")
 
+    # Regenerate questions that repeat or rephrase an earlier one; the closing note is exempt
+    if question_count < MAX_QUESTIONS - 1:
+        asked = context.asked
+        for attempt in range(DEDUP_MAX_REGENERATIONS):
+            duplicate = asked.find_similar(next_content)
+            if not duplicate:
+                break
+            logger.info(
+                f"Generated question for interview_id={interview_id} duplicates an earlier one "
+                f"(similarity={duplicate[1]:.2f}), regenerating (attempt {attempt + 1})"
+            )
+            hint = SystemMessage(
+                content=f"Your question \"{next_content}\" is too similar to the earlier question "
+                f"\"{duplicate[0]}\". Ask about a different topic from the job description or resume."
+            )
+            next_content = invoke_task(task, messages + [hint], interview_id=interview_id).content.strip()
+
+    return next_content
+
+
+def generate_next_question(interview_id: int, db: Session):
+    logger.info(f"Generating next question for interview_id={interview_id}")
+    interview = db.query(models.Interview).filter_by(id=interview_id).first()
+    if not interview:
+        logger.error(f"Interview not found for interview_id={interview_id}")
+        raise ValueError("Interview not found")
+
+    # JD/resume and prior turns come from the per-interview cache while its version is current
+    context = interview_cache.load_context(db, interview)
+    logger.debug(f"Found {len(context.turns)} previous question-answer pairs for interview_id={interview_id}")
+    question_count = context.question_count
+
+    logger.info(f"Current question count: {question_count} for interview_id={interview_id}")
+
+    if question_count >= MAX_QUESTIONS:
+        interview.status = "DONE_ASKING_QUESTIONS"
+        if interview.completed_at is None:
+            interview.completed_at = func.now()
+        bump_details_version(db, interview.id)
+        db.commit()
+        logger.info(f"Interview {interview_id} already completed.")
+        return "Interview already completed."
+
+    task = "closing_note" if question_count == MAX_QUESTIONS - 1 else "next_question"
+    next_content = None
+    if task == "next_question" and SPECULATION_ENABLED and context.turns:
+        answered = context.turns[-1]
+        next_content = speculation.take_draft(
+            db, interview.id, answered["question_id"], answered["answer_text"], interview.context_version
+        )
+    if next_content is None:
+        next_content = draft_question(context, interview_id, task)
+
     # Save to DB including the closing note as a regular question
+    version = bump_interview_version(db, interview.id)
     new_question = QuestionAnswer(
         user_id=interview.user_id,
         interview_id=interview.id,
@@ -92,12 +129,16 @@ def generate_next_question(interview_id: int, db: Session):
         question_id=question_count + 1
     )
     db.add(new_question)
+    refresh_interview_summary(db, interview.id)
     db.commit()
+    interview_cache.record_question(interview.id, question_count + 1, next_content, version)
     logger.info(f"Saved new question {question_count + 1} for interview_id={interview_id}")
 
     # If closing note, update interview status and send message to service bus
     if question_count == MAX_QUESTIONS - 1:
         interview.status = "DONE_ASKING_QUESTIONS"
+        interview.completed_at = func.now()
+        bump_details_version(db, interview.id)
         db.commit()
         logger.info(f"Interview {interview_id} marked as DONE_ASKING_QUESTIONS")
 
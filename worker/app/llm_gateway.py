@@ -0,0 +1,262 @@
+"""
+Shared gateway for every LLM call made by the worker.
+
+Owns one pooled keep-alive HTTP client, one chat model per (model, temperature),
+per-call timeouts, retries with jittered exponential backoff, optional hedged
+requests and per-model latency/error statistics.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import httpx
+
+from shared.logger import logger
+from worker.app.fakes import LLM_PROVIDER, FakeChatModel
+from worker.app.rate_limiter import INTERACTIVE, rate_limiter
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY_SECONDS = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "0.5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+# A hedge fires once the primary request runs past the model's observed p95 latency
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LATENCY_WINDOW = 500
+# Completion tokens assumed when reserving rate-limit budget before a call
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "400"))
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_chat_models: Dict[Tuple[str, float], "ChatOpenAI"] = {}
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONNECTIONS, thread_name_prefix="llm")
+
+
+class ModelStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float):
+        with self.lock:
+            self.calls += 1
+            self.latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self.lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> Dict:
+        p50, p95, p99 = self.percentile(0.5), self.percentile(0.95), self.percentile(0.99)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "latency_p50_seconds": p50,
+            "latency_p95_seconds": p95,
+            "latency_p99_seconds": p99,
+        }
+
+
+_stats: Dict[str, ModelStats] = {}
+
+
+def model_stats(model: str) -> ModelStats:
+    with _lock:
+        return _stats.setdefault(model, ModelStats())
+
+
+def llm_stats() -> Dict[str, Dict]:
+    with _lock:
+        models = list(_stats.items())
+    return {model: stats.snapshot() for model, stats in models}
+
+
+def get_http_client() -> httpx.Client:
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=120,
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+            )
+        return _http_client
+
+
+def get_chat_model(model: str = LLM_MODEL, temperature: float = LLM_TEMPERATURE) -> "ChatOpenAI":
+    if LLM_PROVIDER == "fake":
+        return _get_fake_chat_model(model, temperature)
+    # langchain_openai takes over a second to import, so it is loaded with the first model
+    from langchain_openai import ChatOpenAI
+
+    http_client = get_http_client()
+    with _lock:
+        chat = _chat_models.get((model, temperature))
+        if chat is None:
+            # Retries are handled here so they can be jittered, counted and hedged
+            chat = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                timeout=LLM_TIMEOUT_SECONDS,
+                max_retries=0,
+                http_client=http_client,
+            )
+            _chat_models[(model, temperature)] = chat
+        return chat
+
+
+def _get_fake_chat_model(model: str, temperature: float):
+    with _lock:
+        chat = _chat_models.get((model, temperature))
+        if chat is None:
+            chat = _chat_models[(model, temperature)] = FakeChatModel(model, temperature)
+        return chat
+
+
+def estimate_tokens(messages: List) -> int:
+    # Roughly four characters per token for English text
+    prompt_chars = sum(len(getattr(message, "content", message) or "") for message in messages)
+    return prompt_chars // 4 + LLM_EXPECTED_OUTPUT_TOKENS
+
+
+def usage_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def hedge_delay(model: str) -> float:
+    stats = model_stats(model)
+    if len(stats.latencies) < LLM_HEDGE_MIN_SAMPLES:
+        return LLM_HEDGE_DEFAULT_DELAY_SECONDS
+    return stats.percentile(0.95)
+
+
+def _record_latency(stats: ModelStats, started: float, future):
+    if not future.cancelled() and future.exception() is None:
+        stats.record(time.perf_counter() - started)
+
+
+def _settle_future(model: str, estimated_tokens: int, future):
+    if not future.cancelled() and future.exception() is None:
+        rate_limiter.settle(model, estimated_tokens, usage_tokens(future.result()))
+
+
+def _invoke_hedged(chat: "ChatOpenAI", model: str, messages: List, timeout: float, priority: str):
+    """
+    timeout bounds the whole call, hedge included: the hedge only gets what is left of it,
+    and TimeoutError is raised once it has passed with neither request answered.
+    """
+    stats = model_stats(model)
+    started = time.perf_counter()
+    deadline = started + timeout
+    primary = _executor.submit(chat.invoke, messages, timeout=timeout)
+    # Each request's own latency is recorded when it completes, the loser's too: recording
+    # only the winner would pull p95, and with it the hedge delay, ever lower
+    primary.add_done_callback(lambda future: _record_latency(stats, started, future))
+    done, _ = wait([primary], timeout=min(hedge_delay(model), timeout))
+    if done:
+        return primary.result()
+    remaining = deadline - time.perf_counter()
+    hedge_tokens = estimate_tokens(messages)
+    # A hedge is only worth sending if there is time left and the rate limit can take it right now
+    if remaining <= 0 or not rate_limiter.try_acquire(model, hedge_tokens, priority):
+        return primary.result(timeout=max(0.0, remaining))
+
+    with stats.lock:
+        stats.hedges_fired += 1
+    logger.info(f"LLM call to {model} exceeded hedge deadline, firing hedged request")
+    hedge_started = time.perf_counter()
+    hedge = _executor.submit(chat.invoke, messages, timeout=remaining)
+    hedge.add_done_callback(lambda future: _record_latency(stats, hedge_started, future))
+    # Its tokens are spent whichever request wins, so it is settled like the primary
+    hedge.add_done_callback(lambda future: _settle_future(model, hedge_tokens, future))
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(
+            pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED
+        )
+        if not done:
+            raise TimeoutError(f"LLM call to {model} got no answer within {timeout:.1f}s")
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            if future is hedge:
+                with stats.lock:
+                    stats.hedges_won += 1
+            # The slower request is left to finish in the background; its result is discarded
+            return future.result()
+    raise error
+
+
+def invoke_llm(
+    messages: List,
+    model: str = LLM_MODEL,
+    temperature: float = LLM_TEMPERATURE,
+    timeout: Optional[float] = None,
+    hedge: bool = False,
+    retries: Optional[int] = None,
+    priority: str = INTERACTIVE,
+):
+    """
+    Invokes a chat model through the shared client pool and returns the response message.
+    Each attempt first waits for rate-limit budget at the given priority. Retries with
+    jittered exponential backoff; with hedge=True a duplicate request is sent
+    when the first one runs past the model's p95 latency and the first answer wins.
+    """
+    chat = get_chat_model(model, temperature)
+    stats = model_stats(model)
+    timeout = timeout or LLM_TIMEOUT_SECONDS
+    retries = LLM_MAX_RETRIES if retries is None else retries
+    tokens = estimate_tokens(messages)
+    for attempt in range(retries + 1):
+        rate_limiter.acquire(model, tokens, priority)
+        started = time.perf_counter()
+        try:
+            if hedge:
+                response = _invoke_hedged(chat, model, messages, timeout, priority)
+            else:
+                response = chat.invoke(messages, timeout=timeout)
+            latency = time.perf_counter() - started
+            if not hedge:
+                # Hedged requests record their own latencies as they complete
+                stats.record(latency)
+            rate_limiter.settle(model, tokens, usage_tokens(response))
+            logger.debug(f"LLM call to {model} took {latency:.2f}s")
+            return response
+        except Exception as e:
+            with stats.lock:
+                stats.errors += 1
+            if attempt == retries:
+                logger.error(f"LLM call to {model} failed after {attempt + 1} attempts: {e}")
+                raise
+            delay = random.uniform(0, LLM_RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+            with stats.lock:
+                stats.retries += 1
+            logger.warning(f"LLM call to {model} failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
@@ -0,0 +1,156 @@
+"""
+Task-aware model routing for LLM calls.
+
+Each task type maps to a model, temperature, latency budget and rate-limit priority.
+A call that misses its budget (or fails) on the primary model is retried once on the
+faster fallback model.
+Routes can be overridden per task with LLM_ROUTES_JSON, e.g.
+    LLM_ROUTES_JSON='{"score": {"model": "gpt-4o", "latency_budget_seconds": 15}}'
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from shared.logger import logger
+from worker.app.llm_gateway import invoke_llm
+from worker.app.rate_limiter import BACKGROUND, BATCH, INTERACTIVE
+
+DEFAULT_ROUTES = {
+    "next_question": {
+        "model": "gpt-4", "temperature": 0.7, "latency_budget_seconds": 12,
+        "fallback_model": "gpt-4o-mini", "hedge": True,
+        "priority": INTERACTIVE,
+    },
+    # Same model as next_question so a reused draft matches, but queued behind live turns
+    "speculative_question": {
+        "model": "gpt-4", "temperature": 0.7, "latency_budget_seconds": 20,
+        "fallback_model": None, "hedge": False,
+        "priority": BATCH,
+    },
+    "closing_note": {
+        "model": "gpt-4o-mini", "temperature": 0.5, "latency_budget_seconds": 8,
+        "fallback_model": "gpt-3.5-turbo", "hedge": True,
+        "priority": INTERACTIVE,
+    },
+    "ideal_answer": {
+        "model": "gpt-4o-mini", "temperature": 0.3, "latency_budget_seconds": 20,
+        "fallback_model": "gpt-3.5-turbo", "hedge": False,
+        "priority": BATCH,
+    },
+    "score": {
+        "model": "gpt-4", "temperature": 0.0, "latency_budget_seconds": 20,
+        "fallback_model": "gpt-4o-mini", "hedge": False,
+        "priority": BATCH,
+    },
+    "digest": {
+        "model": "gpt-4o-mini", "temperature": 0.3, "latency_budget_seconds": 30,
+        "fallback_model": None, "hedge": False,
+        "priority": BACKGROUND,
+    },
+}
+
+# USD per 1K (input, output) tokens, used for the per-task cost estimate
+DEFAULT_MODEL_COSTS = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+def load_routes() -> Dict[str, Dict]:
+    routes = {task: dict(route) for task, route in DEFAULT_ROUTES.items()}
+    overrides = os.getenv("LLM_ROUTES_JSON")
+    if overrides:
+        for task, route in json.loads(overrides).items():
+            routes.setdefault(task, {}).update(route)
+    return routes
+
+
+def load_model_costs() -> Dict[str, tuple]:
+    costs = dict(DEFAULT_MODEL_COSTS)
+    overrides = os.getenv("LLM_MODEL_COSTS_JSON")
+    if overrides:
+        costs.update({model: tuple(cost) for model, cost in json.loads(overrides).items()})
+    return costs
+
+
+LLM_ROUTES = load_routes()
+LLM_MODEL_COSTS = load_model_costs()
+
+_lock = threading.Lock()
+_task_stats: Dict[str, Dict] = {}
+
+
+def estimate_cost(model: str, response) -> float:
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_cost, output_cost = LLM_MODEL_COSTS.get(model, (0.0, 0.0))
+    return (usage.get("input_tokens", 0) * input_cost + usage.get("output_tokens", 0) * output_cost) / 1000
+
+
+def _record(task: str, model: str, latency: float, cost: float, fallback: bool):
+    with _lock:
+        stats = _task_stats.setdefault(task, {"calls": 0, "fallbacks": 0, "total_latency_seconds": 0.0, "total_cost_usd": 0.0, "models": {}})
+        stats["calls"] += 1
+        stats["fallbacks"] += int(fallback)
+        stats["total_latency_seconds"] += latency
+        stats["total_cost_usd"] += cost
+        stats["models"][model] = stats["models"].get(model, 0) + 1
+
+
+def routing_stats() -> Dict[str, Dict]:
+    with _lock:
+        return {
+            task: {
+                **{k: v for k, v in stats.items() if k != "models"},
+                "models": dict(stats["models"]),
+                "avg_latency_seconds": stats["total_latency_seconds"] / stats["calls"],
+                "avg_cost_usd": stats["total_cost_usd"] / stats["calls"],
+            }
+            for task, stats in _task_stats.items()
+        }
+
+
+def invoke_task(task: str, messages: List, interview_id: Optional[int] = None):
+    """
+    Invokes the model routed for task. The primary model gets a single attempt within the
+    task's latency budget; on a miss the call falls back to the route's fallback model.
+    """
+    route = LLM_ROUTES[task]
+    model = route["model"]
+    fallback_model = route.get("fallback_model")
+    started = time.perf_counter()
+    try:
+        response = invoke_llm(
+            messages,
+            model=model,
+            temperature=route["temperature"],
+            timeout=route["latency_budget_seconds"],
+            hedge=route.get("hedge", False),
+            retries=0 if fallback_model else None,
+            priority=route.get("priority", INTERACTIVE),
+        )
+        fallback = False
+    except Exception as e:
+        if not fallback_model:
+            raise
+        logger.warning(
+            f"LLM route task={task} interview_id={interview_id}: {model} missed its "
+            f"{route['latency_budget_seconds']}s budget ({e}), falling back to {fallback_model}"
+        )
+        model = fallback_model
+        response = invoke_llm(
+            messages, model=model, temperature=route["temperature"], priority=route.get("priority", INTERACTIVE)
+        )
+        fallback = True
+
+    latency = time.perf_counter() - started
+    cost = estimate_cost(model, response)
+    _record(task, model, latency, cost, fallback)
+    logger.info(
+        f"LLM route task={task} interview_id={interview_id} model={model} fallback={fallback} "
+        f"latency={latency:.2f}s cost=${cost:.5f}"
+    )
+    return response
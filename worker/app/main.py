@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from worker.app import interview_cache, media_pool, speculation, worker
 from worker.app.worker import listen_to_service_bus
+from worker.app.llm_gateway import llm_stats
+from worker.app.llm_routing import routing_stats
+from worker.app.rate_limiter import rate_limiter
 #from worker import listen_to_service_bus
 import asyncio
 from shared.logger import logger
@@ -17,8 +21,39 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     loop = asyncio.get_event_loop()
+    # Start receiving right away; the media workers warm up in the background and the
+    # first audio job simply waits for them
     loop.create_task(listen_to_service_bus())
+    loop.run_in_executor(None, media_pool.warm_up)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    media_pool.shutdown()
 
 @app.get("/")
 def read_root():
-    return {"message": "Worker application is running and listening for messages."}
\ No newline at end of file
+    return {"message": "Worker application is running and listening for messages."}
+
+@app.get("/metrics/llm")
+def llm_metrics():
+    return llm_stats()
+
+@app.get("/metrics/llm/routes")
+def llm_route_metrics():
+    return routing_stats()
+
+@app.get("/metrics/llm/rate_limits")
+def llm_rate_limit_metrics():
+    return rate_limiter.stats()
+
+@app.get("/metrics/lanes")
+def lane_metrics():
+    return worker.lane_dispatcher.metrics() if worker.lane_dispatcher else {}
+
+@app.get("/metrics/interview_cache")
+def interview_cache_metrics():
+    return interview_cache.cache_stats()
+
+@app.get("/metrics/speculation")
+def speculation_metrics():
+    return speculation.speculation_stats()
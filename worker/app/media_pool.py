@@ -0,0 +1,94 @@
+"""
+Process pool for CPU-bound media work (audio decoding and resampling).
+
+Workers are started once and kept warm with the media libraries imported, so a task
+pays only for its own decoding. Submissions are bounded: callers block once every
+worker is busy and MEDIA_POOL_QUEUE_PER_WORKER tasks per worker are waiting, and a
+Service Bus receiver dedicated to the interactive lane stops taking new messages while the
+pool is saturated.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from shared.logger import logger
+from worker.app.audio_to_text import convert_to_wav_bytes
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+MEDIA_POOL_WORKERS = int(os.getenv("MEDIA_POOL_WORKERS", "0")) or available_cores()
+MEDIA_POOL_QUEUE_PER_WORKER = int(os.getenv("MEDIA_POOL_QUEUE_PER_WORKER", "2"))
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_slots = threading.BoundedSemaphore(MEDIA_POOL_WORKERS * MEDIA_POOL_QUEUE_PER_WORKER)
+_in_flight = 0
+
+
+def _warm_worker():
+    # Import the decoders once per process instead of once per task
+    import pydub  # noqa: F401
+    import speech_recognition  # noqa: F401
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            logger.info(f"Starting media process pool with {MEDIA_POOL_WORKERS} workers")
+            _executor = ProcessPoolExecutor(max_workers=MEDIA_POOL_WORKERS, initializer=_warm_worker)
+        return _executor
+
+
+def warm_up():
+    """
+    Starts every worker process now rather than on the first submitted task.
+    """
+    executor = get_executor()
+    for future in [executor.submit(_warm_worker) for _ in range(MEDIA_POOL_WORKERS)]:
+        future.result()
+
+
+def has_capacity() -> bool:
+    return _in_flight < MEDIA_POOL_WORKERS * MEDIA_POOL_QUEUE_PER_WORKER
+
+
+def decode_audio(audio_path: str) -> bytes:
+    """
+    Runs convert_to_wav_bytes in the process pool, blocking while the pool is saturated.
+    """
+    global _in_flight
+    executor = get_executor()
+    with _slots:
+        with _lock:
+            _in_flight += 1
+        try:
+            return executor.submit(convert_to_wav_bytes, audio_path).result()
+        finally:
+            with _lock:
+                _in_flight -= 1
+
+
+def resize(workers: int):
+    """
+    Replaces the pool with one of the given size; used by benchmarks and tuning.
+    """
+    global MEDIA_POOL_WORKERS, _slots
+    shutdown()
+    with _lock:
+        MEDIA_POOL_WORKERS = workers
+        _slots = threading.BoundedSemaphore(workers * MEDIA_POOL_QUEUE_PER_WORKER)
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
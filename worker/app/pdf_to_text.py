@@ -1,12 +1,33 @@
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.documentintelligence import DocumentIntelligenceClient
-from azure.ai.documentintelligence.models import AnalyzeOutputOption, AnalyzeResult
 import os
+import threading
+
+from worker.app.fakes import DOC_EXTRACTOR_BACKEND, fake_extract_text
+
+_lock = threading.Lock()
+_client = None
+
+def get_document_intelligence_client():
+    """
+    Returns the shared Document Intelligence client, importing the SDK on first use.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            from azure.core.credentials import AzureKeyCredential
+            from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+            endpoint = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
+            key = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
+            _client = DocumentIntelligenceClient(endpoint=endpoint, credential=AzureKeyCredential(key))
+        return _client
 
 def extract_text_from_pdf(pdf_path: str) -> str:
-    endpoint = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
-    key = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
-    document_intelligence_client = DocumentIntelligenceClient(endpoint=endpoint, credential=AzureKeyCredential(key))
+    if DOC_EXTRACTOR_BACKEND == "fake":
+        return fake_extract_text(pdf_path)
+
+    from azure.ai.documentintelligence.models import AnalyzeOutputOption, AnalyzeResult
+
+    document_intelligence_client = get_document_intelligence_client()
 
     with open(pdf_path, "rb") as f:
         poller = document_intelligence_client.begin_analyze_document(
@@ -0,0 +1,60 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from shared.matching import tokenize, vectorize
+
+# Similarity band outside of which answers are scored locally. Widening the band
+# sends more answers to the LLM judge; see prescore_calibration.py for tuning.
+PRESCORE_ENABLED = os.getenv("PRESCORE_ENABLED", "true").lower() == "true"
+PRESCORE_LOW_SIMILARITY = float(os.getenv("PRESCORE_LOW_SIMILARITY", "0.05"))
+PRESCORE_HIGH_SIMILARITY = float(os.getenv("PRESCORE_HIGH_SIMILARITY", "0.6"))
+# Answers with fewer words than this score 0 unjudged; by default only blank transcripts, as
+# short answers ("Kafka, Redis") can be right and are left to the similarity band
+PRESCORE_MIN_ANSWER_WORDS = int(os.getenv("PRESCORE_MIN_ANSWER_WORDS", "1"))
+# A confident "good" score also needs the answer to cover a reasonable share of the ideal answer
+PRESCORE_MIN_LENGTH_RATIO = float(os.getenv("PRESCORE_MIN_LENGTH_RATIO", "0.3"))
+
+OFF_TOPIC_SCORE = 1
+
+
+def is_empty_answer(answer_text: Optional[str]) -> bool:
+    return len((answer_text or "").split()) < PRESCORE_MIN_ANSWER_WORDS
+
+
+def answer_similarity(ideal_answer: str, answer_text: str) -> float:
+    """
+    Cosine similarity between the sublinear term-frequency vectors of two texts.
+    """
+    ideal_indices, ideal_weights = vectorize(ideal_answer)
+    answer_indices, answer_weights = vectorize(answer_text)
+    if ideal_indices.size == 0 or answer_indices.size == 0:
+        return 0.0
+    _, ideal_pos, answer_pos = np.intersect1d(ideal_indices, answer_indices, assume_unique=True, return_indices=True)
+    dot = float(np.dot(ideal_weights[ideal_pos], answer_weights[answer_pos]))
+    return dot / float(np.linalg.norm(ideal_weights) * np.linalg.norm(answer_weights))
+
+
+def prescore_answer(
+    ideal_answer: str,
+    answer_text: str,
+    low: Optional[float] = None,
+    high: Optional[float] = None,
+) -> Tuple[Optional[int], float]:
+    """
+    Scores clear cases locally. Returns (score out of 10 or None if borderline, similarity).
+    """
+    low = PRESCORE_LOW_SIMILARITY if low is None else low
+    high = PRESCORE_HIGH_SIMILARITY if high is None else high
+    if is_empty_answer(answer_text):
+        return 0, 0.0
+    similarity = answer_similarity(ideal_answer, answer_text)
+    if similarity <= low:
+        return OFF_TOPIC_SCORE, similarity
+    length_ratio = len(tokenize(answer_text)) / max(1, len(tokenize(ideal_answer)))
+    if similarity >= high and length_ratio >= PRESCORE_MIN_LENGTH_RATIO:
+        # Map [high, 1] onto [7, 10]
+        span = max(1e-6, 1.0 - high)
+        return min(10, 7 + int(round(3 * (similarity - high) / span))), similarity
+    return None, similarity
@@ -0,0 +1,125 @@
+"""
+Calibration report for the local pre-scoring stage.
+
+Compares prescore_answer against LLM-judged scores on a labelled sample and reports
+how many answers would still reach the LLM judge and how often the local score agrees.
+
+Usage:
+    python -m worker.app.prescore_calibration --sample labelled.jsonl
+    python -m worker.app.prescore_calibration --from-db 500 --target-llm-rate 0.4
+
+Sample lines are JSON objects with "ideal_answer", "answer_text" and "llm_score" (0-10).
+--from-db only yields LLM labels for answers evaluated with PRESCORE_ENABLED=false.
+"""
+import argparse
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from worker.app.grading import grade_score
+from worker.app.prescore import (
+    PRESCORE_HIGH_SIMILARITY,
+    PRESCORE_LOW_SIMILARITY,
+    answer_similarity,
+    is_empty_answer,
+    prescore_answer,
+)
+
+
+def load_sample_file(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_sample_from_db(limit: int) -> List[Dict]:
+    from shared.database import SessionLocal
+    from shared.models import QuestionAnswer
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(QuestionAnswer.ai_answer, QuestionAnswer.answer_text, QuestionAnswer.candidate_score)
+            .filter(
+                QuestionAnswer.ai_answer.isnot(None),
+                QuestionAnswer.answer_text.isnot(None),
+                QuestionAnswer.candidate_score.isnot(None),
+            )
+            .order_by(QuestionAnswer.id.desc())
+            .limit(limit)
+            .all()
+        )
+    finally:
+        db.close()
+    return [{"ideal_answer": a, "answer_text": t, "llm_score": s} for a, t, s in rows]
+
+
+def thresholds_for_rate(similarities: np.ndarray, target_llm_rate: float):
+    """
+    Picks a band centred on the median similarity that holds target_llm_rate of the sample.
+    """
+    lower_q = max(0.0, 0.5 - target_llm_rate / 2)
+    upper_q = min(1.0, 0.5 + target_llm_rate / 2)
+    return float(np.quantile(similarities, lower_q)), float(np.quantile(similarities, upper_q))
+
+
+def calibration_report(sample: List[Dict], low: float, high: float) -> Dict:
+    llm_calls = 0
+    direct = []
+    for item in sample:
+        score, _ = prescore_answer(item["ideal_answer"], item["answer_text"], low=low, high=high)
+        if score is None:
+            llm_calls += 1
+        else:
+            direct.append((score, float(item["llm_score"])))
+
+    report = {
+        "sample_size": len(sample),
+        "low_similarity": round(low, 4),
+        "high_similarity": round(high, 4),
+        "llm_call_rate": round(llm_calls / max(1, len(sample)), 4),
+        "direct_scored": len(direct),
+    }
+    if direct:
+        local = np.array([d[0] for d in direct])
+        labelled = np.array([d[1] for d in direct])
+        report["grade_agreement"] = round(
+            float(np.mean([grade_score(a) == grade_score(b) for a, b in direct])), 4
+        )
+        report["pass_fail_agreement"] = round(
+            float(np.mean([(grade_score(a) != "F") == (grade_score(b) != "F") for a, b in direct])), 4
+        )
+        report["mean_abs_error"] = round(float(np.mean(np.abs(local - labelled))), 3)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Calibrate local pre-scoring against LLM judge scores.")
+    parser.add_argument("--sample", help="JSONL file with ideal_answer, answer_text and llm_score")
+    parser.add_argument("--from-db", type=int, default=0, help="Use the N most recent LLM-scored answers")
+    parser.add_argument("--low", type=float, default=PRESCORE_LOW_SIMILARITY)
+    parser.add_argument("--high", type=float, default=PRESCORE_HIGH_SIMILARITY)
+    parser.add_argument("--target-llm-rate", type=float, help="Suggest thresholds that send this share to the LLM")
+    args = parser.parse_args(argv)
+
+    if args.sample:
+        sample = load_sample_file(args.sample)
+    elif args.from_db:
+        sample = load_sample_from_db(args.from_db)
+    else:
+        parser.error("either --sample or --from-db is required")
+
+    low, high = args.low, args.high
+    if args.target_llm_rate is not None:
+        similarities = np.array([
+            answer_similarity(item["ideal_answer"], item["answer_text"])
+            for item in sample if not is_empty_answer(item["answer_text"])
+        ])
+        if similarities.size:
+            low, high = thresholds_for_rate(similarities, args.target_llm_rate)
+
+    print(json.dumps(calibration_report(sample, low, high), indent=2))
+
+
+if __name__ == "__main__":
+    main()
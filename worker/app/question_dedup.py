@@ -0,0 +1,91 @@
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from shared.matching import tokenize
+
+# MinHash signature of NUM_BANDS * ROWS_PER_BAND permutations. Narrow bands favour recall;
+# candidates are then confirmed against the full signature.
+NUM_BANDS = 32
+ROWS_PER_BAND = 2
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.6"))
+
+# Interview boilerplate that says nothing about what a question is about
+QUESTION_STOP_WORDS = frozenset("""
+can could would please tell describe explain share give example examples walk through talk
+experience question questions like know think time something approach
+""".split())
+
+_rng = np.random.RandomState(1729)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    Content words only, so rephrasings that keep the key terms still collide.
+    """
+    return {token for token in tokenize(text) if token not in QUESTION_STOP_WORDS}
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    features = shingles(text)
+    if not features:
+        return None
+    hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint64, count=len(features))
+    # (a * x + b) mod 2^32 for every permutation at once; uint64 wrap-around keeps the low bits exact
+    permuted = (np.outer(hashes, _A) + _B) & _MASK
+    return permuted.min(axis=0)
+
+
+class QuestionIndex:
+    """
+    MinHash LSH index over question texts. Lookups touch only the matching buckets.
+    """
+
+    def __init__(self, threshold: float = DEDUP_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.signatures: Dict[int, np.ndarray] = {}
+        self.texts: Dict[int, str] = {}
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(NUM_BANDS)]
+
+    def add(self, text: str) -> None:
+        signature = minhash(text)
+        if signature is None:
+            return
+        key = len(self.texts)
+        self.signatures[key] = signature
+        self.texts[key] = text
+        for band, bucket in enumerate(self.buckets):
+            bucket.setdefault(self._band_key(signature, band), []).append(key)
+
+    def extend(self, texts: Iterable[str]) -> "QuestionIndex":
+        for text in texts:
+            if text:
+                self.add(text)
+        return self
+
+    def find_similar(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Returns (most similar indexed question, estimated Jaccard similarity) at or above the threshold.
+        """
+        signature = minhash(text)
+        if signature is None:
+            return None
+        candidates = set()
+        for band, bucket in enumerate(self.buckets):
+            candidates.update(bucket.get(self._band_key(signature, band), ()))
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self.texts[key], similarity)
+        return best
+
+    @staticmethod
+    def _band_key(signature: np.ndarray, band: int) -> bytes:
+        return signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
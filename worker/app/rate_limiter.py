@@ -0,0 +1,248 @@
+"""
+Token-bucket rate limiting for LLM calls, shared across worker replicas.
+
+Each model has a requests-per-minute and a tokens-per-minute bucket. With
+LLM_RATE_LIMIT_BACKEND=postgres the bucket levels live in the llm_rate_limits table and
+every replica draws from them under a row lock; "local" keeps them in process and "off"
+disables limiting.
+
+Priority classes keep interactive work ahead of batch jobs: within a process lower
+classes wait while a higher class is queued, and across replicas lower classes may not
+draw a bucket below their reserve, leaving headroom that only interactive calls can use.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from shared.database import SessionLocal
+from shared.logger import logger
+from shared.models import LLMRateLimit
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITIES = [INTERACTIVE, BATCH, BACKGROUND]
+# Share of each bucket a priority class must leave untouched
+PRIORITY_RESERVE = {INTERACTIVE: 0.0, BATCH: 0.2, BACKGROUND: 0.4}
+
+LLM_RATE_LIMIT_BACKEND = os.getenv("LLM_RATE_LIMIT_BACKEND", "local")
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "80000"))
+LLM_RATE_LIMITS = json.loads(os.getenv("LLM_RATE_LIMITS_JSON", "{}"))  # {"gpt-4": {"rpm": 500, "tpm": 80000}}
+LLM_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", "120"))
+POLL_INTERVAL_SECONDS = 0.05
+
+
+def model_limits(model: str) -> Tuple[float, float]:
+    limits = LLM_RATE_LIMITS.get(model, {})
+    return float(limits.get("rpm", LLM_REQUESTS_PER_MINUTE)), float(limits.get("tpm", LLM_TOKENS_PER_MINUTE))
+
+
+def refill(level: float, updated_at: float, capacity: float, now: float) -> float:
+    return min(capacity, level + (now - updated_at) * capacity / 60.0)
+
+
+class LocalBucketStore:
+    """
+    In-process bucket levels; the stand-in for a single worker or local development.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, model: str, tokens: float, reserve: float) -> float:
+        rpm, tpm = model_limits(model)
+        with self.lock:
+            now = time.time()
+            request_level, token_level = (
+                refill(*self.buckets.get(f"{model}:requests", (rpm, now)), rpm, now),
+                refill(*self.buckets.get(f"{model}:tokens", (tpm, now)), tpm, now),
+            )
+            wait = max(
+                wait_for(request_level, 1, rpm, reserve),
+                wait_for(token_level, tokens, tpm, reserve),
+            )
+            if wait == 0:
+                request_level -= 1
+                token_level -= tokens
+            self.buckets[f"{model}:requests"] = (request_level, now)
+            self.buckets[f"{model}:tokens"] = (token_level, now)
+            return wait
+
+    def adjust(self, model: str, tokens: float):
+        with self.lock:
+            level, updated_at = self.buckets.get(f"{model}:tokens", (model_limits(model)[1], time.time()))
+            self.buckets[f"{model}:tokens"] = (level - tokens, updated_at)
+
+
+class PostgresBucketStore:
+    """
+    Bucket levels in the llm_rate_limits table, updated under SELECT ... FOR UPDATE so
+    every replica sees one shared budget.
+    """
+
+    def take(self, model: str, tokens: float, reserve: float) -> float:
+        rpm, tpm = model_limits(model)
+        db = SessionLocal()
+        try:
+            rows = self._locked_rows(db, model, rpm, tpm)
+            now = time.time()
+            requests, token_row = rows[f"{model}:requests"], rows[f"{model}:tokens"]
+            request_level = refill(requests.tokens, requests.updated_at, rpm, now)
+            token_level = refill(token_row.tokens, token_row.updated_at, tpm, now)
+            wait = max(
+                wait_for(request_level, 1, rpm, reserve),
+                wait_for(token_level, tokens, tpm, reserve),
+            )
+            if wait == 0:
+                request_level -= 1
+                token_level -= tokens
+            requests.tokens, requests.updated_at = request_level, now
+            token_row.tokens, token_row.updated_at = token_level, now
+            db.commit()
+            return wait
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def adjust(self, model: str, tokens: float):
+        db = SessionLocal()
+        try:
+            db.query(LLMRateLimit).filter_by(name=f"{model}:tokens").update(
+                {LLMRateLimit.tokens: LLMRateLimit.tokens - tokens}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _locked_rows(db, model: str, rpm: float, tpm: float):
+        names = {f"{model}:requests": rpm, f"{model}:tokens": tpm}
+        now = time.time()
+        db.execute(
+            insert(LLMRateLimit)
+            .values([{"name": name, "tokens": capacity, "updated_at": now} for name, capacity in names.items()])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        rows = (
+            db.query(LLMRateLimit)
+            .filter(LLMRateLimit.name.in_(list(names)))
+            .order_by(LLMRateLimit.name)
+            .with_for_update()
+            .all()
+        )
+        return {row.name: row for row in rows}
+
+
+def wait_for(level: float, amount: float, capacity: float, reserve: float) -> float:
+    """
+    Seconds until amount can be taken while leaving reserve * capacity in the bucket.
+    """
+    # Requests larger than what the class may ever use are let through once the bucket is full
+    amount = min(amount, capacity * (1 - reserve))
+    shortfall = amount + reserve * capacity - level
+    if shortfall <= 0:
+        return 0.0
+    return shortfall * 60.0 / capacity
+
+
+class RateLimiter:
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.waiting = {priority: 0 for priority in PRIORITIES}
+        self.acquired = {priority: 0 for priority in PRIORITIES}
+        self.wait_times = {priority: deque(maxlen=500) for priority in PRIORITIES}
+
+    def _higher_priority_waiting(self, priority: str) -> bool:
+        rank = PRIORITIES.index(priority)
+        with self.lock:
+            return any(self.waiting[p] for p in PRIORITIES[:rank])
+
+    def acquire(self, model: str, tokens: float, priority: str = INTERACTIVE):
+        """
+        Blocks until one request and the estimated tokens can be taken for model.
+        """
+        started = time.time()
+        with self.lock:
+            self.waiting[priority] += 1
+        try:
+            while True:
+                if not self._higher_priority_waiting(priority):
+                    wait = self.store.take(model, tokens, PRIORITY_RESERVE[priority])
+                    if wait == 0:
+                        break
+                else:
+                    wait = POLL_INTERVAL_SECONDS
+                if time.time() - started > LLM_RATE_LIMIT_MAX_WAIT_SECONDS:
+                    raise TimeoutError(f"Rate limit wait for {model} exceeded {LLM_RATE_LIMIT_MAX_WAIT_SECONDS}s")
+                time.sleep(min(max(wait, POLL_INTERVAL_SECONDS), 1.0))
+        finally:
+            with self.lock:
+                self.waiting[priority] -= 1
+        waited = time.time() - started
+        with self.lock:
+            self.acquired[priority] += 1
+            self.wait_times[priority].append(waited)
+        if waited > 1:
+            logger.info(f"LLM rate limiter held a {priority} call to {model} for {waited:.2f}s")
+
+    def try_acquire(self, model: str, tokens: float, priority: str = INTERACTIVE) -> bool:
+        if self._higher_priority_waiting(priority):
+            return False
+        return self.store.take(model, tokens, PRIORITY_RESERVE[priority]) == 0
+
+    def settle(self, model: str, estimated_tokens: float, actual_tokens: Optional[float]):
+        """
+        Corrects the token bucket once the real usage of a call is known.
+        """
+        if actual_tokens is not None and actual_tokens != estimated_tokens:
+            self.store.adjust(model, actual_tokens - estimated_tokens)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            result = {}
+            for priority in PRIORITIES:
+                waits = sorted(self.wait_times[priority])
+                result[priority] = {
+                    "queue_depth": self.waiting[priority],
+                    "acquired": self.acquired[priority],
+                    "wait_p50_seconds": waits[len(waits) // 2] if waits else None,
+                    "wait_p95_seconds": waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else None,
+                    "wait_max_seconds": waits[-1] if waits else None,
+                }
+            return result
+
+
+class NoopRateLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(store=None)
+
+    def acquire(self, model: str, tokens: float, priority: str = INTERACTIVE):
+        with self.lock:
+            self.acquired[priority] += 1
+
+    def try_acquire(self, model: str, tokens: float, priority: str = INTERACTIVE) -> bool:
+        return True
+
+    def settle(self, model: str, estimated_tokens: float, actual_tokens: Optional[float]):
+        pass
+
+
+def build_rate_limiter() -> RateLimiter:
+    if LLM_RATE_LIMIT_BACKEND == "off":
+        return NoopRateLimiter()
+    if LLM_RATE_LIMIT_BACKEND == "postgres":
+        return RateLimiter(PostgresBucketStore())
+    return RateLimiter(LocalBucketStore())
+
+
+rate_limiter = build_rate_limiter()
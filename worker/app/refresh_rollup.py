@@ -0,0 +1,42 @@
+"""
+Builds or refreshes the cohort rollup (shared/cohort_rollup.py) behind the admin cohort
+endpoint. The endpoint only tops up a recent rollup; the first build, and catching up after
+a long gap, run here.
+
+Usage (e.g. every few minutes from cron, and once after migrating):
+    python -m worker.app.refresh_rollup
+    python -m worker.app.refresh_rollup --full
+"""
+import argparse
+import time
+from typing import List, Optional
+
+from shared.cohort_rollup import refresh_cohort_rollup
+from shared.database import SessionLocal
+
+
+def run(full: bool = False):
+    db = SessionLocal()
+    try:
+        started = time.time()
+        if not refresh_cohort_rollup(db, full=full):
+            print("Another cohort rollup refresh holds the lock, nothing done")
+            return
+        db.commit()
+        print(f"Cohort rollup {'rebuilt' if full else 'refreshed'} in {time.time() - started:.1f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build or refresh the cohort rollup.")
+    parser.add_argument("--full", action="store_true", help="Rebuild every day instead of those active since the last refresh")
+    args = parser.parse_args(argv)
+    run(args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Offline re-grade: recomputes candidate_grade, score_in_percentage and
+interview_cleared_by_candidate of evaluated interviews from the stored candidate_score values,
+after GRADE_SCALE or PASS_THRESHOLD (worker/app/grading.py) changed. No LLM calls.
+
+Works in chunks of interview ids with two set-based UPDATEs per chunk: one over the answers,
+one over the interviews (joined to per-interview aggregates of those answers). Only rows whose
+values change are written, and their interviews get a new details_version. Interviews
+archived by worker/app/archive.py are re-graded from their archive files, which are rewritten
+when a grade changes. The cohort rollup is then recomputed for the creation days touched.
+
+Usage:
+    python -m worker.app.regrade
+    python -m worker.app.regrade --chunk-size 20000 --dry-run
+"""
+import argparse
+import time
+from collections import Counter
+from datetime import date, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import Numeric, String, case, cast, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from shared.cohort_rollup import refresh_cohort_days
+from shared.database import SessionLocal
+from shared.interview_archive import read_archive, write_archive
+from shared.models import Interview, QuestionAnswer
+from worker.app.grading import GRADE_SCALE, PASS_THRESHOLD, grade_score
+
+REGRADE_CHUNK_SIZE = 5000
+REGRADE_ARCHIVE_BATCH_SIZE = 200
+
+
+def grade_expression(score):
+    """
+    grade_score as SQL.
+    """
+    return case(*[(score >= min_score, grade) for min_score, grade in GRADE_SCALE], else_="F")
+
+
+def creation_day(created_at) -> Optional[date]:
+    """
+    The cohort rollup's day of an interview: its UTC creation date, None when undated.
+    """
+    return created_at.astimezone(timezone.utc).date() if created_at else None
+
+
+def regrade_chunk(db: Session, first_id: int, last_id: int, days: Set[Optional[date]]) -> tuple:
+    """
+    Re-grades the evaluated, unarchived interviews with first_id <= id <= last_id and adds
+    the creation days of the changed ones to days. Returns (answers changed, interviews
+    changed). The caller commits.
+    """
+    in_chunk = Interview.id.between(first_id, last_id)
+    regradable = select(Interview.id).where(
+        in_chunk, Interview.status == "AI_EVALUATION_DONE", Interview.archive_path.is_(None)
+    )
+    new_grade = grade_expression(QuestionAnswer.candidate_score)
+    changed_answers = db.execute(
+        update(QuestionAnswer)
+        .where(
+            QuestionAnswer.interview_id.between(first_id, last_id),
+            QuestionAnswer.interview_id.in_(regradable),
+            QuestionAnswer.candidate_score.isnot(None),
+            QuestionAnswer.candidate_grade.is_distinct_from(new_grade),
+        )
+        .values(candidate_grade=new_grade)
+        .returning(QuestionAnswer.interview_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    # The same aggregation performance_measure does per interview: scores out of 10 each,
+    # passed when at least PASS_THRESHOLD of the answers are not an F
+    scored = (
+        select(
+            QuestionAnswer.interview_id,
+            func.count().label("answers"),
+            func.sum(QuestionAnswer.candidate_score).label("points"),
+            func.count().filter(QuestionAnswer.candidate_grade != "F").label("passed"),
+        )
+        .where(QuestionAnswer.interview_id.between(first_id, last_id), QuestionAnswer.candidate_score.isnot(None))
+        .group_by(QuestionAnswer.interview_id)
+        .subquery()
+    )
+    percent = func.round(cast(scored.c.points * 100.0 / (scored.c.answers * 10), Numeric), 2)
+    cleared = case((scored.c.passed >= scored.c.answers * PASS_THRESHOLD, "Pass"), else_="Fail")
+    latest_grade = (
+        select(QuestionAnswer.candidate_grade)
+        .where(QuestionAnswer.interview_id == Interview.id)
+        .order_by(QuestionAnswer.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    changed_interviews = db.execute(
+        update(Interview)
+        .where(
+            Interview.id == scored.c.interview_id,
+            Interview.status == "AI_EVALUATION_DONE",
+            Interview.archive_path.is_(None),
+            or_(
+                Interview.score_in_percentage.is_distinct_from(cast(percent, String)),
+                Interview.interview_cleared_by_candidate.is_distinct_from(cleared),
+                Interview.id.in_(set(changed_answers) or [0]),
+            ),
+        )
+        .values(
+            score_in_percentage=cast(percent, String),
+            score_percent=percent,
+            interview_cleared_by_candidate=cleared,
+            latest_grade=latest_grade,
+            details_version=Interview.details_version + 1,
+        )
+        .returning(Interview.created_at)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    days.update(creation_day(created_at) for created_at in changed_interviews)
+    return len(changed_answers), len(changed_interviews)
+
+
+def regrade_answers(answers: List[Dict]) -> Optional[Dict]:
+    """
+    Re-grades archived answers in place, as regrade_chunk does in SQL. Returns the
+    interview's recomputed values, or None if no answer has a score.
+    """
+    scored = [answer for answer in answers if answer.get("candidate_score") is not None]
+    if not scored:
+        return None
+    for answer in scored:
+        answer["candidate_grade"] = grade_score(answer["candidate_score"])
+    points = sum(answer["candidate_score"] for answer in scored)
+    passed = sum(1 for answer in scored if answer["candidate_grade"] != "F")
+    percent = round(points * 100.0 / (len(scored) * 10), 2)
+    latest = max(answers, key=lambda answer: answer.get("id") or 0)
+    return {
+        "score_in_percentage": f"{percent:.2f}",
+        "score_percent": percent,
+        "interview_cleared_by_candidate": "Pass" if passed >= len(scored) * PASS_THRESHOLD else "Fail",
+        "latest_grade": latest.get("candidate_grade"),
+        "archived_grades": dict(Counter(answer["candidate_grade"] for answer in answers if answer.get("candidate_grade"))),
+    }
+
+
+def regrade_archived_batch(
+    db: Session, after_id: int, batch_size: int, dry_run: bool, days: Set[Optional[date]]
+) -> tuple:
+    """
+    Re-grades up to batch_size archived evaluated interviews with id > after_id from their
+    archive files. Returns (last id seen or None when done, answers changed, interviews
+    changed). The caller commits.
+    """
+    interviews = (
+        db.query(Interview)
+        .filter(
+            Interview.id > after_id,
+            Interview.status == "AI_EVALUATION_DONE",
+            Interview.archive_path.isnot(None),
+        )
+        .order_by(Interview.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    answers_changed = interviews_changed = 0
+    for interview in interviews:
+        try:
+            answers = read_archive(interview.archive_path)
+        except (OSError, ValueError) as e:
+            print(f"  skipping interview {interview.id}, archive {interview.archive_path} unreadable: {e}")
+            continue
+        old_grades = [answer.get("candidate_grade") for answer in answers]
+        values = regrade_answers(answers)
+        if values is None:
+            continue
+        changed = sum(1 for old, answer in zip(old_grades, answers) if old != answer.get("candidate_grade"))
+        if changed and not dry_run:
+            write_archive(interview.archive_path, answers)
+        if changed or any(getattr(interview, column) != value for column, value in values.items()):
+            for column, value in values.items():
+                setattr(interview, column, value)
+            interview.details_version += 1
+            interviews_changed += 1
+            days.add(creation_day(interview.created_at))
+        answers_changed += changed
+    return (interviews[-1].id if interviews else None), answers_changed, interviews_changed
+
+
+def run(chunk_size: int, dry_run: bool = False, refresh_rollup: bool = True):
+    db = SessionLocal()
+    try:
+        first_id, last_id, total = db.query(
+            func.min(Interview.id), func.max(Interview.id), func.count(Interview.id)
+        ).filter(Interview.status == "AI_EVALUATION_DONE", Interview.archive_path.is_(None)).one()
+        archived_total = db.query(func.count(Interview.id)).filter(
+            Interview.status == "AI_EVALUATION_DONE", Interview.archive_path.isnot(None)
+        ).scalar()
+        if not total and not archived_total:
+            print("No evaluated interviews to re-grade")
+            return
+        print(f"Re-grading {total} evaluated interviews (ids {first_id}-{last_id}) and {archived_total} archived ones, "
+              f"pass threshold {PASS_THRESHOLD:.0%}{' (dry run)' if dry_run else ''}")
+
+        started = time.time()
+        answers = interviews = 0
+        days: Set[Optional[date]] = set()
+        for chunk_start in range(first_id or 0, (last_id or -1) + 1, chunk_size):
+            chunk_end = min(chunk_start + chunk_size - 1, last_id)
+            changed_answers, changed_interviews = regrade_chunk(db, chunk_start, chunk_end, days)
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            answers += changed_answers
+            interviews += changed_interviews
+            done = (chunk_end - first_id + 1) / (last_id - first_id + 1)
+            print(f"  ids up to {chunk_end} ({done:.0%}): {answers} answers and {interviews} interviews changed, "
+                  f"{time.time() - started:.1f}s", flush=True)
+
+        # Archived answers are only in their files: read, re-grade and rewrite them a batch at a time
+        after_id, seen = 0, 0
+        while True:
+            last_seen, changed_answers, changed_interviews = regrade_archived_batch(
+                db, after_id, REGRADE_ARCHIVE_BATCH_SIZE, dry_run, days
+            )
+            if last_seen is None:
+                break
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            after_id = last_seen
+            seen += REGRADE_ARCHIVE_BATCH_SIZE
+            answers += changed_answers
+            interviews += changed_interviews
+            print(f"  archived ids up to {after_id} ({min(seen, archived_total)}/{archived_total}): "
+                  f"{answers} answers and {interviews} interviews changed, {time.time() - started:.1f}s", flush=True)
+
+        if refresh_rollup and days and not dry_run:
+            if refresh_cohort_days(db, days):
+                db.commit()
+                print(f"Cohort rollup recomputed for {len(days)} days")
+            else:
+                print("Another cohort rollup refresh holds the lock; rebuild it with python -m worker.app.refresh_rollup --full")
+        print(f"{'Would change' if dry_run else 'Changed'} {answers} answer grades and {interviews} interviews "
+              f"in {time.time() - started:.1f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Re-grade evaluated interviews from their stored scores.")
+    parser.add_argument("--chunk-size", type=int, default=REGRADE_CHUNK_SIZE, help="Interview ids per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change and roll back")
+    parser.add_argument("--no-rollup", action="store_true", help="Skip recomputing the cohort rollup of the re-graded days")
+    args = parser.parse_args(argv)
+    run(args.chunk_size, args.dry_run, not args.no_rollup)
+
+
+if __name__ == "__main__":
+    main()
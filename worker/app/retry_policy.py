@@ -0,0 +1,55 @@
+"""
+Per-action retry policy for failed messages.
+
+A failed message is not retried inline: the worker schedules a copy with the envelope's
+attempt counter bumped and an exponential, jittered delay, and completes the original,
+so one bad message never holds up the consumer. After max_attempts the message goes to
+the dead_letters table, from where an admin can replay it.
+Policies can be overridden per action with RETRY_POLICIES_JSON, e.g.
+    RETRY_POLICIES_JSON='{"performance_measure": {"max_attempts": 8}}'
+"""
+import json
+import os
+import random
+from typing import Dict
+
+DEFAULT_RETRY_POLICIES = {
+    # The candidate is waiting on the next question, so retry quickly and give up early
+    "process_question": {"max_attempts": 4, "base_delay_seconds": 2, "max_delay_seconds": 30},
+    "doc_upload": {"max_attempts": 5, "base_delay_seconds": 10, "max_delay_seconds": 300},
+    "performance_measure": {"max_attempts": 6, "base_delay_seconds": 30, "max_delay_seconds": 1800},
+}
+FALLBACK_RETRY_POLICY = {"max_attempts": 3, "base_delay_seconds": 10, "max_delay_seconds": 300}
+
+
+def load_retry_policies() -> Dict[str, Dict]:
+    policies = {action: dict(policy) for action, policy in DEFAULT_RETRY_POLICIES.items()}
+    overrides = os.getenv("RETRY_POLICIES_JSON")
+    if overrides:
+        for action, policy in json.loads(overrides).items():
+            policies.setdefault(action, dict(FALLBACK_RETRY_POLICY)).update(policy)
+    return policies
+
+
+RETRY_POLICIES = load_retry_policies()
+
+
+def retry_policy(action_type: str) -> Dict:
+    return RETRY_POLICIES.get(action_type, FALLBACK_RETRY_POLICY)
+
+
+def should_retry(action_type: str, attempt: int) -> bool:
+    """
+    attempt is the zero-based number of the attempt that just failed.
+    """
+    return attempt + 1 < retry_policy(action_type)["max_attempts"]
+
+
+def retry_delay(action_type: str, attempt: int) -> float:
+    """
+    Seconds to wait before the attempt after the given one: exponential backoff with
+    equal jitter, capped at max_delay_seconds.
+    """
+    policy = retry_policy(action_type)
+    delay = min(policy["max_delay_seconds"], policy["base_delay_seconds"] * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
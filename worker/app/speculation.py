@@ -0,0 +1,129 @@
+"""
+Speculative next-question drafts.
+
+While the candidate is still answering, the frontend uploads the partial recording and
+the worker drafts the next question from its transcript (speculate_question). When the
+final answer arrives, the draft is reused if the interview context has not changed
+otherwise and the partial transcript already covered the final answer; if not, it is
+discarded and the question is generated as usual. Every outcome is recorded on the
+draft row (status, coverage, generation time), so hit rate and time saved can be
+queried to tune SPECULATION_MIN_COVERAGE and how often the frontend speculates.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from shared.logger import logger
+from shared.matching import tokenize
+from shared.models import SpeculativeDraft
+
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "true").lower() == "true"
+# Partial transcripts shorter than this are not worth a draft
+SPECULATION_MIN_WORDS = int(os.getenv("SPECULATION_MIN_WORDS", "12"))
+# Share of the final answer's terms the partial transcript must contain for the draft to be reused
+SPECULATION_MIN_COVERAGE = float(os.getenv("SPECULATION_MIN_COVERAGE", "0.75"))
+
+_lock = threading.Lock()
+_stats = {"drafted": 0, "skipped": 0, "hits": 0, "misses": 0, "saved_seconds": 0.0}
+
+
+def answer_coverage(partial_answer: str, final_answer: str) -> float:
+    """
+    Fraction of the final answer's distinct content terms already present in the partial one.
+    """
+    final_terms = set(tokenize(final_answer))
+    if not final_terms:
+        return 1.0
+    return len(final_terms & set(tokenize(partial_answer))) / len(final_terms)
+
+
+def worth_drafting(db: Session, interview_id: int, question_id: int, partial_answer: str) -> bool:
+    """
+    Skips partial transcripts that are too short, and ones an existing draft already
+    covers (that draft would be reused anyway).
+    """
+    if len(partial_answer.split()) < SPECULATION_MIN_WORDS:
+        return False
+    existing = db.query(SpeculativeDraft).filter_by(interview_id=interview_id, question_id=question_id).first()
+    return not (
+        existing
+        and existing.status == "READY"
+        and answer_coverage(existing.partial_answer, partial_answer) >= SPECULATION_MIN_COVERAGE
+    )
+
+
+def save_draft(
+    db: Session,
+    interview_id: int,
+    question_id: int,
+    partial_answer: str,
+    draft_question: str,
+    context_version: int,
+    generation_seconds: float,
+):
+    """
+    Stores the latest draft for a question, replacing any earlier one. The caller commits.
+    """
+    draft = db.query(SpeculativeDraft).filter_by(interview_id=interview_id, question_id=question_id).first()
+    if not draft:
+        draft = SpeculativeDraft(interview_id=interview_id, question_id=question_id)
+        db.add(draft)
+    draft.partial_answer = partial_answer
+    draft.draft_question = draft_question
+    draft.context_version = context_version
+    draft.generation_seconds = generation_seconds
+    draft.status = "READY"
+    draft.coverage = None
+    draft.created_at = time.time()
+    draft.resolved_at = None
+    with _lock:
+        _stats["drafted"] += 1
+
+
+def record_skip():
+    with _lock:
+        _stats["skipped"] += 1
+
+
+def take_draft(db: Session, interview_id: int, question_id: int, final_answer: Optional[str], context_version: int) -> Optional[str]:
+    """
+    Returns the drafted question if it can stand in for a fresh generation, and marks the
+    draft USED or DISCARDED. Only the final answer may have changed since drafting, i.e.
+    the context is exactly one version ahead. The caller commits.
+    """
+    draft = (
+        db.query(SpeculativeDraft)
+        .filter_by(interview_id=interview_id, question_id=question_id, status="READY")
+        .with_for_update()
+        .first()
+    )
+    if not draft:
+        return None
+    coverage = answer_coverage(draft.partial_answer, final_answer or "")
+    hit = draft.context_version == context_version - 1 and coverage >= SPECULATION_MIN_COVERAGE
+    draft.status = "USED" if hit else "DISCARDED"
+    draft.coverage = coverage
+    draft.resolved_at = time.time()
+    with _lock:
+        _stats["hits" if hit else "misses"] += 1
+        if hit:
+            _stats["saved_seconds"] += draft.generation_seconds
+    logger.info(
+        f"Speculative draft for interview_id={interview_id} question_id={question_id} "
+        f"{'reused' if hit else 'discarded'} (coverage={coverage:.2f}, drafted at version "
+        f"{draft.context_version}, now {context_version})"
+    )
+    return draft.draft_question if hit else None
+
+
+def speculation_stats() -> Dict:
+    with _lock:
+        resolved = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": _stats["hits"] / resolved if resolved else None,
+            "avg_saved_seconds": _stats["saved_seconds"] / _stats["hits"] if _stats["hits"] else None,
+        }
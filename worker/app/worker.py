@@ -1,21 +1,38 @@
 # worker/app/worker.py
+import asyncio
 import json
-from azure.servicebus import ServiceBusClient, ServiceBusReceiveMode
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 #from db import Session, Interview
-from shared.models import Interview, QuestionAnswer, User  # Add this import
+from shared.models import DeadLetter, Interview, QuestionAnswer, User  # Add this import
+from shared.common import get_lock_renewer, get_service_bus_client, schedule_message_to_service_bus
 from shared.database import SessionLocal
-from worker.app.langchain_chat import generate_next_question, llm  # Ensure llm is imported or initialized
+from shared.matching import upsert_document_vector
+from shared.documents import get_document_texts, set_document_text
+from shared.context_version import bump_details_version, bump_interview_version, bump_user_interview_versions
+from shared.interview_summary import refresh_interview_summary
+from worker.app.langchain_chat import MAX_QUESTIONS, draft_question, generate_next_question
+from worker.app.llm_routing import invoke_task
 from worker.app.pdf_to_text import extract_text_from_pdf  # Add this import
 from worker.app.audio_to_text import extract_text_from_audio  # Add this import
+from worker.app import interview_cache, media_pool, speculation
+from worker.app.speculation import SPECULATION_ENABLED, save_draft, worth_drafting
+from worker.app.grading import PASS_THRESHOLD, grade_score
+from worker.app.idempotency import (
+    ALREADY_DONE, IN_PROGRESS, IN_PROGRESS_RECHECK_SECONDS, MessageInProgress, claim_message, finish_message, hold_claim,
+)
+from worker.app.lanes import LANE_OVERFLOW_DELAY_SECONDS, LANES, LaneDispatcher, lane_subscription
+from worker.app.retry_policy import retry_delay, should_retry
+from worker.app.prescore import PRESCORE_ENABLED, is_empty_answer, prescore_answer
 from dotenv import load_dotenv
 #from worker.app.langgraph_interview import graph
 import os
 #from shared.models import Interview, QuestionAnswer
 from shared.logger import logger
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain.chat_models import ChatOpenAI
+from typing import Optional
 
 
 load_dotenv()  # Load environment variables from .env file
@@ -23,33 +40,17 @@ load_dotenv()  # Load environment variables from .env file
 SERVICE_BUS_CONNECTION_STR = os.getenv("SERVICE_BUS_CONNECTION_STR")
 TOPIC_NAME = os.getenv("TOPIC_NAME")
 SUBSCRIPTION_NAME = os.getenv("SUBSCRIPTION_NAME")
+LOCK_RENEWAL_MAX_SECONDS = float(os.getenv("LOCK_RENEWAL_MAX_SECONDS", "900"))
 
 
 
-
-GRADE_SCALE = [
-    (9, "A"),
-    (8, "B"),
-    (7, "C"),
-    (5, "D"),
-    (3, "E"),
-    (0, "F"),
-]
-
-def grade_score(score):
-    for min_score, grade in GRADE_SCALE:
-        if score >= min_score:
-            return grade
-    return "F"
-
-llm = ChatOpenAI(model="gpt-4", temperature=0.7)
-
-
 def performance_measure(payload: dict):
     """
     Evaluates all answers in an interview, generates ideal answers, scores, and grades.
     Also updates overall interview score and pass/fail status.
     """
+    from langchain_core.messages import HumanMessage
+
     inner_payload = payload.get("payload", {})
     interview_id = inner_payload.get("interview_id")
     if not interview_id:
@@ -67,18 +68,31 @@ def performance_measure(payload: dict):
             logger.error(f"User {interview.user_id} not found")
             return
 
-        jd = user.jd_text or ""
-        resume = user.resume_text or ""
+        documents = get_document_texts(db, user.id)
+        jd = documents.get("jd", "")
+        resume = documents.get("resume", "")
 
         qas = db.query(QuestionAnswer).filter_by(interview_id=interview_id).order_by(QuestionAnswer.id).all()
         total_score = 0
         total_questions = 0
         pass_count = 0
+        llm_judged = 0
 
         for qa in qas:
             if not qa.question_text or not qa.answer_text:
                 continue
 
+            # Blank answers are scored without spending any LLM call
+            if PRESCORE_ENABLED and is_empty_answer(qa.answer_text):
+                qa.candidate_score = 0
+                qa.candidate_grade = grade_score(0)
+                qa.ai_remark = "No substantive answer was given."
+                bump_details_version(db, interview_id)
+                db.commit()
+                logger.info(f"Pre-scored empty answer Q{qa.id}: score=0")
+                total_questions += 1
+                continue
+
             # Generate ideal answer using LLM
             prompt = (
                 f"Job Description:\n{jd}\n\n"
@@ -86,7 +100,22 @@ def performance_measure(payload: dict):
                 f"Question: {qa.question_text}\n"
                 "What is the ideal answer to this question for this job? Respond concisely."
             )
-            ai_answer = llm.invoke([HumanMessage(content=prompt)]).content.strip()
+            ai_answer = invoke_task("ideal_answer", [HumanMessage(content=prompt)], interview_id=interview_id).content.strip()
+
+            # Clearly on-topic or off-topic answers are scored locally; only borderline ones go to the LLM judge
+            prescore, similarity = prescore_answer(ai_answer, qa.answer_text) if PRESCORE_ENABLED else (None, 0.0)
+            if prescore is not None:
+                qa.ai_answer = ai_answer
+                qa.candidate_score = prescore
+                qa.candidate_grade = grade_score(prescore)
+                bump_details_version(db, interview_id)
+                db.commit()
+                logger.info(f"Pre-scored Q{qa.id}: similarity={similarity:.3f}, score={prescore}, grade={qa.candidate_grade}")
+                total_score += prescore
+                total_questions += 1
+                if qa.candidate_grade != "F":
+                    pass_count += 1
+                continue
 
             # Compare user's answer to ideal answer
             compare_prompt = (
@@ -98,7 +127,8 @@ def performance_measure(payload: dict):
                 "Score the candidate's answer out of 10 and assign a grade (A=best, F=fail). "
                 "Respond in JSON: {\"score\": <int>, \"grade\": \"A-F\"} and a short justification."
             )
-            compare_response = llm.invoke([HumanMessage(content=compare_prompt)]).content.strip()
+            compare_response = invoke_task("score", [HumanMessage(content=compare_prompt)], interview_id=interview_id).content.strip()
+            llm_judged += 1
 
             # Parse response (simple extraction)
             import re, json
@@ -119,6 +149,7 @@ def performance_measure(payload: dict):
             qa.ai_answer = ai_answer
             qa.candidate_score = score
             qa.candidate_grade = grade
+            bump_details_version(db, interview_id)
             db.commit()
             logger.info(f"Evaluated Q{qa.id}: score={score}, grade={grade}")
 
@@ -128,25 +159,31 @@ def performance_measure(payload: dict):
                 pass_count += 1
 
         # Calculate overall score in percentage
+        score_percentage = 0.0
         if total_questions > 0:
             max_total = total_questions * 10
             score_percentage = (total_score / max_total) * 100
             interview.score_in_percentage = f"{score_percentage:.2f}"
-            # Pass if at least 60% of questions are not 'F'
-            interview_cleared = "Pass" if pass_count / total_questions >= 0.6 else "Fail"
+            # Pass if at least PASS_THRESHOLD of the questions are not 'F'
+            interview_cleared = "Pass" if pass_count / total_questions >= PASS_THRESHOLD else "Fail"
             interview.interview_cleared_by_candidate = interview_cleared
         else:
             interview.score_in_percentage = "0.00"
             interview.interview_cleared_by_candidate = "Fail"
 
+        logger.info(f"Interview {interview_id}: {llm_judged} of {total_questions} answers sent to the LLM judge")
+
         # After evaluating all questions, update interview status
         interview.status = "AI_EVALUATION_DONE"
+        bump_details_version(db, interview_id)
+        refresh_interview_summary(db, interview_id, score_percent=round(score_percentage, 2), evaluated_at=func.now())
         db.commit()
         logger.info(f"Interview {interview_id} status updated to AI_EVALUATION_DONE, score: {interview.score_in_percentage}, result: {interview.interview_cleared_by_candidate}")
 
     except Exception as e:
         logger.error(f"Error in performance_measure: {e}", exc_info=True)
         db.rollback()
+        raise
     finally:
         db.close()
 
@@ -180,16 +217,18 @@ def doc_upload(payload: dict):
         logger.error(f"Invalid file_type: {file_type}")
         db.close()
         return
+    bump_user_interview_versions(db, user.id)
     db.commit()
 
     try:
         extracted_text = extract_text_from_pdf(file_path)
+        set_document_text(db, user.id, file_type.lower(), extracted_text)
         if file_type.lower() == "jd":
-            user.jd_text = extracted_text
             user.jd_status = "COMPLETED"
         elif file_type.lower() == "resume":
-            user.resume_text = extracted_text
             user.resume_status = "COMPLETED"
+        upsert_document_vector(db, user.id, file_type.lower(), extracted_text)
+        bump_user_interview_versions(db, user.id)
         db.commit()
         logger.info(f"Document {file_type} for user_id={user_id} processed and updated successfully.")
     except Exception as e:
@@ -198,7 +237,9 @@ def doc_upload(payload: dict):
             user.jd_status = "FAILED"
         elif file_type.lower() == "resume":
             user.resume_status = "FAILED"
+        bump_user_interview_versions(db, user.id)
         db.commit()
+        raise
     finally:
         db.close()
  
@@ -240,15 +281,26 @@ def process_question(payload: dict):
         if last_qa and not last_qa.answer_text:
             #last_qa.answer_text = user_input
             last_qa.status = "ANSWERED"
+            bump_details_version(db, interview_id)
             db.commit()
 
         # Extract text from audio
-        answer_text = extract_text_from_audio(abs_audio_path)
+        answer_text = extract_text_from_audio(abs_audio_path, decode=media_pool.decode_audio)
         qa.answer_text = answer_text
         qa.status = "Answer_Audio_Extracted"
+        version = bump_interview_version(db, interview_id)
+        refresh_interview_summary(db, interview_id, last_answered_at=func.now())
         db.commit()
+        interview_cache.record_answer(int(interview_id), int(question_id), answer_text, version)
         logger.info(f"Audio processed and answer_text updated for QuestionAnswer id={qa.id}")
 
+        # A redelivered message must not ask a second follow-up to the same answer
+        if db.query(QuestionAnswer).filter(
+            QuestionAnswer.interview_id == interview_id, QuestionAnswer.question_id > int(question_id)
+        ).first():
+            logger.info(f"Next question after {question_id} already exists for interview_id={interview_id}, skipping generation")
+            return
+
         # Generate next question or finish
         result = generate_next_question(interview_id, db)
         logger.info(f"Next step for Interview {interview_id}: {result}")
@@ -257,44 +309,238 @@ def process_question(payload: dict):
     except Exception as e:
         logger.error(f"Error processing audio for interview_id={interview_id}, question_id={question_id}: {e}", exc_info=True)
         db.rollback()
+        raise
+    finally:
+        db.close()
+
+def speculate_question(payload: dict):
+    """
+    Handles speculate_question: transcribes the partial recording of an answer that is
+    still in progress and drafts the next question from it, for process_question to reuse.
+    """
+    inner_payload = payload.get("payload", {})
+    interview_id = inner_payload.get("interview_id")
+    question_id = inner_payload.get("question_id")
+    audio_path = inner_payload.get("audio_path")
+
+    if not SPECULATION_ENABLED:
+        return
+    if not interview_id or not question_id or not audio_path:
+        logger.error("Invalid payload received in speculate_question: %s", payload)
+        return
+
+    db = SessionLocal()
+    try:
+        interview_id, question_id = int(interview_id), int(question_id)
+        qa = db.query(QuestionAnswer).filter_by(interview_id=interview_id, question_id=question_id).first()
+        if not qa or qa.answer_text is not None:
+            logger.info(f"Answer {question_id} of interview_id={interview_id} is already final, not speculating")
+            return
+        interview = db.query(Interview).filter_by(id=interview_id).first()
+        context = interview_cache.load_context(db, interview)
+        # Only the question currently being answered, and never the closing note
+        if not context.turns or context.turns[-1]["question_id"] != question_id or context.question_count >= MAX_QUESTIONS - 1:
+            return
+
+        partial_answer = extract_text_from_audio(os.path.abspath(audio_path), decode=media_pool.decode_audio)
+        if not worth_drafting(db, interview_id, question_id, partial_answer):
+            speculation.record_skip()
+            return
+
+        started = time.perf_counter()
+        draft = draft_question(context, interview_id, "speculative_question", answer_overrides={question_id: partial_answer})
+        save_draft(db, interview_id, question_id, partial_answer, draft, context.version, time.perf_counter() - started)
+        db.commit()
+        logger.info(f"Drafted speculative question after {question_id} for interview_id={interview_id}")
+    except Exception as e:
+        # Speculation is best effort: a draft is only useful before the answer is final, so it is never retried
+        logger.warning(f"Speculative draft failed for interview_id={interview_id}, question_id={question_id}: {e}")
+        db.rollback()
     finally:
         db.close()
 
 # Update the dispatcher to use process_question for audio_extraction
 TASK_DISPATCHER = {
     "process_question": process_question,
+    "speculate_question": speculate_question,
     "doc_upload": doc_upload,
     "performance_measure": performance_measure,
 }
 
+def dead_letter_message(data: dict, message_body: str, error: Exception):
+    db = SessionLocal()
+    try:
+        db.add(DeadLetter(
+            correlation_id=data.get("correlationId"),
+            action_type=data.get("action_type"),
+            session_id=data.get("session_id"),
+            attempts=data.get("attempt", 0) + 1,
+            error=f"{type(error).__name__}: {error}",
+            body=message_body,
+            dead_lettered_at=time.time(),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def retry_or_dead_letter(data: dict, message_body: str, error: Exception):
+    """
+    Schedules the next attempt of a failed message, or dead-letters it once its action's
+    retry policy is exhausted. Raises only if neither could be recorded, in which case the
+    original message is abandoned and redelivered by the broker.
+    """
+    action_type = data.get("action_type")
+    attempt = data.get("attempt", 0)
+    if should_retry(action_type, attempt):
+        delay = retry_delay(action_type, attempt)
+        logger.warning(
+            f"{action_type} message {data.get('correlationId')} failed on attempt {attempt + 1} ({error}), "
+            f"retrying in {delay:.1f}s"
+        )
+        schedule_message_to_service_bus({**data, "attempt": attempt + 1}, delay)
+    else:
+        logger.error(
+            f"{action_type} message {data.get('correlationId')} failed {attempt + 1} times, moving it to dead letters: {error}"
+        )
+        dead_letter_message(data, message_body, error)
+
 def handle_message(message_body):
+    """
+    Runs the handler for a message at most once per correlationId. A failing handler is
+    retried later via retry_or_dead_letter rather than inline. A message another replica is
+    still working on is re-sent for a later check; raises only when that re-send fails, so
+    the message is redelivered as is.
+    """
+    logger.debug(f"Received message body: {message_body}")
     try:
-        logger.debug(f"Received message body: {message_body}")
         data = json.loads(message_body)
-        action_type = data.get("action_type")
-        logger.info(f"Handling action_type: {action_type}")
-        handler = TASK_DISPATCHER.get(action_type)
-        if handler:
+    except ValueError as e:
+        logger.error(f"Malformed message, moving it to dead letters: {e}")
+        dead_letter_message({}, message_body, e)
+        return
+    action_type = data.get("action_type")
+    correlation_id = data.get("correlationId")
+    logger.info(f"Handling action_type: {action_type} correlationId: {correlation_id}")
+    handler = TASK_DISPATCHER.get(action_type)
+    if not handler:
+        logger.warning(f"No handler for action_type: {action_type}")
+        return
+    if not correlation_id:
+        try:
             handler(data)
-        else:
-            logger.warning(f"No handler for action_type: {action_type}")
+        except Exception as e:
+            retry_or_dead_letter(data, message_body, e)
+        return
+
+    claim = claim_message(correlation_id, action_type)
+    if claim == ALREADY_DONE:
+        logger.info(f"Skipping duplicate delivery of {action_type} message {correlation_id}")
+        return
+    if claim == IN_PROGRESS:
+        # Completing this delivery and checking again later keeps it from cycling through
+        # redeliveries into the broker's own dead-letter queue
+        try:
+            schedule_message_to_service_bus(data, IN_PROGRESS_RECHECK_SECONDS)
+        except Exception as e:
+            raise MessageInProgress(f"{action_type} message {correlation_id} is being handled by another worker") from e
+        logger.info(f"{action_type} message {correlation_id} is being handled by another worker, checking again later")
+        return
+    try:
+        with hold_claim(correlation_id):
+            handler(data)
+    except Exception as e:
+        finish_message(correlation_id, succeeded=False)
+        retry_or_dead_letter(data, message_body, e)
+        return
+    finish_message(correlation_id, succeeded=True)
+
+lane_dispatcher: Optional[LaneDispatcher] = None
+# Blocking receive and settle calls get their own threads, apart from the lane handlers:
+# one receiver per dedicated lane plus the main subscription, each receiving and settling
+servicebus_executor = ThreadPoolExecutor(max_workers=2 * (len(LANES) + 1), thread_name_prefix="servicebus")
+
+async def settle_messages(receiver, settlements: asyncio.Queue):
+    """
+    Completes or abandons handled messages. Settlement goes through the receive loop
+    because a receiver must not be used from several threads at once.
+    """
+    loop = asyncio.get_event_loop()
+    while not settlements.empty():
+        msg, succeeded = settlements.get_nowait()
+        settle = receiver.complete_message if succeeded else receiver.abandon_message
+        try:
+            await loop.run_in_executor(servicebus_executor, settle, msg)
+        except Exception as e:
+            # The lock was lost; the message is redelivered and the claim table dedups it
+            logger.warning(f"Could not settle message {msg.message_id}: {e}")
+
+def reschedule_overflow(message_body: str) -> bool:
+    """
+    Sends a message whose lane is full back to the topic for later. Returns False if it
+    could not, in which case the delivery is abandoned and the broker redelivers it.
+    """
+    try:
+        schedule_message_to_service_bus(json.loads(message_body), LANE_OVERFLOW_DELAY_SECONDS)
     except Exception as e:
-        logger.error(f"Error handling message: {e}", exc_info=True)
+        logger.warning(f"Could not reschedule a message from a full lane: {e}")
+        return False
+    return True
+
+async def receive_into_lanes(servicebus_client, subscription_name: str, lane: Optional[str] = None):
+    """
+    Feeds one subscription into the lane dispatcher. With lane=None messages are routed by
+    action_type. Intake pauses only while the interactive lane (or a dedicated
+    subscription's own lane) has no buffer space left, and a receiver dedicated to the
+    interactive lane also pauses while the media process pool is saturated; messages for
+    a full background lane are rescheduled instead (see lanes.py). Messages are
+    peek-locked, their locks renewed while they wait or run, and completed only after the
+    handler succeeds.
+    """
+    from azure.servicebus import ServiceBusReceiveMode
+
+    receiver = servicebus_client.get_subscription_receiver(
+        topic_name=TOPIC_NAME,
+        subscription_name=subscription_name,
+        receive_mode=ServiceBusReceiveMode.PEEK_LOCK,
+    )
+    renewer = get_lock_renewer(max_lock_renewal_duration=LOCK_RENEWAL_MAX_SECONDS)
+    settlements = asyncio.Queue()
+    loop = asyncio.get_event_loop()
+    with receiver, renewer:
+        logger.info(f"Listening for messages on subscription {subscription_name} (lane={lane or 'all'})...")
+        while True:
+            await settle_messages(receiver, settlements)
+            free = lane_dispatcher.free_slots(lane)
+            if free < 1 or (lane == "interactive" and not media_pool.has_capacity()):
+                await asyncio.sleep(0.1)
+                continue
+            # No more than fit, so a waiting lane's submit below does not hold up the batch
+            messages = await loop.run_in_executor(
+                servicebus_executor, lambda: receiver.receive_messages(max_message_count=min(10, free), max_wait_time=1)
+            )
+            logger.debug(f"Received {len(messages)} messages from Service Bus.")
+            for msg in messages:
+                renewer.register(receiver, msg)
+                enqueued_at = msg.enqueued_time_utc.timestamp() if msg.enqueued_time_utc else None
+                accepted = await lane_dispatcher.submit(
+                    str(msg), enqueued_at, lane,
+                    on_done=lambda succeeded, msg=msg: settlements.put_nowait((msg, succeeded)),
+                )
+                if not accepted:
+                    rescheduled = await loop.run_in_executor(servicebus_executor, reschedule_overflow, str(msg))
+                    settlements.put_nowait((msg, rescheduled))
 
 async def listen_to_service_bus():
+    global lane_dispatcher
     logger.info("Starting Service Bus listener.")
-    servicebus_client = ServiceBusClient.from_connection_string(conn_str=SERVICE_BUS_CONNECTION_STR)
+    lane_dispatcher = LaneDispatcher(handle_message)
+    lane_dispatcher.start()
+    servicebus_client = get_service_bus_client()
     with servicebus_client:
-        receiver = servicebus_client.get_subscription_receiver(
-            topic_name=TOPIC_NAME,
-            subscription_name=SUBSCRIPTION_NAME,
-            receive_mode=ServiceBusReceiveMode.RECEIVE_AND_DELETE
-        )
-        with receiver:
-            logger.info("Listening for messages on Service Bus...")
-            while True:
-                messages = receiver.receive_messages(max_message_count=10, max_wait_time=5)
-                logger.debug(f"Received {len(messages)} messages from Service Bus.")
-                for msg in messages:
-                    logger.info("Processing new message from Service Bus.")
-                    handle_message(str(msg))
+        receivers = []
+        dedicated = {lane: lane_subscription(lane) for lane in LANES if lane_subscription(lane)}
+        for lane, subscription_name in dedicated.items():
+            receivers.append(receive_into_lanes(servicebus_client, subscription_name, lane))
+        if len(dedicated) < len(LANES):
+            receivers.append(receive_into_lanes(servicebus_client, SUBSCRIPTION_NAME))
+        await asyncio.gather(*receivers)